@@ -9,7 +9,8 @@ from .models import (
     Comment, 
     ShareActivity, 
     UserHistory, 
-    CodeRun
+    CodeRun,
+    Tag
 )
 
 # Common Admin Mixins
@@ -36,6 +37,14 @@ class CategoryAdmin(admin.ModelAdmin):
         return obj.snippets.count()
     snippet_count.short_description = 'Snippets'
 
+# TAG ADMIN-------------------------------------------------------------------------
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'usage_count', 'created_at')
+    search_fields = ('name',)
+    readonly_fields = ('usage_count', 'created_at')
+    ordering = ('-usage_count', 'name')
+
 # CODE SNIPPET ADMIN-----------------------------------------------------------------
 class ReactionInline(admin.TabularInline):
     model = Reaction
@@ -76,7 +85,11 @@ class CodeSnippetAdmin(admin.ModelAdmin):
         'updated_at', 
         'last_accessed',
         'reaction_count',
+        'like_count',
+        'dislike_count',
         'comment_count',
+        'view_count',
+        'run_count',
         'share_count',
         'preview_code'
     )
@@ -123,7 +136,11 @@ class CodeSnippetAdmin(admin.ModelAdmin):
                 'updated_at',
                 'last_accessed',
                 'reaction_count',
+                'like_count',
+                'dislike_count',
                 'comment_count',
+                'view_count',
+                'run_count',
                 'share_count'
             )
         }),
@@ -132,6 +149,15 @@ class CodeSnippetAdmin(admin.ModelAdmin):
     filter_horizontal = ()
     raw_id_fields = ('uploaded_by',)
     ordering = ('-created_at',)
+    list_select_related = ('category', 'uploaded_by')
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # The changelist only shows metadata; the change form still loads every column
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.defer(*CodeSnippet.HEAVY_CONTENT_FIELDS)
+        return queryset
     
     def language_display(self, obj):
         return obj.get_language_display()
@@ -142,17 +168,9 @@ class CodeSnippetAdmin(admin.ModelAdmin):
     difficulty_display.short_description = 'Difficulty'
     
     def reaction_count(self, obj):
-        return obj.reactions.count()
+        return obj.like_count + obj.dislike_count
     reaction_count.short_description = 'Reactions'
     
-    def comment_count(self, obj):
-        return obj.comments.count()
-    comment_count.short_description = 'Comments'
-    
-    def share_count(self, obj):
-        return obj.shares.count()
-    share_count.short_description = 'Shares'
-    
     def preview_code(self, obj):
         if len(obj.code_content) > 100:
             preview = obj.code_content[:100] + '...'
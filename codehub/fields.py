@@ -0,0 +1,55 @@
+# codehub/fields.py
+
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+from .services.blob_services import is_placeholder, load_blob_values
+
+
+class BlobBackedAttribute(DeferredAttribute):
+    """
+    Attribute for a snippet body that may be stored in SnippetBlob (see services.blob_services).
+    The column then holds a placeholder and `content_blobs` maps the field to its blob, which
+    is resolved on first read, so serializers, forms and templates see the real value.
+    Assigning a body marks it for plan_blob_fields, which decides its storage on save.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        name = self.field.attname
+        data = instance.__dict__
+        if name not in data and 'content_blobs' not in data:
+            # Load the deferred body and its blob map with one query instead of two
+            instance.refresh_from_db(fields=[name, 'content_blobs'])
+        value = super().__get__(instance, cls)
+        if (
+            is_placeholder(value)
+            and name not in data.get('_blob_dirty', ())
+            and name in (instance.content_blobs or {})
+        ):
+            return load_blob_values(instance)[name]
+        return value
+
+    def __set__(self, instance, value):
+        name = self.field.attname
+        if name in instance.__dict__:
+            # A value replacing a loaded one is a pending edit, not the stored placeholder
+            instance.__dict__.setdefault('_blob_dirty', set()).add(name)
+        instance.__dict__[name] = value
+
+
+class BlobBackedFieldMixin:
+    descriptor_class = BlobBackedAttribute
+
+    def pre_save(self, model_instance, add):
+        # Write the column itself (possibly the placeholder), not the resolved body
+        return model_instance.__dict__.get(self.attname)
+
+
+class BlobBackedTextField(BlobBackedFieldMixin, models.TextField):
+    pass
+
+
+class BlobBackedJSONField(BlobBackedFieldMixin, models.JSONField):
+    pass
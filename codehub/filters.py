@@ -2,8 +2,10 @@
 # codehub/filters.py
 
 import django_filters
-from django.db.models import Q
+from rest_framework import filters
 from .models import CodeSnippet
+from .search_utils import search_snippets
+from .services.tag_services import build_tag_filter
 
 class CodeSnippetFilter(django_filters.FilterSet):
     q = django_filters.CharFilter(method='search', label="Search")
@@ -13,6 +15,11 @@ class CodeSnippetFilter(django_filters.FilterSet):
     output_type = django_filters.CharFilter(field_name='output_type', lookup_expr='iexact')
     is_featured = django_filters.BooleanFilter(field_name='is_featured')
     tags = django_filters.CharFilter(method='filter_tags')
+    tag_match = django_filters.ChoiceFilter(
+        choices=(('any', 'Any'), ('all', 'All')),
+        method='filter_tag_match',
+        label="Match any (default) or all of the given tags"
+    )
     ordering = django_filters.CharFilter(method='filter_ordering')
 
     class Meta:
@@ -20,24 +27,17 @@ class CodeSnippetFilter(django_filters.FilterSet):
         fields = ['language', 'difficulty', 'category', 'output_type', 'is_featured']
 
     def search(self, queryset, name, value):
-        """Full-text search across multiple fields"""
-        return queryset.filter(
-            Q(title__icontains=value) |
-            Q(description__icontains=value) |
-            Q(code_content__icontains=value) |
-            Q(tags__icontains=value)
-        )
+        """Ranked full-text search across title, tags, description and code"""
+        return search_snippets(queryset, value)
 
     def filter_tags(self, queryset, name, value):
-        """Filter by comma-separated tags"""
-        tags = [tag.strip().lower() for tag in value.split(',') if tag.strip()]
-        if not tags:
-            return queryset
-            
-        query = Q()
-        for tag in tags:
-            query |= Q(tags__icontains=tag)
-        return queryset.filter(query)
+        """Filter by comma-separated tags (exact names, `tag_match=all` for AND semantics)"""
+        match_all = self.data.get('tag_match') == 'all'
+        return queryset.filter(build_tag_filter(value.split(','), match_all=match_all))
+
+    def filter_tag_match(self, queryset, name, value):
+        """Consumed by filter_tags"""
+        return queryset
 
     def filter_ordering(self, queryset, name, value):
         """Custom ordering handling"""
@@ -50,4 +50,25 @@ class CodeSnippetFilter(django_filters.FilterSet):
         
         if value in valid_ordering:
             return queryset.order_by(value)
-        return queryset.order_by('-created_at')
\ No newline at end of file
+        return queryset.order_by('-created_at')
+
+
+class SnippetSearchFilter(filters.SearchFilter):
+    """
+    `?search=` backed by the snippet full-text index instead of per-field icontains scans
+    """
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        return search_snippets(queryset, ' '.join(search_terms))
+
+
+class SnippetOrderingFilter(filters.OrderingFilter):
+    """
+    Orders search results by relevance unless the client asked for an explicit ordering
+    """
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', '-created_at']
+        return super().get_ordering(request, queryset, view)
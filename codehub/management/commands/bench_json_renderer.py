@@ -0,0 +1,66 @@
+import io
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from codehub.serializers import CodeSnippetListSerializer
+from codehub.services.queryset_services import get_snippet_list_queryset
+from src import renderers
+from src.parsers import ORJSONParser
+from src.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = ("Times rendering and parsing a page of snippet-list JSON with DRF's stock "
+            "JSONRenderer/JSONParser vs. the orjson-backed ORJSONRenderer/ORJSONParser")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=20,
+            help="Number of snippets serialized into the page (default: 20)",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=200,
+            help="Number of times the page is rendered and parsed per class (default: 200)",
+        )
+
+    def timed(self, func, rounds):
+        func()  # Warm-up
+        started = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        return (time.perf_counter() - started) / rounds
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError("orjson is not installed; both paths would use the stdlib json module")
+        rounds = max(options["rounds"], 1)
+
+        request = APIRequestFactory().get("/api/snippets/", secure=True)
+        request.user = AnonymousUser()
+        queryset = get_snippet_list_queryset().order_by("-created_at")[:options["page_size"]]
+        data = {"results": CodeSnippetListSerializer(queryset, many=True, context={"request": request}).data}
+        if not data["results"]:
+            raise CommandError("There are no snippets to serialize")
+
+        stock, fast = JSONRenderer(), ORJSONRenderer()
+        body = stock.render(data)
+        rows = [
+            ("render", lambda: stock.render(data), lambda: fast.render(data)),
+            ("parse", lambda: JSONParser().parse(io.BytesIO(body)), lambda: ORJSONParser().parse(io.BytesIO(body))),
+        ]
+
+        self.stdout.write(f"Snippet list page: {len(data['results'])} snippets, {len(body)} bytes")
+        for name, stock_func, fast_func in rows:
+            before, after = self.timed(stock_func, rounds), self.timed(fast_func, rounds)
+            self.stdout.write(
+                f"{name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms per page ({before / after:.1f}x)"
+            )
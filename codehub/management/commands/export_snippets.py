@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from codehub.models import CodeSnippet
+from codehub.services.transfer_services import DEFAULT_TRANSFER_BATCH_SIZE, iter_snippet_export
+
+
+class Command(BaseCommand):
+    help = "Writes the snippet catalog as NDJSON (one snippet per line) for import_snippets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write (default: stdout)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_TRANSFER_BATCH_SIZE,
+            help=f"Number of snippets read from the database at a time (default: {DEFAULT_TRANSFER_BATCH_SIZE})",
+        )
+        parser.add_argument("--category", help="Only export the snippets of this category slug")
+        parser.add_argument("--language", help="Only export snippets in this language")
+
+    def handle(self, *args, **options):
+        queryset = CodeSnippet.objects.all()
+        if options["category"]:
+            queryset = queryset.filter(category__slug=options["category"])
+        if options["language"]:
+            queryset = queryset.filter(language=options["language"])
+
+        lines = iter_snippet_export(queryset, chunk_size=options["batch_size"])
+        exported = 0
+        if options["output"] == "-":
+            for line in lines:
+                sys.stdout.buffer.write(line)
+                exported += 1
+            sys.stdout.buffer.flush()
+            # Keep stdout clean for the NDJSON stream
+            self.stderr.write(self.style.SUCCESS(f"Exported {exported} snippet(s)."))
+            return
+
+        with open(options["output"], "wb") as output:
+            for line in lines:
+                output.write(line)
+                exported += 1
+        self.stdout.write(self.style.SUCCESS(f"Exported {exported} snippet(s) to {options['output']}."))
@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from codehub.models import CodeSnippet
+from codehub.search_utils import update_search_vectors
+from codehub.services.blob_services import (
+    get_blob_min_size,
+    plan_blob_fields,
+    prune_unused_blobs,
+    store_blobs,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves snippet bodies of at least CODEHUB_BLOB_MIN_SIZE bytes into the compressed blob "
+        "store, or every body back inline with --inline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of snippets locked and rewritten per transaction (default: 200)",
+        )
+        parser.add_argument(
+            "--min-size",
+            type=int,
+            default=None,
+            help="Smallest body (bytes) to externalize (default: CODEHUB_BLOB_MIN_SIZE)",
+        )
+        parser.add_argument(
+            "--inline",
+            action="store_true",
+            help="Move every externalized body back into its column (e.g. before disabling the store)",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Afterwards, delete blobs that no snippet references any more",
+        )
+
+    def handle(self, *args, **options):
+        started_at = timezone.now()
+        batch_size = options["batch_size"]
+        min_size = options["min_size"] or get_blob_min_size()
+        inline = options["inline"]
+
+        snippets = CodeSnippet.objects.order_by("pk")
+        total = snippets.count()
+        done = moved = 0
+        last_pk = None
+        while True:
+            page = snippets.filter(pk__gt=last_pk) if last_pk else snippets
+            pks = list(page.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            moved += self._rewrite_batch(pks, min_size, inline)
+            done += len(pks)
+            last_pk = pks[-1]
+            self.stdout.write(f"Processed {done}/{total} snippets...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rewrote the bodies of {moved} of {total} snippet(s) "
+            f"({'inline' if inline else f'blobs from {min_size} bytes'})."
+        ))
+
+        if options["prune"]:
+            deleted, in_use = prune_unused_blobs(started_at, batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unused blob(s); {in_use} in use."))
+
+    def _rewrite_batch(self, pks, min_size, inline):
+        with transaction.atomic():
+            # Locked so a concurrent edit is neither lost nor overwritten with the old body
+            batch = list(
+                CodeSnippet.objects.select_for_update()
+                .filter(pk__in=pks)
+                .only("pk", "content_blobs", *CodeSnippet.BLOB_FIELDS)
+            )
+            pending = {}
+            changed = []
+            for snippet in batch:
+                refs = dict(snippet.content_blobs or {})
+                pending.update(plan_blob_fields(snippet, rewrite=True, enabled=not inline, min_size=min_size))
+                if snippet.content_blobs != refs:
+                    changed.append(snippet)
+
+            store_blobs(pending)
+            # update() writes the placeholders as they are and skips the save signals;
+            # the API output is unchanged, only the search document needs refreshing
+            for snippet in changed:
+                CodeSnippet.objects.filter(pk=snippet.pk).update(
+                    content_blobs=snippet.content_blobs,
+                    **{name: snippet.__dict__[name] for name in CodeSnippet.BLOB_FIELDS},
+                )
+            if changed:
+                update_search_vectors(CodeSnippet.objects.filter(pk__in=[s.pk for s in changed]))
+        return len(changed)
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from codehub.services.view_buffer_services import flush_view_buffer, get_flush_interval
+
+
+class Command(BaseCommand):
+    help = "Writes buffered snippet views (CODEHUB_VIEW_BUFFER=redis) to the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep flushing every CODEHUB_VIEW_BUFFER_FLUSH_INTERVAL seconds",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, "CODEHUB_VIEW_BUFFER", "off") != "redis":
+            # The memory buffer lives inside each web process and is flushed there
+            raise CommandError("Only the shared redis view buffer can be flushed from a separate process.")
+
+        while True:
+            stats = flush_view_buffer()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Flushed views for {stats['histories']} history entries and {stats['snippets']} snippet(s)."
+                )
+            )
+            if not options["loop"]:
+                break
+            time.sleep(get_flush_interval())
@@ -0,0 +1,59 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from codehub.services.transfer_services import DEFAULT_TRANSFER_BATCH_SIZE, import_snippets
+from user_account.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Creates snippets from an NDJSON file written by export_snippets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON file to read ('-' for stdin)")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_TRANSFER_BATCH_SIZE,
+            help=f"Number of lines validated and inserted per transaction (default: {DEFAULT_TRANSFER_BATCH_SIZE})",
+        )
+        parser.add_argument("--uploaded-by", help="Email of the user the snippets are attributed to")
+        parser.add_argument(
+            "--skip-existing",
+            action="store_true",
+            help="Skip lines whose slug is already taken instead of importing them under a new slug",
+        )
+
+    def handle(self, *args, **options):
+        uploaded_by = None
+        if options["uploaded_by"]:
+            uploaded_by = CustomUser.objects.filter(email=options["uploaded_by"]).first()
+            if uploaded_by is None:
+                raise CommandError(f"No user with email {options['uploaded_by']}.")
+
+        def progress(summary):
+            self.stdout.write(
+                f"Created {summary['created']}, skipped {summary['skipped']}, failed {summary['failed']}..."
+            )
+
+        if options["path"] == "-":
+            summary = self._import(sys.stdin.buffer, uploaded_by, options, progress)
+        else:
+            with open(options["path"], "rb") as lines:
+                summary = self._import(lines, uploaded_by, options, progress)
+
+        for error in summary["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['created']} snippet(s); "
+            f"{summary['skipped']} skipped, {summary['failed']} failed."
+        ))
+
+    def _import(self, lines, uploaded_by, options, progress):
+        return import_snippets(
+            lines,
+            uploaded_by=uploaded_by,
+            batch_size=options["batch_size"],
+            skip_existing=options["skip_existing"],
+            progress=progress,
+        )
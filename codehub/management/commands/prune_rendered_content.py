@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from codehub.models import CodeSnippet, RenderedContent
+from codehub.services.render_services import RENDERED_FIELDS, get_render_sources
+
+
+class Command(BaseCommand):
+    help = "Deletes stored renders that no current snippet revision uses any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of snippets loaded, and renders deleted, per batch (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        live = set()
+        snippets = CodeSnippet.objects.order_by("pk").only("language", "content_blobs", *RENDERED_FIELDS)
+        for snippet in snippets.iterator(chunk_size=batch_size):
+            live.update(content_hash for content_hash, _, _ in get_render_sources(snippet).values())
+
+        stale = [
+            pk for pk, content_hash in RenderedContent.objects.values_list("pk", "content_hash").iterator()
+            if content_hash not in live
+        ]
+        for start in range(0, len(stale), batch_size):
+            RenderedContent.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {len(stale)} stale render(s); {len(live)} in use."
+        ))
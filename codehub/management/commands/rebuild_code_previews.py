@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from codehub.models import CodeSnippet
+from codehub.services.snippet_services import build_code_preview
+
+
+class Command(BaseCommand):
+    help = "Recomputes the stored code preview shown in snippet lists for every code snippet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of snippets loaded and updated per batch (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        snippets = CodeSnippet.objects.order_by("pk").only(
+            "pk", "code_preview", "content_blobs", *CodeSnippet.CODE_PREVIEW_SOURCE_FIELDS
+        )
+        total = snippets.count()
+        done = 0
+        batch = []
+        for snippet in snippets.iterator(chunk_size=batch_size):
+            preview = build_code_preview(snippet)
+            if preview != snippet.code_preview:
+                snippet.code_preview = preview
+                batch.append(snippet)
+            done += 1
+            if len(batch) >= batch_size or (done % batch_size == 0):
+                CodeSnippet.objects.bulk_update(batch, ["code_preview"])
+                batch = []
+                self.stdout.write(f"Processed {done}/{total} snippets...")
+        if batch:
+            CodeSnippet.objects.bulk_update(batch, ["code_preview"])
+
+        self.stdout.write(self.style.SUCCESS(f"Code previews rebuilt for {total} snippet(s)."))
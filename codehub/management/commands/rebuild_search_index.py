@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from codehub.models import CodeSnippet
+from codehub.search_utils import is_full_text_search_available, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recomputes the stored full-text search vector for every code snippet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of snippets updated per UPDATE statement (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        if not is_full_text_search_available():
+            self.stdout.write(
+                self.style.WARNING("Full-text search requires PostgreSQL; nothing to rebuild.")
+            )
+            return
+
+        batch_size = options["batch_size"]
+        ids = list(CodeSnippet.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(ids), batch_size):
+            update_search_vectors(CodeSnippet.objects.filter(pk__in=ids[start:start + batch_size]))
+            self.stdout.write(f"Indexed {min(start + batch_size, len(ids))}/{len(ids)} snippets...")
+
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt for {len(ids)} snippet(s)."))
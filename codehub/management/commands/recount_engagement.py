@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from codehub.models import CodeSnippet, Reaction, Comment, UserHistory, CodeRun, ShareActivity
+
+
+def _aggregate_subquery(model, aggregate, **filters):
+    rows = (
+        model.objects.filter(snippet=OuterRef('pk'), **filters)
+        .order_by()
+        .values('snippet')
+        .annotate(total=aggregate)
+        .values('total')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = "Recomputes the denormalized engagement counters on CodeSnippet from the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of snippets repaired per UPDATE statement (default: 500)",
+        )
+        parser.add_argument(
+            "--only-drifted",
+            action="store_true",
+            help="Report and repair only snippets whose counters differ from the source tables",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        expected = {
+            "like_count": _aggregate_subquery(Reaction, Count("pk"), is_like=True),
+            "dislike_count": _aggregate_subquery(Reaction, Count("pk"), is_like=False),
+            "comment_count": _aggregate_subquery(Comment, Count("pk")),
+            "view_count": _aggregate_subquery(UserHistory, Sum("view_count")),
+            "run_count": _aggregate_subquery(CodeRun, Count("pk")),
+            "share_count": _aggregate_subquery(ShareActivity, Count("pk")),
+        }
+
+        snippets = CodeSnippet.objects.order_by("pk")
+        if options["only_drifted"]:
+            drift = Q()
+            for field in expected:
+                drift |= ~Q(**{field: F(f"expected_{field}")})
+            snippets = snippets.annotate(
+                **{f"expected_{field}": expr for field, expr in expected.items()}
+            ).filter(drift)
+
+        ids = list(snippets.values_list("pk", flat=True))
+        repaired = 0
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            with transaction.atomic():
+                repaired += CodeSnippet.objects.filter(pk__in=batch).update(**expected)
+            self.stdout.write(f"Recounted {repaired}/{len(ids)} snippets...")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Engagement counters recomputed for {repaired} snippet(s).")
+        )
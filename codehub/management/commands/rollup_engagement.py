@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from codehub.services.rollup_services import RUNS_ROLLUP, SHARES_ROLLUP, reset_rollup, run_rollup
+
+
+class Command(BaseCommand):
+    help = "Folds new CodeRun and ShareActivity rows into the daily rollup tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50000,
+            help="Number of raw row ids aggregated per transaction (default: 50000)",
+        )
+        parser.add_argument(
+            "--only",
+            choices=[RUNS_ROLLUP, SHARES_ROLLUP],
+            help="Update a single rollup",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Empty the rollup table(s) and rebuild them from all raw rows",
+        )
+
+    def handle(self, *args, **options):
+        names = [options["only"]] if options["only"] else [RUNS_ROLLUP, SHARES_ROLLUP]
+
+        def report(name, end_id, upper_id, groups):
+            self.stdout.write(f"{name}: up to id {end_id}/{upper_id} ({groups} day group(s) updated)...")
+
+        for name in names:
+            if options["rebuild"]:
+                reset_rollup(name)
+            covered = run_rollup(name, batch_size=options["batch_size"], progress=report)
+            self.stdout.write(self.style.SUCCESS(f"{name}: rolled up {covered} new id(s)."))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from codehub.models import CodeSnippet, SnippetTag, Tag
+from codehub.services.tag_services import sync_snippet_tags
+
+
+class Command(BaseCommand):
+    help = (
+        "Splits the comma-separated CodeSnippet.tags values into Tag relations "
+        "and recomputes every tag's usage count"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of snippets synced per transaction (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        snippets = CodeSnippet.objects.only("id", "tags").order_by("pk")
+        total = snippets.count()
+
+        synced = 0
+        for start in range(0, total, batch_size):
+            with transaction.atomic():
+                for snippet in snippets[start:start + batch_size]:
+                    sync_snippet_tags(snippet)
+                    synced += 1
+            self.stdout.write(f"Synced {synced}/{total} snippets...")
+
+        # Repair any drift in the denormalized usage counts in one statement
+        usage = (
+            SnippetTag.objects.filter(tag=OuterRef("pk"))
+            .order_by()
+            .values("tag")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        Tag.objects.update(
+            usage_count=Coalesce(Subquery(usage, output_field=IntegerField()), Value(0))
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Tags synced for {synced} snippet(s)."))
@@ -2,14 +2,33 @@
 # codehub/models.py
 
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.utils.text import slugify
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from user_account.models import CustomUser
 from django.urls import reverse
-from django.db.models.signals import pre_save
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import pre_save, post_save, post_delete, post_init
 from django.dispatch import receiver
-from .services.snippet_services import generate_snippet_slug
+from .fields import BlobBackedJSONField, BlobBackedTextField
+from .services.blob_services import prepare_blob_fields
+from .services.snippet_services import build_code_preview, generate_snippet_slug
+from src.utils.unique import allocate_unique_value, save_with_unique_retry
+from .search_utils import update_search_vectors, SEARCHABLE_FIELDS
+from .services.tag_services import sync_snippet_tags
+from .services.render_services import RENDERED_FIELDS, is_render_on_save_enabled, render_snippet
+from .services.cache_services import (
+    invalidate_cache_tags,
+    snippet_tag,
+    category_tag,
+    comments_tag,
+    SNIPPET_LIST_TAG,
+    CATEGORY_LIST_TAG,
+    TAG_LIST_TAG,
+)
 
 
 DIFFICULTY_LEVELS = (
@@ -39,16 +58,26 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # A concurrent save can take the same slug between allocation and insert;
+        # clearing it makes category_pre_save allocate the next free one
+        save_with_unique_retry(
+            self, 'slug',
+            save=lambda: super(Category, self).save(*args, **kwargs),
+            reallocate=lambda: setattr(self, 'slug', ''),
+        )
+
 @receiver(pre_save, sender=Category)
 def category_pre_save(sender, instance, *args, **kwargs):
     if not instance.slug:
-        instance.slug = slugify(instance.name)
-        # Ensure slug is unique, though unique=True in model helps
-        original_slug = instance.slug
-        num = 1
-        while Category.objects.filter(slug=instance.slug).exclude(pk=instance.pk).exists():
-            instance.slug = f"{original_slug}-{num}"
-            num += 1
+        instance.slug = allocate_unique_value(
+            sender.objects.all(),
+            'slug',
+            slugify(instance.name),
+            exclude_pk=instance.pk,
+            max_length=sender._meta.get_field('slug').max_length,
+            fallback='category',
+        )
             
 # class Category(models.Model):
 #     """
@@ -78,6 +107,26 @@ def category_pre_save(sender, instance, *args, **kwargs):
 #         instance.slug = slugify(instance.name)
 
 
+# TAG-----------------------------------------------------------------------------
+class Tag(models.Model):
+    """
+    Normalized snippet tag. `CodeSnippet.tags` stays the editable comma-separated source;
+    the relations and usage counts are synced from it (see services.tag_services).
+    """
+    name = models.CharField(max_length=50, unique=True)
+    usage_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-usage_count', 'name']
+        indexes = [
+            models.Index(fields=['-usage_count', 'name']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
 # CODE SNIPPET-----------------------------------------------------------------------------
 class CodeSnippet(models.Model):
     """
@@ -122,13 +171,14 @@ class CodeSnippet(models.Model):
     output_type = models.CharField(
         max_length=20, choices=OUTPUT_TYPE_CHOICES, default="console"
     )
-    code_content = models.TextField(
+    # Large bodies may live compressed in SnippetBlob (see content_blobs and codehub.fields)
+    code_content = BlobBackedTextField(
         help_text="Main code content (can be combined or single-file)"
     )
-    html_code = models.TextField(blank=True, null=True)
-    css_code = models.TextField(blank=True, null=True)
-    js_code = models.TextField(blank=True, null=True)
-    additional_files = models.JSONField(
+    html_code = BlobBackedTextField(blank=True, null=True)
+    css_code = BlobBackedTextField(blank=True, null=True)
+    js_code = BlobBackedTextField(blank=True, null=True)
+    additional_files = BlobBackedJSONField(
         blank=True, null=True, help_text="JSON structure for multi-file projects"
     )
     simulated_output = models.TextField(
@@ -156,6 +206,44 @@ class CodeSnippet(models.Model):
         CustomUser, on_delete=models.SET_NULL, related_name="uploaded_snippets", null=True
     )
 
+    # Denormalized engagement counters (maintained by the signals at the bottom of this module)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    dislike_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    run_count = models.PositiveIntegerField(default=0, editable=False)
+    share_count = models.PositiveIntegerField(default=0, editable=False)
+
+    tag_set = models.ManyToManyField(
+        Tag, through='SnippetTag', related_name='snippets', blank=True
+    )
+
+    # Weighted full-text document, refreshed after every save (see codehub.search_utils)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # First lines of the code, cut at write time so list views never load the full bodies
+    code_preview = models.CharField(max_length=500, blank=True, editable=False)
+
+    # {field: sha256} of the bodies stored in SnippetBlob instead of their column
+    content_blobs = models.JSONField(default=dict, blank=True, editable=False)
+
+    ENGAGEMENT_COUNTER_FIELDS = (
+        'like_count', 'dislike_count', 'comment_count',
+        'view_count', 'run_count', 'share_count',
+    )
+
+    # Potentially large columns; list views and the admin changelist leave them deferred
+    HEAVY_CONTENT_FIELDS = (
+        'code_content', 'html_code', 'css_code', 'js_code',
+        'additional_files', 'simulated_output', 'expected_result', 'search_vector',
+    )
+
+    # code_preview is built from the first non-empty one of these
+    CODE_PREVIEW_SOURCE_FIELDS = ('code_content', 'html_code', 'js_code', 'css_code')
+
+    # Bodies that can be moved to the blob store (see services.blob_services)
+    BLOB_FIELDS = ('code_content', 'html_code', 'css_code', 'js_code', 'additional_files')
+
     class Meta:
         ordering = ["-created_at"]
         indexes = [
@@ -166,20 +254,107 @@ class CodeSnippet(models.Model):
             models.Index(fields=['is_featured']),
             models.Index(fields=['title']),
             models.Index(fields=['tags']),
+            GinIndex(fields=['search_vector'], name='codesnippet_search_gin'),
         ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Counters are only ever changed with F() updates, and last_accessed by the view
+        # buffer flush; never write back stale in-memory values
+        # (deferred columns were never loaded, so they are left out too instead of being fetched)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.ENGAGEMENT_COUNTER_FIELDS
+                and field.name not in ('search_vector', 'last_accessed')
+                and field.attname not in deferred
+            ]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.CODE_PREVIEW_SOURCE_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'code_preview'}
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.BLOB_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'content_blobs'}
+        # Losing a race for the slug clears it, so codesnippet_pre_save allocates the next one
+        save_with_unique_retry(
+            self, 'slug',
+            save=lambda: super(CodeSnippet, self).save(*args, **kwargs),
+            reallocate=lambda: setattr(self, 'slug', ''),
+        )
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # Reloaded bodies are the stored ones, not pending edits
+        dirty = self.__dict__.get('_blob_dirty')
+        if dirty:
+            dirty.difference_update(fields or self.BLOB_FIELDS)
+
 @receiver(pre_save, sender=CodeSnippet)
 def codesnippet_pre_save(sender, instance, *args, **kwargs):
-    if not instance.slug or (instance.pk and sender.objects.filter(pk=instance.pk, title=instance.title).first() is None):
-        # Generate slug only if it's new or title has changed
-        instance.slug = generate_snippet_slug(instance.title, instance.pk)
-    # Ensure all CodeSnippet slug are unique by excluding the current instance
-    elif instance.slug:
-        # If slug is provided or already exists, ensure it's still unique
+    # Generate the slug only for new snippets, or when the title or slug changed since load
+    # (compared with the values tracked in codesnippet_post_init, so no query is needed)
+    changed = any(
+        field in instance.__dict__ and instance.__dict__[field] != original
+        for field, original in (('title', instance._original_title), ('slug', instance._original_slug))
+    )
+    if not instance.slug or instance._state.adding or changed:
         instance.slug = generate_snippet_slug(instance.title, instance.pk)
+    # Only rebuild the preview when the code was loaded; a deferred body hasn't changed
+    if all(field in instance.__dict__ for field in sender.CODE_PREVIEW_SOURCE_FIELDS):
+        instance.code_preview = build_code_preview(instance)
+    # Move large bodies to the blob store (or back inline) before the columns are written
+    prepare_blob_fields(instance, fields=kwargs.get('update_fields'))
+
+@receiver(post_save, sender=CodeSnippet)
+def codesnippet_post_save(sender, instance, *args, **kwargs):
+    # Keep the stored full-text document in sync with the searchable columns
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None or set(update_fields) & set(SEARCHABLE_FIELDS):
+        update_search_vectors(sender.objects.filter(pk=instance.pk))
+    # Keep the normalized tag relations in sync with the comma-separated tags field
+    if update_fields is None or 'tags' in update_fields:
+        sync_snippet_tags(instance)
+    # Pre-render highlighted code / description HTML once the new revision is committed
+    if is_render_on_save_enabled() and (update_fields is None or set(update_fields) & set(RENDERED_FIELDS)):
+        transaction.on_commit(lambda: render_snippet(instance.pk))
+
+
+# SNIPPET TAG-----------------------------------------------------------------------------
+class SnippetTag(models.Model):
+    """
+    Through table between CodeSnippet and Tag, indexed for lookups in both directions
+    """
+    snippet = models.ForeignKey(
+        CodeSnippet,
+        on_delete=models.CASCADE,
+        related_name='snippet_tags'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='snippet_tags'
+    )
+
+    class Meta:
+        unique_together = ('snippet', 'tag')
+        indexes = [
+            models.Index(fields=['tag', 'snippet']),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_id} on {self.snippet_id}"
+
+@receiver(post_delete, sender=SnippetTag)
+def snippet_tag_post_delete(sender, instance, **kwargs):
+    # Covers both tag removal during sync and cascades from deleted snippets
+    Tag.objects.filter(pk=instance.tag_id).update(
+        usage_count=Greatest(F('usage_count') - 1, Value(0))
+    )
+    invalidate_cache_tags(TAG_LIST_TAG)
         
 # class CodeSnippet(models.Model):
 #     """
@@ -362,6 +537,10 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Serves the per-snippet listing and its keyset pagination
+            models.Index(fields=['snippet', '-created_at', '-id']),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user.email} on {self.snippet.title}"
@@ -406,6 +585,9 @@ class ShareActivity(models.Model):
     class Meta:
         verbose_name_plural = "Share Activities"
         ordering = ['-shared_at']
+        indexes = [
+            models.Index(fields=['snippet', '-shared_at', '-id']),
+        ]
 
     def __str__(self):
         return f"{self.snippet.title} shared via {self.get_share_method_display()}"
@@ -436,6 +618,9 @@ class UserHistory(models.Model):
         verbose_name_plural = "User Histories"
         unique_together = ('user', 'snippet')
         ordering = ['-last_viewed']
+        indexes = [
+            models.Index(fields=['user', '-last_viewed', '-id']),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s history with {self.snippet.title}"
@@ -473,4 +658,272 @@ class CodeRun(models.Model):
         ordering = ['-run_at']
 
     def __str__(self):
-        return f"Run of {self.snippet.title} by {self.user.email if self.user else 'anonymous'}"
\ No newline at end of file
+        return f"Run of {self.snippet.title} by {self.user.email if self.user else 'anonymous'}"
+
+
+
+# ANALYTICS ROLLUPS-----------------------------------------------------------------------------
+class DailySnippetRuns(models.Model):
+    """
+    CodeRun totals per snippet and day, maintained by the `rollup_engagement` command.
+    """
+    snippet = models.ForeignKey(
+        CodeSnippet,
+        on_delete=models.CASCADE,
+        related_name='daily_runs'
+    )
+    day = models.DateField()
+    run_count = models.PositiveIntegerField(default=0)
+    modified_run_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Daily Snippet Runs"
+        ordering = ['-day']
+        unique_together = ('snippet', 'day')
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+    def __str__(self):
+        return f"{self.snippet_id} on {self.day}: {self.run_count} runs"
+
+
+class DailySnippetShares(models.Model):
+    """
+    ShareActivity totals per snippet, day and share method, maintained by `rollup_engagement`.
+    """
+    snippet = models.ForeignKey(
+        CodeSnippet,
+        on_delete=models.CASCADE,
+        related_name='daily_shares'
+    )
+    day = models.DateField()
+    share_method = models.CharField(max_length=20, choices=ShareActivity.ShareMethod.choices)
+    share_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Daily Snippet Shares"
+        ordering = ['-day']
+        unique_together = ('snippet', 'day', 'share_method')
+        indexes = [
+            models.Index(fields=['day', 'share_method']),
+        ]
+
+    def __str__(self):
+        return f"{self.snippet_id} on {self.day} via {self.share_method}: {self.share_count} shares"
+
+
+class RollupWatermark(models.Model):
+    """
+    Highest raw row id already folded into a rollup table.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+# RENDERED CONTENT-----------------------------------------------------------------------------
+class RenderedContent(models.Model):
+    """
+    Highlighted code or Markdown HTML for a snippet field, stored by a hash of its renderer
+    and source (see services.render_services) so unchanged content is never re-rendered.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    html = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Rendered Content"
+
+    def __str__(self):
+        return self.content_hash
+
+
+
+# SNIPPET BLOB-----------------------------------------------------------------------------
+class SnippetBlob(models.Model):
+    """
+    Compressed body of a large snippet field, addressed by the SHA-256 of its content, so
+    identical bodies (e.g. shared boilerplate) are stored once (see services.blob_services).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    codec = models.CharField(max_length=10)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(help_text="Uncompressed size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.codec}, {self.size} bytes)"
+
+
+
+# ENGAGEMENT COUNTERS-----------------------------------------------------------------------------
+def bump_snippet_counters(snippet_id, **deltas):
+    """
+    Atomically adjust CodeSnippet engagement counters with a single UPDATE.
+    e.g. bump_snippet_counters(snippet.pk, like_count=1, dislike_count=-1)
+    """
+    updates = {
+        field: Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items() if delta
+    }
+    if snippet_id and updates:
+        CodeSnippet.objects.filter(pk=snippet_id).update(**updates)
+        invalidate_cache_tags(snippet_tag(snippet_id))
+
+
+def bump_snippet_counters_many(deltas_by_snippet):
+    """
+    Adjust counters on several snippets with a single UPDATE, for writes that bypass
+    the post_save receivers (bulk_create, queryset.update()).
+    e.g. bump_snippet_counters_many({1: {'run_count': 2}, 7: {'run_count': 1, 'share_count': 1}})
+    """
+    deltas_by_snippet = {
+        snippet_id: {field: delta for field, delta in deltas.items() if delta}
+        for snippet_id, deltas in deltas_by_snippet.items() if snippet_id
+    }
+    fields = {field for deltas in deltas_by_snippet.values() for field in deltas}
+    if not fields:
+        return
+    updates = {
+        field: Greatest(
+            F(field) + Case(
+                *[When(pk=snippet_id, then=Value(deltas[field]))
+                  for snippet_id, deltas in deltas_by_snippet.items() if field in deltas],
+                default=Value(0),
+            ),
+            Value(0),
+        )
+        for field in fields
+    }
+    CodeSnippet.objects.filter(pk__in=list(deltas_by_snippet)).update(**updates)
+    invalidate_cache_tags(*[snippet_tag(snippet_id) for snippet_id in deltas_by_snippet])
+
+
+@receiver(post_init, sender=Reaction)
+def reaction_post_init(sender, instance, **kwargs):
+    # Remember the loaded value so a like <-> dislike switch can move the counters
+    # (read from __dict__ so deferred loads don't trigger a query)
+    instance._original_is_like = instance.__dict__.get('is_like')
+
+@receiver(post_save, sender=Reaction)
+def reaction_post_save(sender, instance, created, **kwargs):
+    if created:
+        field = 'like_count' if instance.is_like else 'dislike_count'
+        bump_snippet_counters(instance.snippet_id, **{field: 1})
+    elif instance._original_is_like is not None and instance.is_like != instance._original_is_like:
+        delta = 1 if instance.is_like else -1
+        bump_snippet_counters(instance.snippet_id, like_count=delta, dislike_count=-delta)
+    else:
+        # The snippet detail payload shows the user's reaction
+        invalidate_cache_tags(snippet_tag(instance.snippet_id))
+    instance._original_is_like = instance.is_like
+
+@receiver(post_delete, sender=Reaction)
+def reaction_post_delete(sender, instance, **kwargs):
+    field = 'like_count' if instance.is_like else 'dislike_count'
+    bump_snippet_counters(instance.snippet_id, **{field: -1})
+
+
+@receiver(post_save, sender=Comment)
+def comment_post_save(sender, instance, created, **kwargs):
+    if created:
+        bump_snippet_counters(instance.snippet_id, comment_count=1)
+    invalidate_cache_tags(comments_tag(instance.snippet_id))
+
+@receiver(post_delete, sender=Comment)
+def comment_post_delete(sender, instance, **kwargs):
+    bump_snippet_counters(instance.snippet_id, comment_count=-1)
+    invalidate_cache_tags(comments_tag(instance.snippet_id))
+
+
+@receiver(post_save, sender=UserHistory)
+def user_history_post_save(sender, instance, created, **kwargs):
+    if created:
+        bump_snippet_counters(instance.snippet_id, view_count=instance.view_count)
+    elif kwargs.get('update_fields') is None or 'view_count' in kwargs['update_fields']:
+        # view_count is usually saved as an F() expression, so the delta is unknown here;
+        # re-derive the total in the same UPDATE instead.
+        total_views = (
+            UserHistory.objects.filter(snippet=OuterRef('pk'))
+            .order_by()
+            .values('snippet')
+            .annotate(total=Sum('view_count'))
+            .values('total')
+        )
+        CodeSnippet.objects.filter(pk=instance.snippet_id).update(
+            view_count=Coalesce(Subquery(total_views), Value(0))
+        )
+    # The snippet detail payload shows the user's history (e.g. is_saved), whatever was saved
+    invalidate_cache_tags(snippet_tag(instance.snippet_id))
+
+@receiver(post_delete, sender=UserHistory)
+def user_history_post_delete(sender, instance, **kwargs):
+    bump_snippet_counters(instance.snippet_id, view_count=-instance.view_count)
+    invalidate_cache_tags(snippet_tag(instance.snippet_id))
+
+
+@receiver(post_save, sender=CodeRun)
+def code_run_post_save(sender, instance, created, **kwargs):
+    if created:
+        bump_snippet_counters(instance.snippet_id, run_count=1)
+
+@receiver(post_delete, sender=CodeRun)
+def code_run_post_delete(sender, instance, **kwargs):
+    bump_snippet_counters(instance.snippet_id, run_count=-1)
+
+
+@receiver(post_save, sender=ShareActivity)
+def share_activity_post_save(sender, instance, created, **kwargs):
+    if created:
+        bump_snippet_counters(instance.snippet_id, share_count=1)
+
+@receiver(post_delete, sender=ShareActivity)
+def share_activity_post_delete(sender, instance, **kwargs):
+    bump_snippet_counters(instance.snippet_id, share_count=-1)
+
+
+
+# RESPONSE CACHE INVALIDATION-----------------------------------------------------------------------------
+@receiver(post_init, sender=Category)
+def category_post_init(sender, instance, **kwargs):
+    instance._original_slug = instance.__dict__.get('slug')
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_invalidate_cache(sender, instance, **kwargs):
+    # Category names are rendered in snippet lists, and deleting one detaches its snippets
+    slugs = {instance._original_slug, instance.slug} - {None, ''}
+    invalidate_cache_tags(
+        CATEGORY_LIST_TAG,
+        SNIPPET_LIST_TAG,
+        *[category_tag(slug) for slug in slugs]
+    )
+    instance._original_slug = instance.slug
+
+
+@receiver(post_init, sender=CodeSnippet)
+def codesnippet_post_init(sender, instance, **kwargs):
+    instance._original_category_id = instance.__dict__.get('category_id')
+    instance._original_title = instance.__dict__.get('title')
+    instance._original_slug = instance.__dict__.get('slug')
+
+@receiver(post_save, sender=CodeSnippet)
+@receiver(post_delete, sender=CodeSnippet)
+def codesnippet_invalidate_cache(sender, instance, **kwargs):
+    category_ids = {instance._original_category_id, instance.category_id} - {None}
+    category_slugs = (
+        Category.objects.filter(pk__in=category_ids).values_list('slug', flat=True)
+        if category_ids else []
+    )
+    invalidate_cache_tags(
+        SNIPPET_LIST_TAG,
+        snippet_tag(instance.pk),
+        *[category_tag(slug) for slug in category_slugs]
+    )
+    instance._original_category_id = instance.category_id
+    instance._original_title = instance.__dict__.get('title')
+    instance._original_slug = instance.__dict__.get('slug')
@@ -0,0 +1,35 @@
+# codehub/pagination.py
+
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination over a fixed, indexed ordering with an id tiebreaker.
+    Unlike page numbers it needs no COUNT(*) and no OFFSET scan, so deep pages
+    cost the same as the first one.
+    """
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+    def get_ordering(self, request, queryset, view):
+        # Ignore ?ordering: keyset pagination is only correct over its own ordering
+        return self.ordering
+
+
+class SelectablePaginationMixin:
+    """
+    Lets a client opt into cursor pagination per request with `?paginator=cursor`.
+    Any other value keeps the default page-number pagination, so existing clients are unaffected.
+    """
+    paginator_query_param = 'paginator'
+    cursor_ordering = ('-created_at', '-id')
+
+    def uses_cursor_pagination(self):
+        return self.request.query_params.get(self.paginator_query_param) == 'cursor'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.uses_cursor_pagination():
+            self._paginator = KeysetCursorPagination(ordering=self.cursor_ordering)
+        return super().paginator
@@ -1,7 +1,141 @@
-
 # codehub/search_utils.py
 
-from django.db.models import Q
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+
+from .services.blob_services import load_blob_values_many
+from .services.tag_services import build_tag_filter
+
+SEARCH_CONFIG = 'english'
+
+SEARCHABLE_FIELDS = ('title', 'tags', 'description', 'short_description', 'code_content')
+
+# Snippets whose code body lives in the blob store (the column only holds a placeholder)
+BLOBBED_CODE = Q(content_blobs__has_key='code_content')
+
+
+def build_search_vector(code_content=None):
+    """
+    Weighted document stored in CodeSnippet.search_vector (A = most relevant).
+    Args:
+        code_content: The resolved body of a snippet whose code is in the blob store;
+            None indexes the code_content column. An empty body falls back to the preview.
+    """
+    code = F('code_content') if code_content is None else Value(code_content, output_field=TextField())
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('tags', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('description', 'short_description', weight='C', config=SEARCH_CONFIG)
+        + SearchVector(
+            Coalesce(NullIf(code, Value('')), 'code_preview', output_field=TextField()),
+            weight='D', config=SEARCH_CONFIG
+        )
+    )
+
+
+SNIPPET_SEARCH_VECTOR = build_search_vector()
+
+
+def is_full_text_search_available():
+    """
+    Full-text search needs PostgreSQL; other backends (e.g. SQLite for local tests)
+    fall back to icontains matching.
+    """
+    return connection.vendor == 'postgresql'
+
+
+def is_trigram_search_enabled():
+    """Trigram title matching requires the pg_trgm extension (CREATE EXTENSION pg_trgm)."""
+    return getattr(settings, 'CODEHUB_SEARCH_TRIGRAM_ENABLED', False)
+
+
+def _iter_blobbed_snippets(queryset, chunk_size=100):
+    """Yield the snippets of `queryset` whose code is in the blob store, bodies resolved per chunk."""
+    snippets = queryset.filter(BLOBBED_CODE).only('pk', 'content_blobs', 'code_content').order_by('pk')
+    chunk = []
+    for snippet in snippets.iterator(chunk_size=chunk_size):
+        chunk.append(snippet)
+        if len(chunk) >= chunk_size:
+            load_blob_values_many(chunk)
+            yield from chunk
+            chunk = []
+    load_blob_values_many(chunk)
+    yield from chunk
+
+
+def update_search_vectors(queryset):
+    """
+    Recompute the stored search vector for every snippet in `queryset`: one UPDATE for the
+    snippets with inline code, plus one per snippet whose code is in the blob store, which
+    is indexed from the resolved body.
+    """
+    if not is_full_text_search_available():
+        return
+    queryset.exclude(BLOBBED_CODE).update(search_vector=SNIPPET_SEARCH_VECTOR)
+    for snippet in _iter_blobbed_snippets(queryset):
+        type(snippet).objects.filter(pk=snippet.pk).update(
+            search_vector=build_search_vector(snippet.code_content or '')
+        )
+
+
+def _blobbed_code_matches(search_term):
+    """
+    PKs of snippets whose blob-stored code contains `search_term`; the icontains fallback
+    can't see those bodies in the column. Fine for local databases, not for production sizes.
+    """
+    from .models import CodeSnippet  # Imported locally to break circular dependency
+
+    needle = search_term.lower()
+    return [
+        snippet.pk for snippet in _iter_blobbed_snippets(CodeSnippet.objects.all())
+        if needle in (snippet.code_content or '').lower()
+    ]
+
+
+def _icontains_query(search_term):
+    return (
+        Q(title__icontains=search_term) |
+        Q(description__icontains=search_term) |
+        Q(code_content__icontains=search_term) |
+        Q(pk__in=_blobbed_code_matches(search_term)) |
+        Q(tags__icontains=search_term)
+    )
+
+
+def search_snippets(queryset, search_term):
+    """
+    Filter `queryset` by `search_term` and annotate a `search_rank`, ordered by relevance.
+    Uses the GIN-indexed search vector on PostgreSQL and icontains elsewhere.
+    """
+    search_term = (search_term or '').strip()
+    if not search_term:
+        return queryset
+
+    if not is_full_text_search_available():
+        return queryset.filter(_icontains_query(search_term)).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    query = SearchQuery(search_term, search_type='websearch', config=SEARCH_CONFIG)
+    rank = SearchRank(F('search_vector'), query)
+    match = Q(search_vector=query)
+
+    if is_trigram_search_enabled():
+        threshold = getattr(settings, 'CODEHUB_SEARCH_TRIGRAM_THRESHOLD', 0.3)
+        queryset = queryset.annotate(title_similarity=TrigramSimilarity('title', search_term))
+        match |= Q(title_similarity__gte=threshold)
+        rank = rank + F('title_similarity')
+
+    return queryset.annotate(search_rank=rank).filter(match).order_by('-search_rank', '-created_at')
+
 
 def build_snippet_search_query(params):
     """
@@ -9,40 +143,36 @@ def build_snippet_search_query(params):
     Returns: Q object for filtering
     """
     query = Q()
-    
+
     # Text search
     if 'q' in params:
         search_term = params['q']
-        query &= (
-            Q(title__icontains=search_term) |
-            Q(description__icontains=search_term) |
-            Q(code_content__icontains=search_term) |
-            Q(tags__icontains=search_term)
-        )
-    
+        if is_full_text_search_available():
+            query &= Q(search_vector=SearchQuery(search_term, search_type='websearch', config=SEARCH_CONFIG))
+        else:
+            query &= _icontains_query(search_term)
+
     # Exact matches
     if 'language' in params:
         query &= Q(language__iexact=params['language'])
-    
+
     if 'difficulty' in params:
         query &= Q(difficulty=params['difficulty'])
-    
+
     if 'category' in params:
         query &= Q(category__slug__iexact=params['category'])
-    
+
     if 'output_type' in params:
         query &= Q(output_type__iexact=params['output_type'])
-    
+
     if 'is_featured' in params:
         query &= Q(is_featured=params['is_featured'])
-    
+
     # Tag filtering
     if 'tags' in params:
-        tags = [tag.strip().lower() for tag in params['tags'].split(',') if tag.strip()]
-        if tags:
-            tag_query = Q()
-            for tag in tags:
-                tag_query |= Q(tags__icontains=tag)
-            query &= tag_query
-    
+        query &= build_tag_filter(
+            params['tags'].split(','),
+            match_all=params.get('tag_match') == 'all'
+        )
+
     return query
@@ -543,13 +543,17 @@ from .models import (
     Comment,
     ShareActivity,
     UserHistory,
-    CodeRun
+    CodeRun,
+    Tag
 )
 # Import UserMinimalSerializer from your user_account app
 from user_account.serializers import UserMinimalSerializer 
 from django.utils import timezone
 from django.db.models import F
 from user_account.models import CustomUser
+from .services.view_buffer_services import is_view_buffer_enabled, record_view
+from .services.snippet_services import process_code_content
+from .services.transfer_services import SNIPPET_TRANSFER_FIELDS
 
 
 # Add this near the top of your serializers.py
@@ -623,6 +627,14 @@ class CategorySerializer(DynamicFieldsModelSerializer):
         return super().create(validated_data)
 
 
+class TagSerializer(serializers.ModelSerializer):
+    """Tag with its precomputed usage count"""
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'usage_count']
+        read_only_fields = fields
+
+
 class CodeSnippetSerializer(DynamicFieldsModelSerializer):
     url = serializers.HyperlinkedIdentityField(
         view_name='snippet-detail',
@@ -693,10 +705,10 @@ class CodeSnippetSerializer(DynamicFieldsModelSerializer):
         }
 
     def get_reaction_stats(self, obj):
-        """Calculate like/dislike counts"""
+        """Like/dislike counts from the denormalized counters"""
         return {
-            'likes': obj.reactions.filter(is_like=True).count(),
-            'dislikes': obj.reactions.filter(is_like=False).count()
+            'likes': obj.like_count,
+            'dislikes': obj.dislike_count
         }
 
     def get_user_has_reacted(self, obj):
@@ -884,32 +896,55 @@ class CommentSerializer(DynamicFieldsModelSerializer): # Or serializers.ModelSer
     )
     
     replies = serializers.SerializerMethodField()
+    reply_count = serializers.SerializerMethodField()
     user_vote = serializers.SerializerMethodField() # Placeholder for future voting feature
 
+    REPLY_FIELDS = ['id', 'user', 'text', 'created_at', 'parent', 'snippet']
+
     class Meta:
         model = Comment
         # 'snippet' is removed from fields because it's no longer provided directly by the client's request body
         fields = [
             'id', 'user', 'parent', 'text', 'is_resolved', 
-            'created_at', 'updated_at', 'replies', 'user_vote'
+            'created_at', 'updated_at', 'replies', 'reply_count', 'user_vote'
         ]
         # 'is_resolved' is typically not read-only so it can be updated
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'replies', 'user_vote'] 
+        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'replies', 'reply_count', 'user_vote'] 
+
+    def _get_reply_objects(self, obj):
+        # Trees assembled by load_comment_tree() carry their replies; otherwise query them once
+        if not hasattr(obj, 'tree_replies'):
+            obj.tree_replies = list(obj.replies.select_related('user'))
+        return obj.tree_replies
 
     def get_replies(self, obj):
         """
         Nested replies if they exist.
+        Renders `comment_depth` levels (context, default 1), each capped at `replies_limit` items.
         Uses self.__class__ for recursive serializer reference.
         """
-        if obj.replies.exists():
-            return self.__class__(
-                obj.replies.all(),
-                many=True,
-                context=self.context, # Pass context for nested serializers
-                # Ensure 'snippet' is included here for completeness when reading replies
-                fields=['id', 'user', 'text', 'created_at', 'parent', 'snippet'] 
-            ).data
-        return []
+        replies = self._get_reply_objects(obj)
+        if not replies:
+            return []
+
+        limit = self.context.get('replies_limit')
+        if limit is not None:
+            replies = replies[:limit]
+
+        remaining_depth = self.context.get('comment_depth', 1) - 1
+        fields = list(self.REPLY_FIELDS)
+        if remaining_depth > 0:
+            fields += ['replies', 'reply_count']
+        return self.__class__(
+            replies,
+            many=True,
+            context={**self.context, 'comment_depth': remaining_depth}, # Pass context for nested serializers
+            fields=fields
+        ).data
+
+    def get_reply_count(self, obj):
+        """Total number of direct replies (may exceed the rendered `replies` when limited)"""
+        return len(self._get_reply_objects(obj))
 
     def get_user_vote(self, obj):
         """
@@ -999,6 +1034,14 @@ class UserHistorySerializer(serializers.ModelSerializer):
             # For simplicity, we can perform one save here, but remember F() expressions
             # are evaluated at the database level during a save.
 
+        if is_view_buffer_enabled():
+            # The view itself is buffered and flushed later; only is_saved is written now
+            if 'is_saved' in validated_data:
+                instance.save(update_fields=['is_saved', 'saved_at'])
+            instance.view_count += record_view(instance.user_id, instance.snippet_id)
+            instance.last_viewed = timezone.now()
+            return instance
+
         # Always increment view count on update and update last_viewed
         # It's crucial to use F() for view_count to prevent race conditions.
         # last_viewed should be set to now.
@@ -1029,7 +1072,15 @@ class UserHistorySerializer(serializers.ModelSerializer):
             snippet=snippet,
             defaults={'view_count': 1, 'last_viewed': timezone.now()} # Defaults for new creation
         )
-        if not created:
+        if is_view_buffer_enabled():
+            # Repeat views are buffered (no write on the request); a new history row already
+            # counts this view, so only the snippet's last_accessed is recorded for it
+            pending = record_view(user.pk, snippet.pk, count_view=not created)
+            history.user, history.snippet = user, snippet  # Already loaded; spares the response two queries
+            if not created:
+                history.view_count += pending
+                history.last_viewed = timezone.now()
+        elif not created:
             # If history exists, update view count and last viewed
             history.view_count = F('view_count') + 1
             history.last_viewed = timezone.now()
@@ -1086,6 +1137,62 @@ class CodeRunSerializer(serializers.ModelSerializer):
     
     
 
+class EngagementEventSerializer(serializers.Serializer):
+    """
+    One event in a POST /events/batch/ payload. Validation needs no database access;
+    the snippet slugs of a whole batch are resolved together by the view.
+    """
+    TYPE_RUN = 'run'
+    TYPE_SHARE = 'share'
+    TYPE_VIEW = 'view'
+
+    type = serializers.ChoiceField(choices=[TYPE_RUN, TYPE_SHARE, TYPE_VIEW])
+    snippet = serializers.SlugField(max_length=255)
+    # run
+    was_modified = serializers.BooleanField(required=False, default=False)
+    execution_time = serializers.FloatField(required=False, allow_null=True, min_value=0)
+    # share
+    share_method = serializers.ChoiceField(
+        choices=ShareActivity.ShareMethod.choices,
+        required=False,
+        default=ShareActivity.ShareMethod.LINK
+    )
+    shared_to = serializers.CharField(max_length=255, required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, data):
+        request = self.context.get('request')
+        if data['type'] == self.TYPE_VIEW and not (request and request.user.is_authenticated):
+            raise ValidationError({"type": "Authentication is required to log views."})
+        return data
+
+
+class CodeSnippetTransferSerializer(serializers.ModelSerializer):
+    """
+    One line of an NDJSON snippet import (see services.transfer_services). Validation needs
+    no database access: categories are referenced by slug and resolved per batch, and the
+    slug is only a preference that is made unique when the batch is inserted.
+    """
+    category = serializers.SlugField(max_length=100, allow_null=True)
+    slug = serializers.SlugField(max_length=255, required=False, allow_blank=True)
+
+    class Meta:
+        model = CodeSnippet
+        fields = [*SNIPPET_TRANSFER_FIELDS, 'category']
+        # Code is imported verbatim; DRF would strip leading/trailing whitespace by default
+        extra_kwargs = {
+            'code_content': {'required': False, 'allow_blank': True, 'trim_whitespace': False},
+            'html_code': {'trim_whitespace': False},
+            'css_code': {'trim_whitespace': False},
+            'js_code': {'trim_whitespace': False},
+            'simulated_output': {'trim_whitespace': False},
+            'expected_result': {'trim_whitespace': False},
+        }
+
+    def validate(self, data):
+        # Same language rules and defaults as SnippetCreateView
+        return process_code_content(data)
+
+
 # ==================== OPTIMIZED LIST SERIALIZERS ====================
 
 class CodeSnippetListSerializer(DynamicFieldsModelSerializer):
@@ -1127,6 +1234,7 @@ class CodeSnippetListSerializer(DynamicFieldsModelSerializer):
             'thumbnail_image',
             'is_featured',
             'tags', # <--- Added
+            'code_preview',
             'created_at',
             'updated_at', # <--- Added
             'last_accessed', # <--- Added
@@ -1139,32 +1247,38 @@ class CodeSnippetListSerializer(DynamicFieldsModelSerializer):
         ]
         read_only_fields = [
             'id', 'slug', 'url', 'language_display', 'output_type_display',
-            'created_at', 'updated_at', 'last_accessed',
+            'code_preview', 'created_at', 'updated_at', 'last_accessed',
             'reaction_stats', 'comment_count', 'category_name', 
             'uploaded_by', 'user_has_reacted', 'user_history'
         ]
     
     def get_reaction_stats(self, obj):
-        """Calculate like/dislike counts (copied from CodeSnippetSerializer)"""
+        """Like/dislike counts from the denormalized counters"""
         return {
-            'likes': obj.reactions.filter(is_like=True).count(),
-            'dislikes': obj.reactions.filter(is_like=False).count()
+            'likes': obj.like_count,
+            'dislikes': obj.dislike_count
         }
 
     def get_user_has_reacted(self, obj):
-        """Check if current user has reacted (copied from CodeSnippetSerializer)"""
+        """Check if current user has reacted (uses the prefetched reaction when available)"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            reaction = obj.reactions.filter(user=request.user).first()
+            if hasattr(obj, 'current_user_reactions'):
+                reaction = next(iter(obj.current_user_reactions), None)
+            else:
+                reaction = obj.reactions.filter(user=request.user).first()
             if reaction:
                 return 'like' if reaction.is_like else 'dislike'
         return None
 
     def get_user_history(self, obj):
-        """Get user-specific interaction data (copied from CodeSnippetSerializer)"""
+        """Get user-specific interaction data (uses the prefetched history when available)"""
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            history = obj.user_history.filter(user=request.user).first()
+            if hasattr(obj, 'current_user_history'):
+                history = next(iter(obj.current_user_history), None)
+            else:
+                history = obj.user_history.filter(user=request.user).first()
             if history:
                 return {
                     'view_count': history.view_count,
@@ -1172,11 +1286,3 @@ class CodeSnippetListSerializer(DynamicFieldsModelSerializer):
                     'last_viewed': history.last_viewed
                 }
         return None
-
-
-class CategoryWithSnippetsSerializer(CategorySerializer):
-    """Includes nested snippets for category detail views"""
-    snippets = CodeSnippetListSerializer(many=True, read_only=True)
-
-    class Meta(CategorySerializer.Meta):
-        fields = CategorySerializer.Meta.fields + ['snippets']
\ No newline at end of file
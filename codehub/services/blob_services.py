@@ -0,0 +1,205 @@
+# codehub/services/blob_services.py
+
+import hashlib
+import json
+import logging
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+try:
+    import zstandard
+except ImportError:  # Optional; blobs are zlib-compressed without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_ZLIB = 'zlib'
+CODEC_ZSTD = 'zstd'
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def is_blob_store_enabled():
+    return getattr(settings, "CODEHUB_BLOB_STORE", False)
+
+
+def get_blob_min_size():
+    return getattr(settings, "CODEHUB_BLOB_MIN_SIZE", 16384)
+
+
+def get_placeholder(field):
+    """What the column holds while the body lives in a blob."""
+    return None if field.null else ''
+
+
+def is_placeholder(value):
+    return value is None or value == ''
+
+
+# ENCODING ---------------------------------------------------------------------------------------
+def encode_value(field, value):
+    if isinstance(field, models.JSONField):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return value.encode('utf-8')
+
+
+def decode_value(field, payload):
+    if isinstance(field, models.JSONField):
+        return json.loads(payload)
+    return payload.decode('utf-8')
+
+
+def compress_payload(payload):
+    """Returns: (codec, compressed bytes), zstd when available."""
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return CODEC_ZLIB, zlib.compress(payload, ZLIB_LEVEL)
+
+
+def decompress_payload(codec, data):
+    data = bytes(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("This blob is zstd-compressed; install zstandard to read it.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+# STORAGE ----------------------------------------------------------------------------------------
+def store_blobs(payloads):
+    """
+    Store {sha256: payload} in SnippetBlob. Payloads already stored (by this or any other
+    snippet) are neither compressed nor written again.
+    """
+    from ..models import SnippetBlob  # Imported locally to break circular dependency
+
+    if not payloads:
+        return
+    existing = set(
+        SnippetBlob.objects.filter(sha256__in=list(payloads)).values_list('sha256', flat=True)
+    )
+    new_blobs = []
+    for sha256, payload in payloads.items():
+        if sha256 in existing:
+            continue
+        codec, data = compress_payload(payload)
+        new_blobs.append(SnippetBlob(sha256=sha256, codec=codec, data=data, size=len(payload)))
+    # A concurrent save may store the same body first; identical content, so either row will do
+    SnippetBlob.objects.bulk_create(new_blobs, ignore_conflicts=True)
+
+
+def load_blob_values(instance):
+    """
+    Resolve every externalized body of a snippet with one query and cache the values on it.
+    Returns: {field: value}
+    """
+    load_blob_values_many([instance])
+    return instance.__dict__['_blob_values']
+
+
+def load_blob_values_many(instances):
+    """Resolve the externalized bodies of several snippets (e.g. an export chunk) with one query."""
+    from ..models import SnippetBlob  # Imported locally to break circular dependency
+
+    wanted = []
+    for instance in instances:
+        values = instance.__dict__.setdefault('_blob_values', {})
+        for name, sha256 in (instance.content_blobs or {}).items():
+            if name not in values:
+                wanted.append((instance, name, sha256))
+    if not wanted:
+        return
+
+    blobs = {
+        blob.sha256: blob
+        for blob in SnippetBlob.objects.filter(sha256__in={sha256 for _, _, sha256 in wanted})
+    }
+    for instance, name, sha256 in wanted:
+        field = instance._meta.get_field(name)
+        blob = blobs.get(sha256)
+        if blob is None:
+            logger.error(f"Blob {sha256} for {name} of snippet {instance.pk} is missing")
+            value = get_placeholder(field)
+        else:
+            value = decode_value(field, decompress_payload(blob.codec, blob.data))
+        instance.__dict__['_blob_values'][name] = value
+
+
+def plan_blob_fields(instance, fields=None, rewrite=False, enabled=None, min_size=None):
+    """
+    Decide where each loaded body of `instance` is stored before it is written.
+    Bodies of at least CODEHUB_BLOB_MIN_SIZE bytes go to the blob store (when it is enabled)
+    and leave a placeholder in their column; smaller ones are stored inline. Externalized
+    bodies that were not reassigned keep their blob, unless `rewrite` is set.
+    Updates the columns and instance.content_blobs in memory.
+    Returns: {sha256: payload} of the blobs the caller must store (see store_blobs)
+    """
+    enabled = is_blob_store_enabled() if enabled is None else enabled
+    min_size = get_blob_min_size() if min_size is None else min_size
+    data = instance.__dict__
+    refs = dict(instance.content_blobs or {})
+    dirty = data.get('_blob_dirty', set())
+    values = data.setdefault('_blob_values', {})
+    pending = {}
+
+    for name in instance.BLOB_FIELDS:
+        if name not in data or (fields is not None and name not in fields):
+            continue
+        field = instance._meta.get_field(name)
+        if name in refs and name not in dirty and not rewrite:
+            # A reloaded copy of the body may be in the column; the blob already holds it
+            if not is_placeholder(data[name]):
+                values[name] = data[name]
+            data[name] = get_placeholder(field)
+            continue
+
+        value = getattr(instance, name)
+        if enabled and not is_placeholder(value):
+            payload = encode_value(field, value)
+            if len(payload) >= min_size:
+                sha256 = hashlib.sha256(payload).hexdigest()
+                pending[sha256] = payload
+                refs[name] = sha256
+                values[name] = value
+                data[name] = get_placeholder(field)
+                continue
+        refs.pop(name, None)
+        values.pop(name, None)
+        data[name] = value
+
+    dirty.difference_update(instance.BLOB_FIELDS)
+    instance.content_blobs = refs
+    return pending
+
+
+def prepare_blob_fields(instance, fields=None):
+    """Externalize the large bodies of a snippet that is about to be saved."""
+    store_blobs(plan_blob_fields(instance, fields=fields))
+
+
+def prune_unused_blobs(created_before, batch_size=1000):
+    """
+    Delete blobs no snippet references any more. Only blobs created before `created_before`
+    are considered, so bodies stored by saves running concurrently are kept.
+    Returns: (deleted, in use)
+    """
+    from ..models import CodeSnippet, SnippetBlob  # Imported locally to break circular dependency
+
+    live = set()
+    refs = CodeSnippet.objects.exclude(content_blobs={}).values_list('content_blobs', flat=True)
+    for snippet_refs in refs.iterator(chunk_size=batch_size):
+        live.update((snippet_refs or {}).values())
+
+    stale = [
+        pk for pk, sha256 in SnippetBlob.objects.filter(created_at__lt=created_before)
+        .values_list('pk', 'sha256').iterator(chunk_size=batch_size)
+        if sha256 not in live
+    ]
+    for start in range(0, len(stale), batch_size):
+        SnippetBlob.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+    return len(stale), len(live)
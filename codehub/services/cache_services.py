@@ -0,0 +1,174 @@
+# codehub/services/cache_services.py
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+CACHE_PREFIX = "codehub"
+
+# Tags shared by every cached page of a given endpoint
+SNIPPET_LIST_TAG = "snippets"
+CATEGORY_LIST_TAG = "categories"
+TAG_LIST_TAG = "tags"
+
+
+def snippet_tag(snippet_id):
+    return f"snippet:{snippet_id}"
+
+
+def category_tag(category_slug):
+    return f"category:{category_slug}"
+
+
+def comments_tag(snippet_id):
+    return f"comments:{snippet_id}"
+
+
+def _tag_key(tag):
+    return f"{CACHE_PREFIX}:tag:{tag}"
+
+
+def _new_version():
+    # Time-based so a tag that was evicted and re-created never matches an old entry;
+    # it also doubles as the tag's last-modified time for conditional GETs
+    return time.time_ns()
+
+
+def get_response_cache_timeout():
+    return getattr(settings, "CODEHUB_RESPONSE_CACHE_TIMEOUT", 300)
+
+
+def build_response_cache_key(request, view_name, view_kwargs=None):
+    """
+    Build a cache key for a list response.
+    The key covers the view, its URL kwargs, host/scheme (hyperlinked fields are absolute)
+    and the normalized query params, which carry filters, search, ordering and page.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+        if value != ""
+    )
+    raw = repr((
+        view_name,
+        sorted((view_kwargs or {}).items()),
+        request.scheme,
+        request.get_host(),
+        params,
+    ))
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"{CACHE_PREFIX}:response:{view_name}:{digest}"
+
+
+def get_tag_versions(tags, missing_version=None):
+    """
+    Returns {tag: version}, initializing missing tags with `missing_version` (default: a
+    fresh version).
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+    missing = {key: missing_version or _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def get_cached_response(cache_key):
+    """
+    Returns cached response data, or None if missing or any of its tags was invalidated.
+    """
+    entry = cache.get(cache_key)
+    if not entry:
+        return None
+    if get_tag_versions(entry["tags"]) != entry["tags"]:
+        return None
+    return entry["data"]
+
+
+def start_response_build(tags):
+    """
+    Snapshot the versions of `tags` before a response is built from the database.
+    Returns: (versions, build start) for set_cached_response.
+    """
+    started = _new_version()
+    return get_tag_versions(set(tags)), started
+
+
+def set_cached_response(cache_key, data, snapshot, extra_tags=()):
+    """
+    Store response data under the tag versions of `snapshot` (see start_response_build),
+    so an invalidation committed while the data was built leaves the entry stale.
+    `extra_tags` are tags only known once the data is built (e.g. the snippets on a page);
+    the entry is not stored if one of them was invalidated after the build started.
+    Returns: True if the entry was stored.
+    """
+    versions, started = snapshot
+    versions = dict(versions)
+    if extra_tags:
+        # A tag missing now was not bumped during the build, so it takes the build start
+        extra_versions = get_tag_versions(set(extra_tags) - set(versions), missing_version=started)
+        if any(version > started for version in extra_versions.values()):
+            return False
+        versions.update(extra_versions)
+    cache.set(
+        cache_key,
+        {"data": data, "tags": versions},
+        timeout=get_response_cache_timeout(),
+    )
+    return True
+
+
+def invalidate_cache_tags(*tags):
+    """
+    Bump the version of each tag after the current transaction commits,
+    so every cached response carrying one of them is treated as stale.
+    """
+    tags = {tag for tag in tags if tag}
+    if not tags:
+        return
+
+    def _bump():
+        cache.set_many({_tag_key(tag): _new_version() for tag in tags}, timeout=None)
+
+    transaction.on_commit(_bump)
+
+
+# CONDITIONAL GET ------------------------------------------------------------------------------
+def get_cached_response_tags(cache_key):
+    """Returns the tags of a cached response, or None if nothing is cached under the key."""
+    entry = cache.get(cache_key)
+    return list(entry["tags"]) if entry else None
+
+
+def _lookup_key(name, value):
+    return f"{CACHE_PREFIX}:lookup:{name}:{value}"
+
+
+def get_cached_lookup(name, value):
+    """
+    Returns a remembered id (e.g. the snippet id behind a slug), or None.
+    Lookups may be stale; they only pick which tags to check, and a stale one
+    yields a validator that no client holds.
+    """
+    return cache.get(_lookup_key(name, value))
+
+
+def set_cached_lookup(name, value, result):
+    cache.set(_lookup_key(name, value), result, timeout=None)
+
+
+def get_conditional_validators(cache_key, tags):
+    """
+    Build the validators for a response that depends on `tags`, from their cached versions only.
+    Returns: (weak ETag, Last-Modified as a Unix timestamp)
+    """
+    versions = get_tag_versions(set(tags))
+    raw = repr((cache_key, sorted(versions.items())))
+    etag = f'W/"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+    return etag, max(versions.values()) // 10 ** 9
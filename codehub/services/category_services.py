@@ -40,6 +40,7 @@ from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 from ..models import Category
 from django.db import models
+from src.utils.unique import allocate_unique_value
 
 
 def validate_category_name(name, instance=None):
@@ -52,25 +53,27 @@ def validate_category_name(name, instance=None):
     if qs.exists():
         raise ValidationError("A category with this name already exists.")
 
-def generate_category_slug(name):
+def generate_category_slug(name, existing_id=None):
     """
     Generate a unique slug from category name with collision handling
     """
-    slug = slugify(name)
-    unique_slug = slug
-    num = 1
-    while Category.objects.filter(slug=unique_slug).exists():
-        unique_slug = f"{slug}-{num}"
-        num += 1
-    return unique_slug
-
-def get_category_with_stats(category):
+    return allocate_unique_value(
+        Category.objects.all(),
+        'slug',
+        slugify(name),
+        exclude_pk=existing_id,
+        max_length=Category._meta.get_field('slug').max_length,
+        fallback='category',
+    )
+
+def get_category_with_stats(category, context=None):
     """
     Enhanced to include more statistics and filter capabilities
+    (`context` is the serializer context; hyperlinked fields need the request)
     """
     from ..serializers import CategorySerializer
     
-    data = CategorySerializer(category).data
+    data = CategorySerializer(category, context=context or {}).data
     data['snippet_count'] = category.snippets.count()
     data['featured_snippet_count'] = category.snippets.filter(is_featured=True).count()
     
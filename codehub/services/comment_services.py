@@ -0,0 +1,48 @@
+# codehub/services/comment_services.py
+
+from collections import defaultdict
+
+DEFAULT_COMMENT_DEPTH = 1
+MAX_COMMENT_DEPTH = 10
+
+
+def load_comment_tree(comments, snippet_id, depth=DEFAULT_COMMENT_DEPTH):
+    """
+    Attach the reply tree below `comments` in memory, using one query for all replies.
+
+    Each loaded comment gets a `tree_replies` list (newest first, like Comment.Meta.ordering)
+    which CommentSerializer uses instead of querying `obj.replies`.
+    Args:
+        comments (list[Comment]): The comments being rendered (e.g. one page of top-level comments).
+        snippet_id: The snippet the thread belongs to.
+        depth (int): Number of reply levels that will be rendered below `comments`.
+    Returns:
+        list[Comment]: `comments`, with the tree attached.
+    """
+    from ..models import Comment  # Imported locally to break circular dependency
+
+    comments = list(comments)
+    if not comments or depth < 1:
+        return comments
+
+    replies = Comment.objects.select_related('user').order_by('-created_at', '-id')
+    if depth == 1:
+        # Only the direct replies are rendered, so only those are fetched
+        replies = replies.filter(parent_id__in=[comment.pk for comment in comments])
+    else:
+        # Deeper trees: fetch the whole thread flat and assemble it in memory
+        replies = replies.filter(snippet_id=snippet_id, parent__isnull=False)
+
+    children = defaultdict(list)
+    for reply in replies:
+        children[reply.parent_id].append(reply)
+
+    pending = list(comments)
+    for _ in range(depth):
+        next_level = []
+        for comment in pending:
+            comment.tree_replies = children.get(comment.pk, [])
+            next_level.extend(comment.tree_replies)
+        pending = next_level
+
+    return comments
@@ -0,0 +1,127 @@
+# codehub/services/event_services.py
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .view_buffer_services import is_view_buffer_enabled, record_view
+
+MAX_EVENTS_PER_BATCH = 100
+
+
+def ingest_events(events, context):
+    """
+    Validate and store a batch of mixed engagement events (run, share, view).
+
+    All slugs are resolved with one query, runs and shares are written with one
+    bulk_create each, and the snippet counters are adjusted with one UPDATE.
+    Args:
+        events (list[dict]): Raw event payloads.
+        context (dict): Serializer context; must contain the request.
+    Returns:
+        list[dict]: One result per event, in order: {"index", "status": "created"} or
+        {"index", "status": "error", "errors"}.
+    """
+    # Imported locally to break circular dependency
+    from ..models import CodeRun, CodeSnippet, ShareActivity, bump_snippet_counters_many
+    from ..serializers import EngagementEventSerializer
+
+    request = context['request']
+    user = request.user if request.user.is_authenticated else None
+    ip_address = request.META.get('REMOTE_ADDR')
+    user_agent = request.META.get('HTTP_USER_AGENT')
+
+    results = []
+    valid = []
+    for index, payload in enumerate(events):
+        serializer = EngagementEventSerializer(data=payload, context=context)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+            results.append({"index": index, "status": "created"})
+        else:
+            results.append({"index": index, "status": "error", "errors": serializer.errors})
+
+    snippet_ids = dict(
+        CodeSnippet.objects.filter(slug__in={event['snippet'] for _, event in valid})
+        .values_list('slug', 'id')
+    ) if valid else {}
+
+    runs, shares, views = [], [], Counter()
+    for index, event in valid:
+        snippet_id = snippet_ids.get(event['snippet'])
+        if snippet_id is None:
+            results[index] = {"index": index, "status": "error", "errors": {"snippet": ["Snippet not found."]}}
+        elif event['type'] == EngagementEventSerializer.TYPE_RUN:
+            runs.append(CodeRun(
+                snippet_id=snippet_id,
+                user=user,
+                was_modified=event['was_modified'],
+                execution_time=event.get('execution_time'),
+                user_agent=user_agent,
+                ip_address=ip_address,
+            ))
+        elif event['type'] == EngagementEventSerializer.TYPE_SHARE:
+            shares.append(ShareActivity(
+                snippet_id=snippet_id,
+                user=user,
+                share_method=event['share_method'],
+                shared_to=event.get('shared_to'),
+                ip_address=ip_address,
+            ))
+        else:
+            views[snippet_id] += 1
+
+    # bulk_create and update() bypass the counter receivers, so deltas are applied here
+    deltas = defaultdict(dict)
+    with transaction.atomic():
+        if runs:
+            CodeRun.objects.bulk_create(runs)
+            for snippet_id, count in Counter(run.snippet_id for run in runs).items():
+                deltas[snippet_id]['run_count'] = count
+        if shares:
+            ShareActivity.objects.bulk_create(shares)
+            for snippet_id, count in Counter(share.snippet_id for share in shares).items():
+                deltas[snippet_id]['share_count'] = count
+        if views:
+            for snippet_id, count in _store_views(user, views).items():
+                deltas[snippet_id]['view_count'] = count
+        bump_snippet_counters_many(deltas)
+
+    return results
+
+
+def _store_views(user, views):
+    """
+    Returns: {snippet_id: views written now} (buffered views are counted at flush time).
+    """
+    from ..models import UserHistory  # Imported locally to break circular dependency
+
+    existing = set(
+        UserHistory.objects.filter(user=user, snippet_id__in=list(views))
+        .values_list('snippet_id', flat=True)
+    )
+    now = timezone.now()
+    new = {snippet_id: count for snippet_id, count in views.items() if snippet_id not in existing}
+    if new:
+        UserHistory.objects.bulk_create(
+            [UserHistory(user=user, snippet_id=snippet_id, view_count=count, last_viewed=now)
+             for snippet_id, count in new.items()],
+            ignore_conflicts=True
+        )
+
+    written = dict(new)
+    for snippet_id in existing:
+        if is_view_buffer_enabled():
+            for _ in range(views[snippet_id]):
+                record_view(user.pk, snippet_id)
+        else:
+            UserHistory.objects.filter(user=user, snippet_id=snippet_id).update(
+                view_count=F('view_count') + views[snippet_id], last_viewed=now
+            )
+            written[snippet_id] = views[snippet_id]
+    if is_view_buffer_enabled():
+        for snippet_id in new:
+            record_view(user.pk, snippet_id, count_view=False)
+    return written
@@ -0,0 +1,57 @@
+# codehub/services/queryset_services.py
+
+from django.db.models import Prefetch
+
+# Columns CodeSnippetListSerializer reads; the code bodies and other heavy columns stay in
+# the database (see CodeSnippet.HEAVY_CONTENT_FIELDS)
+SNIPPET_LIST_FIELDS = (
+    'id', 'title', 'slug', 'description', 'short_description', 'language', 'output_type',
+    'difficulty', 'thumbnail_image', 'is_featured', 'tags', 'code_preview',
+    'created_at', 'updated_at', 'last_accessed',
+    'like_count', 'dislike_count', 'comment_count',
+    'category__name',
+    'uploaded_by__email', 'uploaded_by__username', 'uploaded_by__first_name',
+    'uploaded_by__last_name', 'uploaded_by__profile_picture',
+)
+
+
+def get_snippet_list_queryset(user=None, queryset=None):
+    """
+    Build the queryset used by the public snippet list endpoints.
+
+    - like/dislike/comment counts are read from the denormalized counter columns
+    - category and uploader are joined with select_related
+    - only the columns in SNIPPET_LIST_FIELDS are selected
+    - the current user's reaction and history are attached through filtered
+      prefetches (`current_user_reactions` / `current_user_history`)
+
+    A page therefore costs a constant number of queries regardless of size.
+    Args:
+        user: The requesting user (anonymous users get no per-user prefetches).
+        queryset: Optional base queryset (e.g. `category.snippets.all()`).
+    Returns:
+        QuerySet[CodeSnippet]
+    """
+    from ..models import CodeSnippet, Reaction, UserHistory  # Avoid circular import
+
+    if queryset is None:
+        queryset = CodeSnippet.objects.all()
+
+    queryset = queryset.select_related('category', 'uploaded_by').only(*SNIPPET_LIST_FIELDS)
+
+    if user is not None and user.is_authenticated:
+        queryset = queryset.prefetch_related(
+            Prefetch(
+                'reactions',
+                queryset=Reaction.objects.filter(user=user),
+                to_attr='current_user_reactions',
+            ),
+            Prefetch(
+                'user_history',
+                queryset=UserHistory.objects.filter(user=user),
+                to_attr='current_user_history',
+            ),
+        )
+
+    return queryset
+
@@ -0,0 +1,132 @@
+# codehub/services/render_services.py
+
+import hashlib
+import logging
+
+from django.conf import settings
+from markdown_it import MarkdownIt
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+logger = logging.getLogger(__name__)
+
+# Bump to re-render everything after changing the lexers, formatter or Markdown options
+RENDER_VERSION = 1
+
+# CodeSnippet.language -> Pygments lexer for code_content
+LANGUAGE_LEXERS = {
+    'python': 'python',
+    'django': 'python',
+    'java': 'java',
+    'cpp': 'cpp',
+    'cee': 'c',
+    'go': 'go',
+    'rust': 'rust',
+    'javascript': 'javascript',
+    'react': 'jsx',
+    'html': 'html',
+    'css': 'css',
+}
+
+# The web fields always hold the same language, whatever the snippet's language is
+FIELD_LEXERS = {
+    'html_code': 'html',
+    'css_code': 'css',
+    'js_code': 'javascript',
+}
+
+CODE_FIELDS = ('code_content', 'html_code', 'css_code', 'js_code')
+MARKDOWN_FIELDS = ('description',)
+RENDERED_FIELDS = CODE_FIELDS + MARKDOWN_FIELDS
+
+# Class-based output; clients style it with any Pygments stylesheet scoped to .highlight
+CODE_FORMATTER = HtmlFormatter(cssclass='highlight', wrapcode=True)
+
+# Raw HTML in descriptions is escaped and unsafe link schemes (javascript:, vbscript:,
+# file:, non-image data:) are dropped by markdown-it's link validation
+MARKDOWN = MarkdownIt('commonmark', {'html': False}).enable(['table', 'strikethrough'])
+
+
+def is_render_on_save_enabled():
+    return getattr(settings, "CODEHUB_RENDER_ON_SAVE", True)
+
+
+def _get_lexer_name(snippet, field):
+    if field in FIELD_LEXERS:
+        return FIELD_LEXERS[field]
+    return LANGUAGE_LEXERS.get(snippet.language, 'text')
+
+
+def get_render_sources(snippet):
+    """
+    Returns: {field: (content_hash, renderer, source)} for every non-empty rendered field.
+    The hash covers the render version, the renderer (lexer or "markdown") and the source,
+    so it only changes when the output would.
+    """
+    sources = {}
+    for field in RENDERED_FIELDS:
+        source = getattr(snippet, field)
+        if not source:
+            continue
+        renderer = 'markdown' if field in MARKDOWN_FIELDS else f"pygments:{_get_lexer_name(snippet, field)}"
+        raw = f"{RENDER_VERSION}\0{renderer}\0{source}"
+        sources[field] = (hashlib.sha256(raw.encode('utf-8')).hexdigest(), renderer, source)
+    return sources
+
+
+def render_source(renderer, source):
+    if renderer == 'markdown':
+        return MARKDOWN.render(source)
+    try:
+        lexer = get_lexer_by_name(renderer.split(':', 1)[1], stripnl=False)
+    except ClassNotFound:
+        lexer = get_lexer_by_name('text')
+    return highlight(source, lexer, CODE_FORMATTER)
+
+
+def get_rendered_fields(snippet):
+    """
+    Highlighted HTML for each code field and sanitized HTML for the description.
+    Renders are stored in RenderedContent by content hash: unchanged revisions (and identical
+    content in other snippets) are read back with one query, and only new sources are rendered.
+    Returns: {field: html} for the non-empty fields
+    """
+    from ..models import RenderedContent  # Imported locally to break circular dependency
+
+    sources = get_render_sources(snippet)
+    if not sources:
+        return {}
+
+    stored = dict(
+        RenderedContent.objects.filter(content_hash__in=[h for h, _, _ in sources.values()])
+        .values_list('content_hash', 'html')
+    )
+    missing = {}
+    for content_hash, renderer, source in sources.values():
+        if content_hash not in stored and content_hash not in missing:
+            missing[content_hash] = render_source(renderer, source)
+    if missing:
+        # Concurrent first reads may render the same source; the first insert wins
+        RenderedContent.objects.bulk_create(
+            [RenderedContent(content_hash=h, html=html) for h, html in missing.items()],
+            ignore_conflicts=True
+        )
+        stored.update(missing)
+
+    return {field: stored[content_hash] for field, (content_hash, _, _) in sources.items()}
+
+
+def render_snippet(snippet_id):
+    """Pre-render a snippet after it was saved, so the first `?rendered=1` read is a cache hit."""
+    from ..models import CodeSnippet  # Imported locally to break circular dependency
+
+    snippet = CodeSnippet.objects.filter(pk=snippet_id).only('language', 'content_blobs', *RENDERED_FIELDS).first()
+    if snippet is None:
+        return
+    try:
+        get_rendered_fields(snippet)
+    except Exception as e:
+        # Rendering is an optimisation; the read path renders on demand if this failed
+        logger.error(f"Pre-rendering snippet {snippet_id} failed: {str(e)}", exc_info=True)
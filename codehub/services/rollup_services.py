@@ -0,0 +1,191 @@
+# codehub/services/rollup_services.py
+
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+RUNS_ROLLUP = 'daily_runs'
+SHARES_ROLLUP = 'daily_shares'
+
+MAX_SERIES_DAYS = 366
+DEFAULT_SERIES_DAYS = 30
+
+RollupSpec = namedtuple('RollupSpec', 'name source time_field keys aggregates target')
+
+
+def get_rollup_specs():
+    from ..models import CodeRun, DailySnippetRuns, DailySnippetShares, ShareActivity  # Imported locally to break circular dependency
+
+    return {
+        RUNS_ROLLUP: RollupSpec(
+            name=RUNS_ROLLUP,
+            source=CodeRun,
+            time_field='run_at',
+            keys=('snippet_id', 'day'),
+            aggregates={
+                'run_count': Count('pk'),
+                'modified_run_count': Count('pk', filter=Q(was_modified=True)),
+            },
+            target=DailySnippetRuns,
+        ),
+        SHARES_ROLLUP: RollupSpec(
+            name=SHARES_ROLLUP,
+            source=ShareActivity,
+            time_field='shared_at',
+            keys=('snippet_id', 'day', 'share_method'),
+            aggregates={'share_count': Count('pk')},
+            target=DailySnippetShares,
+        ),
+    }
+
+
+def _merge_window(spec, start_id, end_id):
+    """Fold raw rows with start_id < id <= end_id into the rollup table."""
+    rows = list(
+        spec.source.objects.filter(pk__gt=start_id, pk__lte=end_id)
+        .annotate(day=TruncDate(spec.time_field))
+        .values(*spec.keys)
+        .annotate(**spec.aggregates)
+        .order_by()
+    )
+    if not rows:
+        return 0
+
+    def key_of(item):
+        return tuple(item[key] if isinstance(item, dict) else getattr(item, key) for key in spec.keys)
+
+    existing = {
+        key_of(rollup): rollup
+        for rollup in spec.target.objects.filter(
+            snippet_id__in={row['snippet_id'] for row in rows},
+            day__in={row['day'] for row in rows},
+        )
+    }
+    to_update, to_create = [], []
+    for row in rows:
+        rollup = existing.get(key_of(row))
+        if rollup is None:
+            to_create.append(spec.target(**row))
+            continue
+        for field in spec.aggregates:
+            setattr(rollup, field, getattr(rollup, field) + row[field])
+        to_update.append(rollup)
+
+    if to_update:
+        spec.target.objects.bulk_update(to_update, list(spec.aggregates))
+    if to_create:
+        spec.target.objects.bulk_create(to_create)
+    return len(rows)
+
+
+def run_rollup(name, batch_size=50000, progress=None):
+    """
+    Fold new raw rows (id above the watermark) into a rollup table, `batch_size` ids per
+    transaction. Rows younger than CODEHUB_ROLLUP_SETTLE_SECONDS are left for the next run,
+    so a transaction that commits a lower id late is not skipped.
+    Returns: number of raw rows covered.
+    """
+    from ..models import RollupWatermark  # Imported locally to break circular dependency
+
+    spec = get_rollup_specs()[name]
+    RollupWatermark.objects.get_or_create(name=name)
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'CODEHUB_ROLLUP_SETTLE_SECONDS', 60))
+
+    start_id = RollupWatermark.objects.get(name=name).last_id
+    upper_id = spec.source.objects.filter(
+        pk__gt=start_id, **{f'{spec.time_field}__lte': cutoff}
+    ).aggregate(upper=Max('pk'))['upper']
+    if upper_id is None:
+        return 0
+
+    covered = 0
+    while True:
+        with transaction.atomic():
+            # The row lock serializes concurrent runs; each window starts from the committed watermark
+            watermark = RollupWatermark.objects.select_for_update().get(name=name)
+            start_id = watermark.last_id
+            if start_id >= upper_id:
+                break
+            end_id = min(start_id + batch_size, upper_id)
+            groups = _merge_window(spec, start_id, end_id)
+            watermark.last_id = end_id
+            watermark.save(update_fields=['last_id', 'updated_at'])
+        covered += end_id - start_id
+        if progress:
+            progress(name, end_id, upper_id, groups)
+    return covered
+
+
+def reset_rollup(name):
+    """Empty a rollup table and its watermark so the next run rebuilds it from scratch."""
+    from ..models import RollupWatermark  # Imported locally to break circular dependency
+
+    spec = get_rollup_specs()[name]
+    with transaction.atomic():
+        spec.target.objects.all().delete()
+        RollupWatermark.objects.filter(name=name).update(last_id=0)
+
+
+# READ API ---------------------------------------------------------------------------------------
+def get_series_range(start=None, end=None):
+    """
+    Resolve the requested date range (inclusive), defaulting to the last 30 days.
+    Raises ValueError if the range is inverted or longer than MAX_SERIES_DAYS.
+    """
+    end = end or timezone.localdate()
+    start = start or end - timedelta(days=DEFAULT_SERIES_DAYS - 1)
+    if start > end:
+        raise ValueError("start must not be after end.")
+    if (end - start).days + 1 > MAX_SERIES_DAYS:
+        raise ValueError(f"The range may span at most {MAX_SERIES_DAYS} days.")
+    return start, end
+
+
+def _days(start, end):
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def get_rollup_updated_at(name):
+    from ..models import RollupWatermark  # Imported locally to break circular dependency
+
+    return RollupWatermark.objects.filter(name=name).values_list('updated_at', flat=True).first()
+
+
+def get_run_series(start, end, snippet_slug=None):
+    from ..models import DailySnippetRuns  # Imported locally to break circular dependency
+
+    rollups = DailySnippetRuns.objects.filter(day__range=(start, end))
+    if snippet_slug:
+        rollups = rollups.filter(snippet__slug=snippet_slug)
+    totals = {
+        row['day']: row
+        for row in rollups.values('day').annotate(
+            runs=Sum('run_count'), modified_runs=Sum('modified_run_count')
+        ).order_by()
+    }
+    return [
+        totals.get(day, {'day': day, 'runs': 0, 'modified_runs': 0})
+        for day in _days(start, end)
+    ]
+
+
+def get_share_series(start, end, snippet_slug=None, share_method=None):
+    from ..models import DailySnippetShares  # Imported locally to break circular dependency
+
+    rollups = DailySnippetShares.objects.filter(day__range=(start, end))
+    if snippet_slug:
+        rollups = rollups.filter(snippet__slug=snippet_slug)
+    if share_method:
+        rollups = rollups.filter(share_method=share_method)
+
+    series = {day: {'day': day, 'shares': 0, 'by_method': {}} for day in _days(start, end)}
+    for row in rollups.values('day', 'share_method').annotate(shares=Sum('share_count')).order_by():
+        point = series[row['day']]
+        point['shares'] += row['shares']
+        point['by_method'][row['share_method']] = row['shares']
+    return list(series.values())
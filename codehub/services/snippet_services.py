@@ -3,7 +3,7 @@
 
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
-from django.db import models
+from src.utils.unique import allocate_unique_value
 # from ..models import CodeSnippet, Category # Removed to break circular import
 
 def generate_snippet_slug(title, existing_id=None):
@@ -17,20 +17,33 @@ def generate_snippet_slug(title, existing_id=None):
     """
     from ..models import CodeSnippet # Imported locally to break circular dependency
 
-    base_slug = slugify(title)
-    unique_slug = base_slug
-    num = 1
+    return allocate_unique_value(
+        CodeSnippet.objects.all(),
+        'slug',
+        slugify(title),
+        exclude_pk=existing_id,
+        max_length=CodeSnippet._meta.get_field('slug').max_length,
+        fallback='snippet',
+    )
 
-    while True:
-        qs = CodeSnippet.objects.filter(slug=unique_slug)
-        if existing_id:
-            qs = qs.exclude(id=existing_id)
-        if not qs.exists():
-            break
-        unique_slug = f"{base_slug}-{num}"
-        num += 1
-
-    return unique_slug
+def build_code_preview(snippet, max_lines=10):
+    """
+    Build the stored code preview: the first `max_lines` lines of the first non-empty
+    code field, cut to fit CodeSnippet.code_preview.
+    Returns: str ("" if the snippet has no code)
+    """
+    max_length = snippet._meta.get_field('code_preview').max_length
+    code = next(
+        (value for value in (getattr(snippet, field) for field in snippet.CODE_PREVIEW_SOURCE_FIELDS) if value),
+        ''
+    )
+    lines = code.strip('\n').splitlines()
+    preview = '\n'.join(lines[:max_lines])
+    if len(preview) > max_length:
+        preview = preview[:max_length - 3]
+    elif len(lines) <= max_lines:
+        return preview
+    return preview + '...'
 
 def process_code_content(data):
     """
@@ -80,25 +93,26 @@ def process_code_content(data):
 
     return data
 
-def get_snippet_with_engagement(snippet):
+def get_snippet_with_engagement(snippet, context=None):
     """
-    Returns enriched snippet data with engagement stats
+    Returns enriched snippet data with engagement stats.
+    Stats come from the denormalized counters on CodeSnippet, so no aggregate queries run here.
+    Args:
+        context (dict, optional): Serializer context; hyperlinked fields need the request.
     Returns: dict
     """
     from ..serializers import CodeSnippetSerializer # Imported here to avoid circular dependency
 
-    data = CodeSnippetSerializer(snippet).data
+    data = CodeSnippetSerializer(snippet, context=context or {}).data
 
     # Engagement stats
-    reactions = snippet.reactions.all()
     data.update({
-        'like_count': reactions.filter(is_like=True).count(),
-        'dislike_count': reactions.filter(is_like=False).count(),
-        'comment_count': snippet.comments.count(),
-        'view_count': snippet.user_history.aggregate(
-            total_views=models.Sum('view_count')
-        )['total_views'] or 0,
-        'run_count': snippet.runs.count()
+        'like_count': snippet.like_count,
+        'dislike_count': snippet.dislike_count,
+        'comment_count': snippet.comment_count,
+        'view_count': snippet.view_count,
+        'run_count': snippet.run_count,
+        'share_count': snippet.share_count
     })
 
-    return data
\ No newline at end of file
+    return data
@@ -0,0 +1,126 @@
+# codehub/services/tag_services.py
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+
+from .cache_services import invalidate_cache_tags, TAG_LIST_TAG
+
+TAG_MAX_LENGTH = 50
+
+
+def parse_tags(value):
+    """
+    Split a comma-separated tag string into normalized, de-duplicated names.
+    e.g. "Python, API,python" -> ["python", "api"]
+    """
+    names = []
+    for raw in (value or '').split(','):
+        name = raw.strip().lower()[:TAG_MAX_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def sync_snippet_tags(snippet):
+    """
+    Bring the snippet's Tag relations and the tags' usage counts in line with `snippet.tags`.
+    Removed relations are decremented by the SnippetTag post_delete receiver.
+    """
+    from ..models import CodeSnippet, Tag, SnippetTag  # Imported locally to break circular dependency
+
+    names = parse_tags(snippet.tags)
+    with transaction.atomic():
+        # Serializes concurrent syncs of this snippet, so the links read below are the
+        # ones the insert runs against and only links that are really added get counted
+        list(CodeSnippet.objects.select_for_update().filter(pk=snippet.pk).values_list('pk'))
+        current = dict(
+            SnippetTag.objects.filter(snippet=snippet).values_list('tag__name', 'id')
+        )
+
+        removed = [link_id for name, link_id in current.items() if name not in names]
+        if removed:
+            SnippetTag.objects.filter(pk__in=removed).delete()
+
+        added = [name for name in names if name not in current]
+        if added:
+            Tag.objects.bulk_create([Tag(name=name) for name in added], ignore_conflicts=True)
+            tag_ids = list(Tag.objects.filter(name__in=added).values_list('id', flat=True))
+            SnippetTag.objects.bulk_create(
+                [SnippetTag(snippet=snippet, tag_id=tag_id) for tag_id in tag_ids]
+            )
+            Tag.objects.filter(pk__in=tag_ids).update(usage_count=F('usage_count') + 1)
+            invalidate_cache_tags(TAG_LIST_TAG)
+
+
+def sync_new_snippet_tags(snippets):
+    """
+    Bulk form of sync_snippet_tags for snippets that were just inserted (e.g. with
+    bulk_create, which skips the post_save receiver). Only links the snippets do not
+    have yet are inserted and counted.
+    """
+    from ..models import CodeSnippet, Tag, SnippetTag  # Imported locally to break circular dependency
+
+    names_by_snippet = {snippet.pk: parse_tags(snippet.tags) for snippet in snippets}
+    all_names = {name for names in names_by_snippet.values() for name in names}
+    if not all_names:
+        return
+
+    with transaction.atomic():
+        Tag.objects.bulk_create([Tag(name=name) for name in all_names], ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.filter(name__in=all_names).values_list('name', 'id'))
+
+        # Locked like sync_snippet_tags, so a concurrent sync cannot add the same links
+        list(
+            CodeSnippet.objects.select_for_update().filter(pk__in=names_by_snippet)
+            .order_by('pk').values_list('pk')
+        )
+        existing = set(
+            SnippetTag.objects.filter(snippet_id__in=names_by_snippet)
+            .values_list('snippet_id', 'tag_id')
+        )
+        new_links = [
+            (snippet_id, tag_ids[name])
+            for snippet_id, names in names_by_snippet.items()
+            for name in names
+            if (snippet_id, tag_ids[name]) not in existing
+        ]
+        if not new_links:
+            return
+        SnippetTag.objects.bulk_create(
+            [SnippetTag(snippet_id=snippet_id, tag_id=tag_id) for snippet_id, tag_id in new_links]
+        )
+
+        # One UPDATE per distinct increment rather than one per tag
+        usage = Counter(tag_id for _, tag_id in new_links)
+        tags_by_increment = defaultdict(list)
+        for tag_id, count in usage.items():
+            tags_by_increment[count].append(tag_id)
+        for count, ids in tags_by_increment.items():
+            Tag.objects.filter(pk__in=ids).update(usage_count=F('usage_count') + count)
+    invalidate_cache_tags(TAG_LIST_TAG)
+
+
+def build_tag_filter(tags, match_all=False):
+    """
+    Q object matching snippets tagged with any (default) or all of `tags`.
+    Each condition is an EXISTS over the indexed (tag, snippet) through table.
+    """
+    from ..models import SnippetTag  # Imported locally to break circular dependency
+
+    names = parse_tags(','.join(tags))
+    if not names:
+        return Q()
+
+    def tagged_with(*candidates):
+        return Exists(
+            SnippetTag.objects.filter(snippet=OuterRef('pk'), tag__name__in=candidates)
+        )
+
+    if match_all:
+        query = Q()
+        for name in names:
+            query &= Q(tagged_with(name))
+        return query
+    return Q(tagged_with(*names))
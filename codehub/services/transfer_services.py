@@ -0,0 +1,203 @@
+# codehub/services/transfer_services.py
+
+import json
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from .blob_services import load_blob_values_many, plan_blob_fields, store_blobs
+from .cache_services import invalidate_cache_tags, category_tag, CATEGORY_LIST_TAG, SNIPPET_LIST_TAG
+from src.utils.unique import allocate_unique_values
+from .snippet_services import build_code_preview
+from .tag_services import sync_new_snippet_tags
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the json module is used without it
+    orjson = None
+
+# Snippet columns carried by an export line, next to "category" (the category slug).
+# Counters, ids and timestamps belong to the source catalog and are not transferred.
+SNIPPET_TRANSFER_FIELDS = (
+    'title', 'slug', 'description', 'short_description', 'tags',
+    'language', 'output_type', 'difficulty', 'is_featured',
+    'code_content', 'html_code', 'css_code', 'js_code', 'additional_files',
+    'simulated_output', 'expected_result', 'thumbnail_image',
+)
+
+DEFAULT_TRANSFER_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+INSERT_ATTEMPTS = 3
+
+
+def _dumps(record):
+    if orjson is not None:
+        return orjson.dumps(record) + b'\n'
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _loads(line):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+# EXPORT -----------------------------------------------------------------------------------------
+def iter_snippet_export(queryset=None, chunk_size=DEFAULT_TRANSFER_BATCH_SIZE):
+    """
+    Yield the snippets of `queryset` as NDJSON lines (bytes), one JSON object per snippet.
+    Rows are streamed from the database `chunk_size` at a time and blob-stored bodies are
+    resolved with one query per chunk, so memory use does not grow with the catalog.
+    """
+    from ..models import CodeSnippet  # Imported locally to break circular dependency
+
+    queryset = CodeSnippet.objects.all() if queryset is None else queryset
+    queryset = (
+        queryset.select_related('category')
+        .only(*SNIPPET_TRANSFER_FIELDS, 'content_blobs', 'category__slug')
+        .order_by('pk')
+    )
+    chunk = []
+    for snippet in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(snippet)
+        if len(chunk) >= chunk_size:
+            yield from _export_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _export_chunk(chunk)
+
+
+def _export_chunk(snippets):
+    load_blob_values_many(snippets)
+    for snippet in snippets:
+        record = {field: getattr(snippet, field) for field in SNIPPET_TRANSFER_FIELDS}
+        record['category'] = snippet.category.slug if snippet.category_id else None
+        yield _dumps(record)
+
+
+# IMPORT -----------------------------------------------------------------------------------------
+def import_snippets(lines, uploaded_by=None, batch_size=DEFAULT_TRANSFER_BATCH_SIZE,
+                    skip_existing=False, progress=None):
+    """
+    Create snippets from NDJSON `lines` (as written by iter_snippet_export).
+    Each batch of `batch_size` lines is validated together, its categories are resolved by
+    slug and its slugs allocated with one query each, and its snippets are inserted with one
+    bulk_create in their own transaction; a failed line never aborts the rest.
+    Args:
+        lines: Iterable of str/bytes lines; blank lines are ignored.
+        uploaded_by (CustomUser, optional): Owner of the imported snippets.
+        skip_existing (bool): Skip lines whose slug is already taken instead of importing
+            them under a suffixed slug, so a catalog can be re-imported safely.
+        progress (callable, optional): Called with the running summary after each batch.
+    Returns:
+        dict: {"created", "skipped", "failed", "errors": [{"line", "errors"}, ...]}
+        (at most MAX_REPORTED_ERRORS errors are listed).
+    """
+    summary = {"created": 0, "skipped": 0, "failed": 0, "errors": []}
+    batch = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        batch.append((number, line))
+        if len(batch) >= batch_size:
+            _import_batch(batch, uploaded_by, skip_existing, summary)
+            batch = []
+            if progress:
+                progress(summary)
+    if batch:
+        _import_batch(batch, uploaded_by, skip_existing, summary)
+        if progress:
+            progress(summary)
+    return summary
+
+
+def _fail(summary, number, errors):
+    summary["failed"] += 1
+    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+        summary["errors"].append({"line": number, "errors": errors})
+
+
+def _import_batch(batch, uploaded_by, skip_existing, summary):
+    # Imported locally to break circular dependency
+    from ..models import Category, CodeSnippet
+    from ..serializers import CodeSnippetTransferSerializer
+
+    valid = []
+    for number, line in batch:
+        try:
+            payload = _loads(line)
+        except ValueError:
+            _fail(summary, number, {"detail": "Invalid JSON."})
+            continue
+        serializer = CodeSnippetTransferSerializer(data=payload)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            _fail(summary, number, serializer.errors)
+
+    category_ids = dict(
+        Category.objects.filter(slug__in={data['category'] for _, data in valid if data['category']})
+        .values_list('slug', 'id')
+    ) if valid else {}
+    existing_slugs = set(
+        CodeSnippet.objects.filter(slug__in={data['slug'] for _, data in valid if data.get('slug')})
+        .values_list('slug', flat=True)
+    ) if skip_existing and valid else set()
+
+    snippets = []
+    pending_blobs = {}
+    for number, data in valid:
+        category_slug = data.pop('category')
+        if category_slug and category_slug not in category_ids:
+            _fail(summary, number, {"category": ["Category not found."]})
+            continue
+        if data.get('slug') in existing_slugs:
+            summary["skipped"] += 1
+            continue
+        # bulk_create skips codesnippet_pre_save, so its preview and blob steps run here
+        snippet = CodeSnippet(
+            **data, category_id=category_ids.get(category_slug), uploaded_by=uploaded_by
+        )
+        snippet.code_preview = build_code_preview(snippet)
+        pending_blobs.update(plan_blob_fields(snippet))
+        snippets.append(snippet)
+    if not snippets:
+        return
+
+    bases = [slugify(snippet.slug or snippet.title) or 'snippet' for snippet in snippets]
+    max_length = CodeSnippet._meta.get_field('slug').max_length
+    for attempt in range(1, INSERT_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                # Another writer may take one of the slugs before the insert; allocate again then
+                slugs = allocate_unique_values(
+                    CodeSnippet.objects.all(), 'slug', bases, max_length=max_length, fallback='snippet'
+                )
+                for snippet, slug in zip(snippets, slugs):
+                    snippet.slug = slug
+                store_blobs(pending_blobs)
+                CodeSnippet.objects.bulk_create(snippets)
+                _after_bulk_insert(snippets)
+            break
+        except IntegrityError:
+            if attempt == INSERT_ATTEMPTS:
+                raise
+    summary["created"] += len(snippets)
+
+
+def _after_bulk_insert(snippets):
+    """What the CodeSnippet post_save receivers would have done for each new snippet."""
+    # Imported locally to break circular dependency
+    from ..models import Category, CodeSnippet
+    from ..search_utils import update_search_vectors
+
+    update_search_vectors(CodeSnippet.objects.filter(pk__in=[snippet.pk for snippet in snippets]))
+    sync_new_snippet_tags(snippets)
+    category_slugs = Category.objects.filter(
+        pk__in={snippet.category_id for snippet in snippets if snippet.category_id}
+    ).values_list('slug', flat=True)
+    invalidate_cache_tags(
+        SNIPPET_LIST_TAG,
+        CATEGORY_LIST_TAG,
+        *[category_tag(slug) for slug in category_slugs]
+    )
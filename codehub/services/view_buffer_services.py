@@ -0,0 +1,356 @@
+# codehub/services/view_buffer_services.py
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .cache_services import CACHE_PREFIX, invalidate_cache_tags, snippet_tag
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 1000
+
+
+def get_flush_interval():
+    return getattr(settings, "CODEHUB_VIEW_BUFFER_FLUSH_INTERVAL", 10)
+
+
+def get_max_pending():
+    return getattr(settings, "CODEHUB_VIEW_BUFFER_MAX_PENDING", 1000)
+
+
+# BUFFERS --------------------------------------------------------------------------------------
+class MemoryViewBuffer:
+    """
+    Per-process buffer. Besides flushes triggered by record(), a timer thread flushes every
+    interval, so views also reach the database when traffic stops; up to one flush interval
+    (or CODEHUB_VIEW_BUFFER_MAX_PENDING entries) of views can be lost if the process dies
+    without a clean shutdown.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._views = {}     # (user_id, snippet_id) -> [views, last_viewed]
+        self._accessed = {}  # snippet_id -> last_accessed
+        self._last_flush = time.monotonic()
+        self._timer = None
+        atexit.register(self._flush_at_exit)
+
+    def _start_timer(self):
+        def run():
+            while True:
+                time.sleep(get_flush_interval())
+                if not (self._views or self._accessed):
+                    continue
+                try:
+                    flush_view_buffer(self)
+                except Exception as e:
+                    logger.error(f"Flushing buffered snippet views failed: {str(e)}", exc_info=True)
+                finally:
+                    connection.close()
+
+        self._timer = threading.Thread(target=run, name="codehub-view-buffer-timer", daemon=True)
+        self._timer.start()
+
+    def record(self, user_id, snippet_id, viewed_at, count_view=True):
+        """Returns: (views pending for this user/snippet, whether a flush is due)"""
+        with self._lock:
+            if self._timer is None:
+                self._start_timer()
+            pending = 0
+            if count_view:
+                entry = self._views.setdefault((user_id, snippet_id), [0, viewed_at])
+                entry[0] += 1
+                entry[1] = max(entry[1], viewed_at)
+                pending = entry[0]
+            self._accessed[snippet_id] = max(self._accessed.get(snippet_id, viewed_at), viewed_at)
+
+            due = (
+                len(self._views) + len(self._accessed) >= get_max_pending()
+                or time.monotonic() - self._last_flush >= get_flush_interval()
+            )
+            if due:
+                self._last_flush = time.monotonic()
+            return pending, due
+
+    def drain(self):
+        with self._lock:
+            views, self._views = self._views, {}
+            accessed, self._accessed = self._accessed, {}
+        return views, accessed
+
+    def restore(self, views, accessed):
+        with self._lock:
+            for key, (count, last_viewed) in views.items():
+                entry = self._views.setdefault(key, [0, last_viewed])
+                entry[0] += count
+                entry[1] = max(entry[1], last_viewed)
+            for snippet_id, last_accessed in accessed.items():
+                self._accessed[snippet_id] = max(self._accessed.get(snippet_id, last_accessed), last_accessed)
+
+    def _flush_at_exit(self):
+        try:
+            flush_view_buffer(self)
+        except Exception as e:
+            logger.error(f"Could not flush buffered snippet views at exit: {str(e)}")
+
+
+class RedisViewBuffer:
+    """
+    Buffer shared by every process through Redis (requires the django-redis cache backend).
+    Buffered views survive process restarts; only a Redis outage loses them.
+    """
+    VIEWS_KEY = f"{CACHE_PREFIX}:viewbuffer:views"
+    SEEN_KEY = f"{CACHE_PREFIX}:viewbuffer:seen"
+    ACCESSED_KEY = f"{CACHE_PREFIX}:viewbuffer:accessed"
+    FLUSH_LOCK_KEY = f"{CACHE_PREFIX}:viewbuffer:flush-lock"
+
+    # Read and clear all three hashes atomically, so no view is flushed twice or dropped
+    DRAIN_SCRIPT = """
+        local result = {}
+        for i, key in ipairs(KEYS) do
+            result[i] = redis.call('HGETALL', key)
+            redis.call('DEL', key)
+        end
+        return result
+    """
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection("default")
+        self._drain = self.redis.register_script(self.DRAIN_SCRIPT)
+
+    def record(self, user_id, snippet_id, viewed_at, count_view=True):
+        field = f"{user_id}:{snippet_id}"
+        timestamp = viewed_at.timestamp()
+        pipe = self.redis.pipeline(transaction=False)
+        if count_view:
+            pipe.hincrby(self.VIEWS_KEY, field, 1)
+            pipe.hset(self.SEEN_KEY, field, timestamp)
+        pipe.hset(self.ACCESSED_KEY, snippet_id, timestamp)
+        pipe.hlen(self.VIEWS_KEY)
+        # Whoever takes the lock flushes for all processes; it expires after one interval
+        pipe.set(self.FLUSH_LOCK_KEY, 1, nx=True, ex=max(int(get_flush_interval()), 1))
+        results = pipe.execute()
+
+        pending = results[0] if count_view else 0
+        due = bool(results[-1]) or results[-2] >= get_max_pending()
+        return pending, due
+
+    @staticmethod
+    def _decode(value):
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _pairs(self, flat):
+        flat = [self._decode(value) for value in flat]
+        return dict(zip(flat[::2], flat[1::2]))
+
+    def drain(self):
+        counts, seen, accessed = (
+            self._pairs(values)
+            for values in self._drain(keys=[self.VIEWS_KEY, self.SEEN_KEY, self.ACCESSED_KEY])
+        )
+        try:
+            views = {}
+            for field, count in counts.items():
+                user_id, snippet_id = (uuid.UUID(part) for part in field.split(":"))
+                views[(user_id, snippet_id)] = [int(count), _from_timestamp(seen.get(field))]
+            accessed_at = {
+                uuid.UUID(snippet_id): _from_timestamp(value) for snippet_id, value in accessed.items()
+            }
+        except Exception:
+            # The script already deleted the hashes; put the raw entries back before failing
+            self._restore_raw(counts, seen, accessed)
+            raise
+        return views, accessed_at
+
+    def _restore_raw(self, counts, seen, accessed):
+        pipe = self.redis.pipeline(transaction=False)
+        for field, count in counts.items():
+            pipe.hincrby(self.VIEWS_KEY, field, int(count))
+        for field, timestamp in seen.items():
+            pipe.hset(self.SEEN_KEY, field, timestamp)
+        for snippet_id, timestamp in accessed.items():
+            pipe.hset(self.ACCESSED_KEY, snippet_id, timestamp)
+        pipe.execute()
+
+    def restore(self, views, accessed):
+        pipe = self.redis.pipeline(transaction=False)
+        for (user_id, snippet_id), (count, last_viewed) in views.items():
+            pipe.hincrby(self.VIEWS_KEY, f"{user_id}:{snippet_id}", count)
+            pipe.hset(self.SEEN_KEY, f"{user_id}:{snippet_id}", last_viewed.timestamp())
+        for snippet_id, last_accessed in accessed.items():
+            pipe.hset(self.ACCESSED_KEY, snippet_id, last_accessed.timestamp())
+        pipe.execute()
+
+
+def _from_timestamp(value):
+    if value is None:
+        return timezone.now()
+    return datetime.fromtimestamp(float(value), tz=dt_timezone.utc)
+
+
+VIEW_BUFFERS = {
+    "memory": MemoryViewBuffer,
+    "redis": RedisViewBuffer,
+}
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def is_view_buffer_enabled():
+    return getattr(settings, "CODEHUB_VIEW_BUFFER", "off") in VIEW_BUFFERS
+
+
+def get_view_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = VIEW_BUFFERS[settings.CODEHUB_VIEW_BUFFER]()
+    return _buffer
+
+
+# RECORDING ------------------------------------------------------------------------------------
+def record_view(user_id, snippet_id, count_view=True):
+    """
+    Buffer one snippet view: +1 on the user's UserHistory.view_count and a new
+    last_viewed / CodeSnippet.last_accessed. Nothing is written to the database here.
+    `count_view=False` only touches CodeSnippet.last_accessed (e.g. for a first view,
+    whose history row was just created with view_count=1).
+    Returns: the number of views buffered for this user and snippet, including this one.
+    """
+    buffer = get_view_buffer()
+    pending, due = buffer.record(user_id, snippet_id, timezone.now(), count_view=count_view)
+    if due:
+        _flush_in_background(buffer)
+    return pending
+
+
+def _flush_in_background(buffer):
+    def run():
+        try:
+            flush_view_buffer(buffer)
+        except Exception as e:
+            logger.error(f"Flushing buffered snippet views failed: {str(e)}", exc_info=True)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name="codehub-view-buffer-flush", daemon=True).start()
+
+
+# FLUSHING -------------------------------------------------------------------------------------
+def _values_sql(row_count, placeholders):
+    return ", ".join([f"({placeholders})"] * row_count)
+
+
+def _apply_history_increments(rows):
+    """
+    rows: [(user_id, snippet_id, views, last_viewed)]
+    Returns: {snippet_id: views actually applied} (histories deleted meanwhile are skipped)
+    """
+    from ..models import UserHistory  # Imported locally to break circular dependency
+
+    applied = defaultdict(int)
+    if connection.vendor == "postgresql":
+        table = UserHistory._meta.db_table
+        for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+            batch = rows[start:start + FLUSH_BATCH_SIZE]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE {table} AS h
+                    SET view_count = h.view_count + v.views,
+                        last_viewed = GREATEST(h.last_viewed, v.seen)
+                    FROM (VALUES {_values_sql(len(batch), '%s, %s, %s, %s::timestamptz')})
+                        AS v(user_id, snippet_id, views, seen)
+                    WHERE h.user_id = v.user_id AND h.snippet_id = v.snippet_id
+                    RETURNING h.snippet_id, v.views
+                    """,
+                    [value for row in batch for value in row],
+                )
+                for snippet_id, views in cursor.fetchall():
+                    applied[snippet_id] += views
+        return applied
+
+    for user_id, snippet_id, views, last_viewed in rows:
+        if UserHistory.objects.filter(user_id=user_id, snippet_id=snippet_id).update(
+            view_count=F("view_count") + views,
+            last_viewed=Greatest(F("last_viewed"), Value(last_viewed)),
+        ):
+            applied[snippet_id] += views
+    return applied
+
+
+def _apply_snippet_updates(rows):
+    """rows: [(snippet_id, views, last_accessed)]"""
+    from ..models import CodeSnippet  # Imported locally to break circular dependency
+
+    if connection.vendor == "postgresql":
+        table = CodeSnippet._meta.db_table
+        for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+            batch = rows[start:start + FLUSH_BATCH_SIZE]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE {table} AS s
+                    SET view_count = s.view_count + v.views,
+                        last_accessed = GREATEST(s.last_accessed, v.accessed)
+                    FROM (VALUES {_values_sql(len(batch), '%s, %s, %s::timestamptz')})
+                        AS v(id, views, accessed)
+                    WHERE s.id = v.id
+                    """,
+                    [value for row in batch for value in row],
+                )
+        return
+
+    for snippet_id, views, last_accessed in rows:
+        CodeSnippet.objects.filter(pk=snippet_id).update(
+            view_count=F("view_count") + views,
+            last_accessed=Greatest(Coalesce(F("last_accessed"), Value(last_accessed)), Value(last_accessed)),
+        )
+
+
+def flush_view_buffer(buffer=None):
+    """
+    Write all buffered views to the database: one UPDATE ... FROM (VALUES ...) per
+    batch for UserHistory and one for CodeSnippet. Increments are relative, so
+    concurrent flushes from several processes never overwrite each other.
+    If the write fails the drained entries are put back into the buffer.
+    Returns: dict with the number of histories and snippets updated.
+    """
+    buffer = buffer or get_view_buffer()
+    views, accessed = buffer.drain()
+    if not views and not accessed:
+        return {"histories": 0, "snippets": 0}
+
+    try:
+        with transaction.atomic():
+            applied = _apply_history_increments([
+                (user_id, snippet_id, count, last_viewed)
+                for (user_id, snippet_id), (count, last_viewed) in views.items()
+            ])
+            snippet_ids = set(accessed) | set(applied)
+            now = timezone.now()
+            _apply_snippet_updates([
+                (snippet_id, applied.get(snippet_id, 0), accessed.get(snippet_id, now))
+                for snippet_id in snippet_ids
+            ])
+            invalidate_cache_tags(*[snippet_tag(snippet_id) for snippet_id in snippet_ids])
+    except Exception:
+        buffer.restore(views, accessed)
+        raise
+
+    return {"histories": len(views), "snippets": len(snippet_ids)}
@@ -1,3 +1,1060 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import unittest
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from src import renderers
+from src.parsers import ORJSONParser
+from src.renderers import ORJSONRenderer
+from user_account.models import CustomUser
+from user_account.services.bulk_user_deletion_service import BulkUserDeletionService
+from .models import (
+    Category,
+    CodeRun,
+    CodeSnippet,
+    Comment,
+    DailySnippetRuns,
+    DailySnippetShares,
+    Reaction,
+    RenderedContent,
+    ShareActivity,
+    SnippetBlob,
+    Tag,
+    UserHistory,
+    bump_snippet_counters,
+    bump_snippet_counters_many,
+)
+from .pagination import KeysetCursorPagination
+from .search_utils import build_snippet_search_query, search_snippets
+from .serializers import CodeSnippetListSerializer
+from .services.cache_services import (
+    SNIPPET_LIST_TAG,
+    get_cached_response,
+    invalidate_cache_tags,
+    set_cached_response,
+    snippet_tag,
+    start_response_build,
+)
+from .services.queryset_services import get_snippet_list_queryset
+from .services.rollup_services import RUNS_ROLLUP, SHARES_ROLLUP, get_run_series, get_share_series, run_rollup
+from .services.snippet_services import generate_snippet_slug, get_snippet_with_engagement
+from .services.tag_services import sync_new_snippet_tags, sync_snippet_tags
+from .services.transfer_services import SNIPPET_TRANSFER_FIELDS, import_snippets, iter_snippet_export
+from .services.user_data_services import delete_user_engagement
+from .services.view_buffer_services import RedisViewBuffer, flush_view_buffer
+
+
+class SnippetListQueryCountTests(TestCase):
+    """
+    The snippet list endpoints must cost a constant number of queries per page,
+    independent of how many snippets, reactions or comments are on it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="reader@example.com", password="pass12345")
+        cls.other = CustomUser.objects.create_user(email="other@example.com", password="pass12345")
+        cls.category = Category.objects.create(name="Python")
+
+    def _create_snippets(self, count):
+        for i in range(count):
+            snippet = CodeSnippet.objects.create(
+                title=f"Snippet {i}",
+                description="desc",
+                code_content="print('hi')",
+                category=self.category,
+                uploaded_by=self.other,
+            )
+            Reaction.objects.create(user=self.user, snippet=snippet, is_like=True)
+            Reaction.objects.create(user=self.other, snippet=snippet, is_like=False)
+            Comment.objects.create(user=self.other, snippet=snippet, text="nice")
+            UserHistory.objects.create(user=self.user, snippet=snippet)
+
+    def _count_queries(self, client, url):
+        cache.clear()  # Measure the uncached path (see CachedListMixin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_snippet_list_query_count_is_constant(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('snippet-list')
+
+        self._create_snippets(2)
+        small, _ = self._count_queries(client, url)
+
+        self._create_snippets(15)
+        large, response = self._count_queries(client, url)
+
+        self.assertEqual(small, large)
+        item = response.data['results'][0]
+        self.assertEqual(item['reaction_stats'], {'likes': 1, 'dislikes': 1})
+        self.assertEqual(item['comment_count'], 1)
+        self.assertEqual(item['user_has_reacted'], 'like')
+        self.assertEqual(item['user_history']['view_count'], 1)
+        self.assertEqual(item['category_name'], "Python")
+
+    def test_category_snippets_query_count_is_constant(self):
+        client = APIClient()
+        url = reverse('category-snippets', kwargs={'slug': self.category.slug})
+
+        self._create_snippets(2)
+        small, _ = self._count_queries(client, url)
+
+        self._create_snippets(15)
+        large, response = self._count_queries(client, url)
+
+        self.assertEqual(small, large)
+        self.assertIsNone(response.data['results'][0]['user_has_reacted'])
+
+
+class CommentTreeQueryCountTests(TestCase):
+    """
+    Benchmark: loading a comment thread costs the same number of queries for a
+    10-comment thread as for a 1,000-comment one, at any rendered depth.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="commenter@example.com", password="pass12345")
+        cls.category = Category.objects.create(name="Threads")
+
+    def _create_thread(self, title, size):
+        """Roughly a third each of top-level comments, replies and replies-to-replies"""
+        snippet = CodeSnippet.objects.create(
+            title=title, description="desc", code_content="print('hi')", category=self.category
+        )
+        roots = Comment.objects.bulk_create(
+            [Comment(user=self.user, snippet=snippet, text=f"root {i}") for i in range(size // 3)]
+        )
+        replies = Comment.objects.bulk_create(
+            [Comment(user=self.user, snippet=snippet, parent=roots[i % len(roots)], text=f"reply {i}")
+             for i in range(size // 3)]
+        )
+        Comment.objects.bulk_create(
+            [Comment(user=self.user, snippet=snippet, parent=replies[i % len(replies)], text=f"nested {i}")
+             for i in range(size - 2 * (size // 3))]
+        )
+        return snippet
+
+    def _count_queries(self, snippet, query=''):
+        url = reverse('snippet-comments', kwargs={'slug': snippet.slug}) + query
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_constant_for_1000_comment_thread(self):
+        small = self._create_thread("Small thread", 10)
+        large = self._create_thread("Large thread", 1000)
+
+        for query in ('', '?depth=3', '?depth=3&replies_limit=2', '?paginator=cursor&depth=2'):
+            small_count, _ = self._count_queries(small, query)
+            large_count, response = self._count_queries(large, query)
+            self.assertEqual(small_count, large_count, query)
+
+        root = response.data['results'][0]
+        self.assertGreater(root['reply_count'], 0)
+        self.assertIn('replies', root['replies'][0])
+
+
+class SnippetDetailPerUserCachingTests(TestCase):
+    """
+    The snippet detail payload is per-user: neither its ETag nor its cached compressed body
+    may be shared between users, and user-visible history changes must change the ETag.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = CustomUser.objects.create_user(email="alice@example.com", password="pass12345")
+        cls.bob = CustomUser.objects.create_user(email="bob@example.com", password="pass12345")
+        cls.snippet = CodeSnippet.objects.create(
+            title="Shared snippet",
+            description="desc",
+            code_content="\n".join(f"print('line {n}')" for n in range(200)),
+            category=Category.objects.create(name="Caching"),
+        )
+        Reaction.objects.create(user=cls.alice, snippet=cls.snippet, is_like=True)
+        cls.history = UserHistory.objects.create(user=cls.alice, snippet=cls.snippet)
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('codehub.views.mixins.is_shared_cache', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('snippet-detail', kwargs={'slug': self.snippet.slug})
+        self._get(self.alice)  # The first request for an object carries no validators
+
+    def _get(self, user, **headers):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(self.url, secure=True, **headers)
+
+    def _json(self, response):
+        content = response.content
+        if response.get('Content-Encoding') == 'gzip':
+            content = gzip.decompress(content)
+        return json.loads(content)
+
+    def test_compressed_bodies_are_not_shared_between_users(self):
+        alice = self._get(self.alice, HTTP_ACCEPT_ENCODING='gzip')
+        bob = self._get(self.bob, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(alice.get('Content-Encoding'), 'gzip')
+        self.assertEqual(self._json(alice)['user_has_reacted'], 'like')
+        self.assertIsNone(self._json(bob)['user_has_reacted'])
+        self.assertNotEqual(alice.content, bob.content)
+
+    def test_etag_is_per_user(self):
+        etag = self._get(self.alice)['ETag']
+        self.assertEqual(self._get(self.alice, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self._get(self.bob, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_saving_history_changes_etag(self):
+        etag = self._get(self.alice)['ETag']
+        self.history.is_saved = True
+        with self.captureOnCommitCallbacks(execute=True):  # Tag versions are bumped on commit
+            self.history.save(update_fields=['is_saved', 'saved_at'])
+        response = self._get(self.alice, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self._json(response)['user_history']['is_saved'])
+
+
+class FakeRedis:
+    """Just enough of a redis client (hashes, pipelines, the drain script) for RedisViewBuffer."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+    def register_script(self, script):
+        def drain(keys):
+            result = []
+            for key in keys:
+                values = self.hashes.pop(key, {})
+                result.append([item.encode() for pair in values.items() for item in pair])
+            return result
+        return drain
+
+    def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = str(int(values.get(field, 0)) + amount)
+        return int(values[field])
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[str(field)] = str(value)
+
+    def hlen(self, key):
+        return len(self.hashes.get(key, {}))
+
+    def set(self, key, value, nx=False, ex=None):
+        return False
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+
+class RedisViewBufferDrainTests(TestCase):
+    """Draining the shared view buffer must handle UUID ids and never lose entries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="viewer@example.com", password="pass12345")
+        cls.snippet = CodeSnippet.objects.create(
+            title="Buffered", description="desc", code_content="print('hi')",
+            category=Category.objects.create(name="Buffers"),
+        )
+        cls.history = UserHistory.objects.create(user=cls.user, snippet=cls.snippet)
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        with mock.patch('django_redis.get_redis_connection', return_value=self.redis):
+            self.buffer = RedisViewBuffer()
+
+    def test_drain_flushes_uuid_keyed_views(self):
+        for _ in range(3):
+            self.buffer.record(self.user.pk, self.snippet.pk, timezone.now())
+
+        result = flush_view_buffer(self.buffer)
+
+        self.assertEqual(result, {"histories": 1, "snippets": 1})
+        self.history.refresh_from_db()
+        self.assertEqual(self.history.view_count, 1 + 3)
+        self.assertEqual(self.redis.hashes, {})
+
+    def test_failed_drain_restores_entries(self):
+        self.buffer.record(self.user.pk, self.snippet.pk, timezone.now())
+        self.redis.hset(RedisViewBuffer.VIEWS_KEY, "not-a-uuid:1", 1)
+
+        with self.assertRaises(ValueError):
+            self.buffer.drain()
+
+        views = self.redis.hashes[RedisViewBuffer.VIEWS_KEY]
+        self.assertEqual(views[f"{self.user.pk}:{self.snippet.pk}"], "1")
+        self.assertIn("not-a-uuid:1", views)
+        self.assertIn(str(self.snippet.pk), self.redis.hashes[RedisViewBuffer.ACCESSED_KEY])
+
+
+class SlugAllocationTests(TestCase):
+    """Slugs keep their full length unless a suffix is needed, and are never empty."""
+
+    def test_long_title_is_not_shortened_without_collision(self):
+        max_length = CodeSnippet._meta.get_field('slug').max_length
+        slug = generate_snippet_slug('x' * max_length)
+        self.assertEqual(slug, 'x' * max_length)
+
+    def test_suffixed_slug_fits_column(self):
+        max_length = CodeSnippet._meta.get_field('slug').max_length
+        base = 'x' * max_length
+        CodeSnippet.objects.create(
+            title=base, description="desc", code_content="pass",
+            category=Category.objects.create(name="Slugs"),
+        )
+        slug = generate_snippet_slug(base)
+        self.assertTrue(slug.endswith('-1'))
+        self.assertLessEqual(len(slug), max_length)
+
+    def test_empty_slugified_title_falls_back(self):
+        self.assertEqual(generate_snippet_slug('Привет'), 'snippet')
+
+
+class TagUsageCountTests(TestCase):
+    """Re-syncing links a snippet already has must not bump the tags' usage counts."""
+
+    def test_resync_does_not_overcount(self):
+        snippet = CodeSnippet.objects.create(
+            title="Tagged", description="desc", code_content="pass", tags="python,api",
+            category=Category.objects.create(name="Tags"),
+        )
+        sync_snippet_tags(snippet)
+        sync_new_snippet_tags([snippet])
+
+        self.assertEqual(
+            dict(Tag.objects.values_list('name', 'usage_count')), {"python": 1, "api": 1}
+        )
+
+
+class UserEngagementDeletionTests(TestCase):
+    """Bulk user deletion removes engagement rows set-wise and corrects the snippet counters."""
+
+    def setUp(self):
+        category = Category.objects.create(name="Purge")
+        self.snippet = CodeSnippet.objects.create(
+            title="Purged", description="desc", code_content="pass", category=category
+        )
+        self.other = CodeSnippet.objects.create(
+            title="Kept", description="desc", code_content="pass", category=category
+        )
+        self.keeper = CustomUser.objects.create_user(
+            email="keeper@example.com", password="pass12345", is_verified=True
+        )
+        self.spammers = [
+            CustomUser.objects.create_user(email=f"spam{i}@example.com", password="pass12345")
+            for i in range(3)
+        ]
+        Reaction.objects.create(user=self.keeper, snippet=self.snippet, is_like=True)
+        Reaction.objects.create(user=self.spammers[0], snippet=self.snippet, is_like=True)
+        Reaction.objects.create(user=self.spammers[1], snippet=self.snippet, is_like=False)
+        spam_comment = Comment.objects.create(user=self.spammers[0], snippet=self.snippet, text="spam")
+        Comment.objects.create(user=self.keeper, snippet=self.snippet, parent=spam_comment, text="reply")
+        self.kept_comment = Comment.objects.create(user=self.keeper, snippet=self.snippet, text="kept")
+        UserHistory.objects.create(user=self.spammers[2], snippet=self.snippet, view_count=4)
+        UserHistory.objects.create(user=self.keeper, snippet=self.other, view_count=2)
+
+    def test_chunked_purge_corrects_counters(self):
+        chunks = []
+        report = BulkUserDeletionService.delete_users(
+            CustomUser.objects.filter(is_verified=False), batch_size=2,
+            progress=lambda report: chunks.append(report['deleted']),
+        )
+
+        self.assertEqual(chunks, [2, 3])
+        self.assertEqual(report['deleted'], 3)
+        self.assertEqual(report['failed'], 0)
+        self.assertEqual(report['deleted_objects'][Comment._meta.label], 2)
+        self.assertEqual(list(Comment.objects.all()), [self.kept_comment])
+
+        self.snippet.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(
+            (self.snippet.like_count, self.snippet.dislike_count,
+             self.snippet.comment_count, self.snippet.view_count),
+            (1, 0, 1, 0),
+        )
+        self.assertEqual(self.other.view_count, 2)
+
+    def test_delete_user_engagement_uses_one_delete_per_table(self):
+        user_ids = [user.pk for user in self.spammers]
+        with CaptureQueriesContext(connection) as ctx:
+            deleted = delete_user_engagement(user_ids)
+
+        deletes = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(deleted, {
+            Reaction._meta.label: 2, Comment._meta.label: 2, UserHistory._meta.label: 1,
+        })
+
+
+class ResponseCacheInvalidationTests(TestCase):
+    """Cached list pages and ETags follow the tag invalidations in codehub.models."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="reader@example.com", password="pass12345")
+        cls.snippet = CodeSnippet.objects.create(
+            title="Cached", description="desc", code_content="pass",
+            category=Category.objects.create(name="Cache"),
+        )
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('codehub.views.mixins.is_shared_cache', return_value=True)
+        self.shared_cache = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.list_url = reverse('snippet-list')
+        self.detail_url = reverse('snippet-detail', kwargs={'slug': self.snippet.slug})
+
+    def _list(self):
+        response = APIClient().get(self.list_url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return {item['slug']: item for item in response.json()['results']}
+
+    def _detail(self, **headers):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.get(self.detail_url, secure=True, **headers)
+
+    def test_list_is_served_from_cache(self):
+        self._list()
+        with mock.patch('codehub.views.snippets.get_snippet_list_queryset') as build:
+            self._list()
+        build.assert_not_called()
+
+    def test_snippet_edit_invalidates_list(self):
+        self._list()
+        self.snippet.title = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.snippet.save()
+        self.assertEqual(self._list()[self.snippet.slug]['title'], "Renamed")
+
+    def test_counter_bump_invalidates_list(self):
+        self._list()
+        with self.captureOnCommitCallbacks(execute=True):
+            Reaction.objects.create(user=self.user, snippet=self.snippet, is_like=True)
+        self.assertEqual(self._list()[self.snippet.slug]['reaction_stats']['likes'], 1)
+
+    def test_invalidation_during_build_leaves_entry_stale(self):
+        snapshot = start_response_build([SNIPPET_LIST_TAG])
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_cache_tags(SNIPPET_LIST_TAG)
+        set_cached_response("codehub:test", {"stale": True}, snapshot)
+        self.assertIsNone(get_cached_response("codehub:test"))
+
+    def test_page_tag_bumped_during_build_is_not_stored(self):
+        snapshot = start_response_build([SNIPPET_LIST_TAG])
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_cache_tags(snippet_tag(self.snippet.pk))
+        self.assertFalse(set_cached_response("codehub:test", {}, snapshot, [snippet_tag(self.snippet.pk)]))
+        self.assertTrue(set_cached_response("codehub:test", {}, start_response_build([SNIPPET_LIST_TAG]),
+                                            [snippet_tag(self.snippet.pk)]))
+
+    def test_first_request_has_no_validators(self):
+        self.assertNotIn('ETag', self._detail())
+        self.assertIn('ETag', self._detail())
+
+    def test_etag_is_read_before_the_payload_is_built(self):
+        self._detail()
+        original = get_snippet_with_engagement
+
+        def build_during_invalidation(*args, **kwargs):
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_cache_tags(snippet_tag(self.snippet.pk))
+            return original(*args, **kwargs)
+
+        with mock.patch('codehub.views.snippets.get_snippet_with_engagement', build_during_invalidation):
+            etag = self._detail()['ETag']
+        # The body built during the invalidation must not be confirmed by the next request
+        self.assertEqual(self._detail(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_no_validators_or_list_cache_with_a_per_process_cache(self):
+        self.shared_cache.return_value = False
+        self._detail()
+        self.assertNotIn('ETag', self._detail())
+        self._list()
+        with mock.patch('codehub.views.snippets.get_snippet_list_queryset',
+                        wraps=get_snippet_list_queryset) as build:
+            self._list()
+        build.assert_called()
+
+
+@override_settings(CODEHUB_BLOB_STORE=True, CODEHUB_BLOB_MIN_SIZE=256)
+class SnippetBlobStoreTests(TestCase):
+    """Large bodies move to SnippetBlob and must still read back, and be found by search."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="author@example.com", password="pass12345")
+        cls.category = Category.objects.create(name="Python")
+
+    def _large_code(self, marker):
+        lines = [f"value_{n} = {n}  # padding line" for n in range(40)]
+        lines.append(f"def {marker}(): pass")
+        return "\n".join(lines)
+
+    def _create(self, code):
+        return CodeSnippet.objects.create(
+            title="Blobbed snippet", code_content=code, category=self.category, uploaded_by=self.user
+        )
+
+    def test_round_trip(self):
+        code = self._large_code("first")
+        snippet = self._create(code)
+
+        column, blobs = CodeSnippet.objects.filter(pk=snippet.pk).values_list('code_content', 'content_blobs').get()
+        self.assertEqual(column, '')
+        self.assertEqual(set(blobs), {'code_content'})
+        self.assertTrue(SnippetBlob.objects.filter(sha256=blobs['code_content']).exists())
+        self.assertEqual(CodeSnippet.objects.get(pk=snippet.pk).code_content, code)
+
+        # A body edit is stored as a new blob; one below the threshold goes back inline
+        snippet = CodeSnippet.objects.get(pk=snippet.pk)
+        snippet.code_content = self._large_code("second")
+        snippet.save()
+        self.assertEqual(CodeSnippet.objects.get(pk=snippet.pk).code_content, self._large_code("second"))
+
+        snippet.code_content = "print('small')"
+        snippet.save()
+        column, blobs = CodeSnippet.objects.filter(pk=snippet.pk).values_list('code_content', 'content_blobs').get()
+        self.assertEqual((column, blobs), ("print('small')", {}))
+
+    def test_search_finds_code_in_the_blob_store(self):
+        # The marker is past the stored preview, so only the resolved body can match it
+        blobbed = self._create(self._large_code("zanzibar_quux"))
+        self.assertNotIn("zanzibar_quux", blobbed.code_preview)
+        self._create("print('inline')")
+
+        found = search_snippets(CodeSnippet.objects.all(), "zanzibar_quux")
+        self.assertEqual([snippet.pk for snippet in found], [blobbed.pk])
+
+        with mock.patch('codehub.search_utils.is_full_text_search_available', return_value=False):
+            found = search_snippets(CodeSnippet.objects.all(), "zanzibar_quux")
+            self.assertEqual([snippet.pk for snippet in found], [blobbed.pk])
+            found = CodeSnippet.objects.filter(build_snippet_search_query({'q': "zanzibar_quux"}))
+            self.assertEqual([snippet.pk for snippet in found], [blobbed.pk])
+
+
+class EngagementCounterTests(TestCase):
+    """The denormalized counters on CodeSnippet must track the engagement tables."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = CustomUser.objects.create_user(email="alice@example.com", password="pass12345")
+        cls.bob = CustomUser.objects.create_user(email="bob@example.com", password="pass12345")
+        category = Category.objects.create(name="Python")
+        cls.snippet = CodeSnippet.objects.create(
+            title="Counted", code_content="print(1)", category=category, uploaded_by=cls.alice
+        )
+        cls.other = CodeSnippet.objects.create(
+            title="Other", code_content="print(2)", category=category, uploaded_by=cls.alice
+        )
+
+    def _counters(self, snippet):
+        return CodeSnippet.objects.filter(pk=snippet.pk).values(*CodeSnippet.ENGAGEMENT_COUNTER_FIELDS).get()
+
+    def _expected(self, **counts):
+        return {field: counts.get(field, 0) for field in CodeSnippet.ENGAGEMENT_COUNTER_FIELDS}
+
+    def _engage(self, snippet):
+        like = Reaction.objects.create(user=self.alice, snippet=snippet, is_like=True)
+        Reaction.objects.create(user=self.bob, snippet=snippet, is_like=False)
+        Comment.objects.create(user=self.bob, snippet=snippet, text="Nice")
+        UserHistory.objects.create(user=self.bob, snippet=snippet, view_count=3)
+        CodeRun.objects.create(snippet=snippet)
+        ShareActivity.objects.create(snippet=snippet)
+        return like
+
+    def test_signals_increment_and_decrement(self):
+        like = self._engage(self.snippet)
+        self.assertEqual(self._counters(self.snippet), self._expected(
+            like_count=1, dislike_count=1, comment_count=1, view_count=3, run_count=1, share_count=1
+        ))
+
+        # Switching a reaction moves it between the two counters
+        like.is_like = False
+        like.save()
+        self.assertEqual(self._counters(self.snippet)['like_count'], 0)
+        self.assertEqual(self._counters(self.snippet)['dislike_count'], 2)
+
+        history = UserHistory.objects.get(snippet=self.snippet)
+        history.view_count = F('view_count') + 2
+        history.save(update_fields=['view_count'])
+        self.assertEqual(self._counters(self.snippet)['view_count'], 5)
+
+        for model in (Reaction, Comment, UserHistory, CodeRun, ShareActivity):
+            for row in model.objects.filter(snippet=self.snippet):
+                row.delete()
+        self.assertEqual(self._counters(self.snippet), self._expected())
+        self.assertEqual(self._counters(self.other), self._expected())
+
+    def test_counters_never_go_below_zero(self):
+        like = Reaction.objects.create(user=self.alice, snippet=self.snippet, is_like=True)
+        CodeSnippet.objects.filter(pk=self.snippet.pk).update(like_count=0)
+
+        like.delete()
+        bump_snippet_counters(self.snippet.pk, run_count=-5)
+
+        self.assertEqual(self._counters(self.snippet), self._expected())
+
+    def test_bulk_deltas(self):
+        CodeRun.objects.create(snippet=self.other)
+
+        with self.assertNumQueries(1):
+            bump_snippet_counters_many({
+                self.snippet.pk: {'run_count': 2, 'share_count': 1},
+                self.other.pk: {'run_count': -3, 'view_count': 4},
+                None: {'run_count': 1},
+            })
+
+        self.assertEqual(self._counters(self.snippet), self._expected(run_count=2, share_count=1))
+        self.assertEqual(self._counters(self.other), self._expected(view_count=4))
+
+    def test_recount_repairs_only_drifted_snippets(self):
+        self._engage(self.snippet)
+        self._engage(self.other)
+        correct = self._counters(self.snippet)
+        CodeSnippet.objects.filter(pk=self.snippet.pk).update(like_count=7, view_count=0)
+
+        out = io.StringIO()
+        call_command('recount_engagement', '--only-drifted', stdout=out)
+
+        self.assertIn("recomputed for 1 snippet(s)", out.getvalue())
+        self.assertEqual(self._counters(self.snippet), correct)
+        self.assertEqual(self._counters(self.other), correct)
+
+
+class SnippetSearchOrderingTests(TestCase):
+    """`?search=` / `?q=` rank matches by relevance unless an explicit ordering is asked for."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Search")
+        # Created least relevant last, so relevance order differs from the default -created_at
+        cls.in_title = CodeSnippet.objects.create(
+            title="Caching guide", description="Notes", code_content="pass", category=category
+        )
+        cls.in_description = CodeSnippet.objects.create(
+            title="Guide", description="Notes on caching", code_content="pass", category=category
+        )
+        cls.in_code = CodeSnippet.objects.create(
+            title="Example", description="Notes", code_content="# caching\npass", category=category
+        )
+        CodeSnippet.objects.create(title="Unrelated", description="Notes", code_content="pass", category=category)
+
+    def _slugs(self, **params):
+        response = APIClient().get(reverse('snippet-list'), params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return [item['slug'] for item in response.json()['results']]
+
+    def test_search_is_ordered_by_relevance(self):
+        expected = [self.in_title.slug, self.in_description.slug, self.in_code.slug]
+        self.assertEqual(self._slugs(search="caching"), expected)
+        self.assertEqual(self._slugs(q="caching"), expected)
+
+    def test_explicit_ordering_overrides_relevance(self):
+        self.assertEqual(
+            self._slugs(search="caching", ordering="title"),
+            [self.in_title.slug, self.in_code.slug, self.in_description.slug],
+        )
+
+    def test_fallback_without_full_text_search(self):
+        with mock.patch('codehub.search_utils.is_full_text_search_available', return_value=False):
+            # Every match ranks the same, so the newest comes first
+            self.assertEqual(
+                self._slugs(search="caching"),
+                [self.in_code.slug, self.in_description.slug, self.in_title.slug],
+            )
+            self.assertEqual(self._slugs(search="no-such-word"), [])
+
+
+class SnippetCursorPaginationTests(TestCase):
+    """`?paginator=cursor` must walk every snippet exactly once, even when created_at ties."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Paging")
+        snippets = [
+            CodeSnippet.objects.create(title=f"Paged {i}", code_content="pass", category=category)
+            for i in range(8)
+        ]
+        tied = timezone.now() - timedelta(days=1)
+        CodeSnippet.objects.filter(pk__in=[s.pk for s in snippets[:6]]).update(created_at=tied)
+        cls.expected = list(CodeSnippet.objects.order_by('-created_at', '-id').values_list('slug', flat=True))
+
+    def test_pages_are_stable_across_tied_created_at(self):
+        client = APIClient()
+        url, params, slugs = reverse('snippet-list'), {'paginator': 'cursor'}, []
+        with mock.patch.object(KeysetCursorPagination, 'page_size', 3):
+            while url:
+                response = client.get(url, params, secure=True)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('count', response.json())
+                slugs.extend(item['slug'] for item in response.json()['results'])
+                url, params = response.json()['next'], None
+
+        self.assertEqual(slugs, self.expected)
+
+
+@override_settings(CODEHUB_VIEW_BUFFER="off")
+class EngagementEventBatchTests(TestCase):
+    """A batch of events must move the counters exactly as the same events logged one by one."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="reader@example.com", password="pass12345")
+        category = Category.objects.create(name="Events")
+        cls.batched, cls.batched_seen, cls.single, cls.single_seen = [
+            CodeSnippet.objects.create(title=title, code_content="pass", category=category)
+            for title in ("Batched", "Batched seen", "Single", "Single seen")
+        ]
+        # Already viewed once, so the batch updates the history row instead of creating one
+        for snippet in (cls.batched_seen, cls.single_seen):
+            UserHistory.objects.create(user=cls.user, snippet=snippet, view_count=2)
+
+    def _counters(self, snippet):
+        return CodeSnippet.objects.filter(pk=snippet.pk).values(*CodeSnippet.ENGAGEMENT_COUNTER_FIELDS).get()
+
+    def _log_one_by_one(self, snippet, seen_snippet):
+        CodeRun.objects.create(snippet=snippet, user=self.user)
+        CodeRun.objects.create(snippet=snippet, user=self.user, was_modified=True)
+        ShareActivity.objects.create(snippet=snippet, user=self.user)
+        ShareActivity.objects.create(snippet=seen_snippet, user=self.user, share_method='email')
+        history = UserHistory.objects.create(user=self.user, snippet=snippet)
+        history.view_count = F('view_count') + 1
+        history.save(update_fields=['view_count'])
+        history = UserHistory.objects.get(user=self.user, snippet=seen_snippet)
+        history.view_count = F('view_count') + 1
+        history.save(update_fields=['view_count'])
+
+    def test_batch_matches_per_item_signals(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        slug, seen_slug = self.batched.slug, self.batched_seen.slug
+        events = [
+            {"type": "run", "snippet": slug},
+            {"type": "run", "snippet": slug, "was_modified": True},
+            {"type": "share", "snippet": slug},
+            {"type": "share", "snippet": seen_slug, "share_method": "email"},
+            {"type": "view", "snippet": slug},
+            {"type": "view", "snippet": slug},
+            {"type": "view", "snippet": seen_slug},
+            {"type": "run", "snippet": "no-such-snippet"},
+            {"type": "like", "snippet": slug},
+        ]
+        response = client.post(reverse('event-batch'), {"events": events}, format='json', secure=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['created'], response.json()['failed']), (7, 2))
+
+        self._log_one_by_one(self.single, self.single_seen)
+
+        self.assertEqual(self._counters(self.batched), self._counters(self.single))
+        self.assertEqual(self._counters(self.batched_seen), self._counters(self.single_seen))
+        self.assertEqual(
+            self._counters(self.batched),
+            {'like_count': 0, 'dislike_count': 0, 'comment_count': 0,
+             'view_count': 2, 'run_count': 2, 'share_count': 1},
+        )
+        self.assertEqual(self._counters(self.batched_seen)['view_count'], 3)
+        self.assertEqual(self._counters(self.batched_seen)['share_count'], 1)
+
+
+@override_settings(CODEHUB_ROLLUP_SETTLE_SECONDS=0)
+class EngagementRollupTests(TestCase):
+    """The daily rollup tables must add up to the same totals as the raw CodeRun/ShareActivity rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Rollups")
+        cls.first = CodeSnippet.objects.create(title="First", code_content="pass", category=category)
+        cls.second = CodeSnippet.objects.create(title="Second", code_content="pass", category=category)
+        cls.today = timezone.localdate()
+
+    def _log(self, days_ago, snippet, runs=0, modified_runs=0, shares=()):
+        when = timezone.now() - timedelta(days=days_ago)
+        created = [CodeRun.objects.create(snippet=snippet, was_modified=i < modified_runs) for i in range(runs)]
+        CodeRun.objects.filter(pk__in=[run.pk for run in created]).update(run_at=when)
+        created = [ShareActivity.objects.create(snippet=snippet, share_method=method) for method in shares]
+        ShareActivity.objects.filter(pk__in=[share.pk for share in created]).update(shared_at=when)
+
+    def _raw_runs(self):
+        rows = CodeRun.objects.annotate(day=TruncDate('run_at')).values('snippet_id', 'day').annotate(
+            runs=Count('pk'), modified=Count('pk', filter=Q(was_modified=True))
+        ).order_by()
+        return {(row['snippet_id'], row['day']): (row['runs'], row['modified']) for row in rows}
+
+    def _raw_shares(self):
+        rows = ShareActivity.objects.annotate(day=TruncDate('shared_at')).values(
+            'snippet_id', 'day', 'share_method'
+        ).annotate(shares=Count('pk')).order_by()
+        return {(row['snippet_id'], row['day'], row['share_method']): row['shares'] for row in rows}
+
+    def _rolled_up(self):
+        runs = {
+            (row.snippet_id, row.day): (row.run_count, row.modified_run_count)
+            for row in DailySnippetRuns.objects.all()
+        }
+        shares = {
+            (row.snippet_id, row.day, row.share_method): row.share_count
+            for row in DailySnippetShares.objects.all()
+        }
+        return runs, shares
+
+    def _roll_up(self):
+        # Small windows, so groups are merged across several transactions
+        for name in (RUNS_ROLLUP, SHARES_ROLLUP):
+            run_rollup(name, batch_size=2)
+
+    def test_incremental_rollups_match_raw_aggregates(self):
+        self._log(2, self.first, runs=3, modified_runs=1, shares=['link', 'email'])
+        self._log(1, self.first, runs=1, shares=['link'])
+        self._log(1, self.second, runs=2, modified_runs=2, shares=['social', 'social'])
+        self._roll_up()
+        self.assertEqual(self._rolled_up(), (self._raw_runs(), self._raw_shares()))
+
+        # New rows land in existing day groups as well as new ones
+        self._log(2, self.first, runs=2, modified_runs=1, shares=['link'])
+        self._log(0, self.second, runs=1, shares=['email'])
+        self._roll_up()
+        self.assertEqual(self._rolled_up(), (self._raw_runs(), self._raw_shares()))
+
+        # A run with nothing new leaves the tables alone
+        self.assertEqual(run_rollup(RUNS_ROLLUP), 0)
+
+        start = self.today - timedelta(days=2)
+        runs = {point['day']: (point['runs'], point['modified_runs']) for point in get_run_series(start, self.today)}
+        self.assertEqual(runs, {
+            start: (5, 2),
+            start + timedelta(days=1): (3, 2),
+            self.today: (1, 0),
+        })
+        shares = get_share_series(start, self.today, snippet_slug=self.first.slug)
+        self.assertEqual([point['shares'] for point in shares], [3, 1, 0])
+        self.assertEqual(shares[0]['by_method'], {'link': 2, 'email': 1})
+
+    def test_rebuild_matches_raw_aggregates(self):
+        self._log(3, self.first, runs=2, shares=['link'])
+        self._roll_up()
+        DailySnippetRuns.objects.update(run_count=99)
+
+        call_command('rollup_engagement', '--rebuild', stdout=io.StringIO())
+
+        self.assertEqual(self._rolled_up(), (self._raw_runs(), self._raw_shares()))
+
+
+class RenderCacheTests(TestCase):
+    """Renders are stored by content hash, refreshed when a snippet changes and pruned afterwards."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="reader@example.com", password="pass12345")
+        cls.category = Category.objects.create(name="Render")
+
+    def _create(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CodeSnippet.objects.create(
+                title="Rendered", category=self.category, language="python",
+                description="Some *notes*", code_content="print('first')", **fields
+            )
+
+    def _rendered(self, snippet):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('snippet-detail', kwargs={'slug': snippet.slug}), {'rendered': 1}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['rendered']
+
+    def test_save_prerenders_and_reads_are_cache_hits(self):
+        snippet = self._create()
+        self.assertEqual(RenderedContent.objects.count(), 2)
+
+        with mock.patch('codehub.services.render_services.render_source') as render:
+            rendered = self._rendered(snippet)
+        render.assert_not_called()
+        self.assertIn('class="highlight"', rendered['code_content'])
+        self.assertIn('first', rendered['code_content'])
+        self.assertEqual(rendered['description'], "<p>Some <em>notes</em></p>\n")
+
+        # Identical content in another snippet reuses the stored renders
+        self._create()
+        self.assertEqual(RenderedContent.objects.count(), 2)
+
+    def test_edit_renders_the_new_revision(self):
+        snippet = self._create()
+        snippet.code_content = "print('second')"
+        with self.captureOnCommitCallbacks(execute=True):
+            snippet.save()
+
+        with mock.patch('codehub.services.render_services.render_source') as render:
+            rendered = self._rendered(snippet)
+        render.assert_not_called()
+        self.assertIn('second', rendered['code_content'])
+        self.assertNotIn('first', rendered['code_content'])
+
+        # A language change re-renders with the other lexer, even though the code is unchanged
+        snippet.language = "go"
+        snippet.save()
+        self.assertIn('second', self._rendered(snippet)['code_content'])
+        self.assertEqual(RenderedContent.objects.count(), 4)
+
+        call_command('prune_rendered_content', stdout=io.StringIO())
+        self.assertEqual(RenderedContent.objects.count(), 2)
+        with mock.patch('codehub.services.render_services.render_source') as render:
+            self._rendered(snippet)
+        render.assert_not_called()
+
+
+@override_settings(CODEHUB_BLOB_STORE=True, CODEHUB_BLOB_MIN_SIZE=256)
+class SnippetTransferRoundTripTests(TestCase):
+    """An NDJSON export imported into an empty catalog must give back the same snippets."""
+    maxDiff = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="author@example.com", password="pass12345")
+        cls.category = Category.objects.create(name="Python")
+        cls.large = CodeSnippet.objects.create(
+            title="Large", category=cls.category, language="python", tags="python,api",
+            description="Big one", code_content="\n".join(f"line_{n} = {n}" for n in range(60)),
+            additional_files=[{"name": "util.py", "content": "x = 1"}], difficulty=3,
+            simulated_output="59\n",
+        )
+        cls.small = CodeSnippet.objects.create(
+            title="Small", description="Markup", category=cls.category, language="html", tags="web",
+            html_code="<p>  indented\n</p>", css_code="p { color: red; }", is_featured=True,
+        )
+        cls.orphan = CodeSnippet.objects.create(
+            title="No category", description="Loose", code_content="  pass  ", tags="python",
+            simulated_output="Done\n",
+        )
+        Reaction.objects.create(user=cls.user, snippet=cls.large, is_like=True)
+        CodeRun.objects.create(snippet=cls.large)
+
+    def _records(self):
+        return {
+            snippet.slug: (
+                {field: getattr(snippet, field) for field in SNIPPET_TRANSFER_FIELDS},
+                snippet.category_id,
+                sorted(snippet.tag_set.values_list('name', flat=True)),
+            )
+            for snippet in CodeSnippet.objects.all()
+        }
+
+    def _counters(self):
+        return set(CodeSnippet.objects.values_list(*CodeSnippet.ENGAGEMENT_COUNTER_FIELDS))
+
+    def test_export_import_round_trip(self):
+        self.assertIn('code_content', CodeSnippet.objects.get(pk=self.large.pk).content_blobs)
+        original = self._records()
+        tag_counts = dict(Tag.objects.values_list('name', 'usage_count'))
+        lines = list(iter_snippet_export(chunk_size=2))
+        self.assertEqual(len(lines), 3)
+
+        CodeSnippet.objects.all().delete()
+        self.assertEqual(set(Tag.objects.values_list('usage_count', flat=True)), {0})
+        summary = import_snippets(lines, uploaded_by=self.user, batch_size=2)
+
+        self.assertEqual((summary['created'], summary['failed']), (3, 0))
+        self.assertEqual(self._records(), original)
+        self.assertEqual(dict(Tag.objects.values_list('name', 'usage_count')), tag_counts)
+        # Engagement is not transferred, so the imported counters start (and stay consistent) at zero
+        self.assertEqual(self._counters(), {(0, 0, 0, 0, 0, 0)})
+        large = CodeSnippet.objects.get(slug=self.large.slug)
+        self.assertIn('code_content', large.content_blobs)
+        self.assertEqual(large.code_preview, self.large.code_preview)
+        self.assertEqual([s.pk for s in search_snippets(CodeSnippet.objects.all(), "line_55")], [large.pk])
+
+        # Importing the same file again with --skip-existing changes nothing
+        summary = import_snippets(lines, skip_existing=True)
+        self.assertEqual((summary['created'], summary['skipped']), (0, 3))
+        self.assertEqual(self._records(), original)
+
+    def test_bad_lines_do_not_abort_the_import(self):
+        lines = list(iter_snippet_export(CodeSnippet.objects.filter(pk=self.small.pk)))
+        lines += [b'{not json\n', b'{"title": "Lost", "category": "no-such-category"}\n', b'\n']
+
+        summary = import_snippets(lines)
+
+        self.assertEqual((summary['created'], summary['failed']), (1, 2))
+        self.assertEqual([error['line'] for error in summary['errors']], [2, 3])
+        # The imported copy got a fresh slug next to the original
+        self.assertTrue(CodeSnippet.objects.filter(slug=f"{self.small.slug}-1").exists())
+
+
+@unittest.skipIf(renderers.orjson is None, "orjson is not installed")
+class ORJSONRendererTests(TestCase):
+    """
+    The orjson renderer/parser must produce the same documents as DRF's stock classes,
+    for full pages of CodeSnippetListSerializer output. Timings: `manage.py bench_json_renderer`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email="reader@example.com", password="pass12345", first_name="Ada", last_name="Lovelace"
+        )
+        category = Category.objects.create(name="Python")
+        for i in range(20):
+            snippet = CodeSnippet.objects.create(
+                title=f"Snippet {i} \u2028 été",
+                description="A realistic description of what this snippet does. " * 4,
+                short_description="Short description",
+                code_content="\n".join(f"print('line {n}')" for n in range(40)),
+                tags="python,api,beginner",
+                category=category,
+                uploaded_by=cls.user,
+            )
+            Reaction.objects.create(user=cls.user, snippet=snippet, is_like=True)
+            UserHistory.objects.create(user=cls.user, snippet=snippet)
+
+    def _page_data(self):
+        request = APIRequestFactory().get('/api/snippets/', secure=True)
+        request.user = self.user
+        queryset = get_snippet_list_queryset(user=self.user)
+        return CodeSnippetListSerializer(queryset, many=True, context={'request': request}).data
+
+    def test_output_matches_stock_renderer(self):
+        data = {'results': self._page_data(), 'extra': {1: 'int key'}}
+        stock = JSONRenderer().render(data)
+        fast = ORJSONRenderer().render(data)
+        self.assertEqual(json.loads(fast), json.loads(stock))
+        self.assertNotIn('\u2028'.encode(), fast)
+
+        parsed = ORJSONParser().parse(io.BytesIO(fast))
+        self.assertEqual(parsed, JSONParser().parse(io.BytesIO(stock)))
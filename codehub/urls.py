@@ -25,6 +25,10 @@ from .views.comments import SnippetCommentsView, CommentDetailView
 from .views.shares import SnippetShareActivityView
 from .views.user_history import UserHistoryListCreateView, UserHistoryDetailView
 from .views.code_runs import SnippetRunView
+from .views.tags import TagListView
+from .views.events import EngagementEventBatchView
+from .views.analytics import RunAnalyticsView, ShareAnalyticsView
+from .views.transfer import SnippetExportView, SnippetImportView
 
 
 urlpatterns = [
@@ -38,6 +42,8 @@ urlpatterns = [
     
     # Snippet endpoints
     path('snippets/create/', SnippetCreateView.as_view(), name='snippet-create'),
+    path('snippets/export/', SnippetExportView.as_view(), name='snippet-export'),
+    path('snippets/import/', SnippetImportView.as_view(), name='snippet-import'),
     path('snippets/', SnippetListView.as_view(), name='snippet-list'),
     path('snippets/<slug:slug>/', SnippetDetailView.as_view(), name='snippet-detail'),
     path('snippets/<slug:slug>/update/', SnippetUpdateView.as_view(), name='snippet-update'),
@@ -81,6 +87,16 @@ urlpatterns = [
     
     # Code Run endpoint
     path('snippets/<slug:slug>/run/', SnippetRunView.as_view(), name='snippet-run'),
+
+    # Tag endpoints
+    path('tags/', TagListView.as_view(), name='tag-list'),
+
+    # Batched run/share/view events
+    path('events/batch/', EngagementEventBatchView.as_view(), name='event-batch'),
+
+    # Daily rollup analytics
+    path('analytics/runs/', RunAnalyticsView.as_view(), name='analytics-runs'),
+    path('analytics/shares/', ShareAnalyticsView.as_view(), name='analytics-shares'),
 ]
 
 
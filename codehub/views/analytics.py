@@ -0,0 +1,85 @@
+# codehub/views/analytics.py
+
+from django.utils.dateparse import parse_date
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import ShareActivity
+from ..services.rollup_services import (
+    RUNS_ROLLUP,
+    SHARES_ROLLUP,
+    get_rollup_updated_at,
+    get_run_series,
+    get_series_range,
+    get_share_series,
+)
+
+
+class RollupAnalyticsMixin:
+    """
+    Shared query params: ?snippet=<slug>&start=YYYY-MM-DD&end=YYYY-MM-DD (default: last 30 days).
+    Served from the daily rollup tables, so the cost does not grow with the raw event tables.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def _get_date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValidationError({name: "Use the YYYY-MM-DD format."})
+        return parsed
+
+    def get_range(self):
+        try:
+            return get_series_range(self._get_date_param('start'), self._get_date_param('end'))
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+
+
+class RunAnalyticsView(RollupAnalyticsMixin, APIView):
+    """
+    GET: Code runs per day, for one snippet (?snippet=<slug>) or the whole site.
+    """
+    def get(self, request, *args, **kwargs):
+        start, end = self.get_range()
+        snippet = request.query_params.get('snippet')
+        series = get_run_series(start, end, snippet_slug=snippet)
+        return Response({
+            'snippet': snippet,
+            'start': start,
+            'end': end,
+            'total_runs': sum(point['runs'] for point in series),
+            'updated_at': get_rollup_updated_at(RUNS_ROLLUP),
+            'series': series,
+        })
+
+
+class ShareAnalyticsView(RollupAnalyticsMixin, APIView):
+    """
+    GET: Shares per day with a per-method breakdown; ?share_method=link|email|social narrows it.
+    """
+    def get(self, request, *args, **kwargs):
+        start, end = self.get_range()
+        snippet = request.query_params.get('snippet')
+        share_method = request.query_params.get('share_method')
+        if share_method and share_method not in ShareActivity.ShareMethod.values:
+            raise ValidationError({'share_method': f"Choose one of: {', '.join(ShareActivity.ShareMethod.values)}."})
+
+        series = get_share_series(start, end, snippet_slug=snippet, share_method=share_method)
+        by_method = {}
+        for point in series:
+            for method, count in point['by_method'].items():
+                by_method[method] = by_method.get(method, 0) + count
+        return Response({
+            'snippet': snippet,
+            'start': start,
+            'end': end,
+            'total_shares': sum(by_method.values()),
+            'by_method': by_method,
+            'updated_at': get_rollup_updated_at(SHARES_ROLLUP),
+            'series': series,
+        })
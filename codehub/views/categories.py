@@ -105,21 +105,26 @@
 # codehub/views/categories.py
 
 from rest_framework import generics, permissions, filters
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 from ..models import Category
 from ..serializers import CategorySerializer, CodeSnippetListSerializer
-from ..filters import CodeSnippetFilter  # Your existing filter
+from ..filters import CodeSnippetFilter, SnippetSearchFilter, SnippetOrderingFilter  # Your existing filter
 from user_account.permissions import IsAdminOrSuperUser
 from ..services.category_services import (
     validate_category_name,
     generate_category_slug,
     get_category_with_stats
 )
+from ..services.queryset_services import get_snippet_list_queryset
+from ..services.cache_services import CATEGORY_LIST_TAG, category_tag
+from .mixins import CachedListMixin, ConditionalGetMixin
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CachedListMixin, generics.ListAPIView):
     """
     GET: List all categories with advanced filtering
+    Responses are cached per query string (see CachedListMixin).
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -133,6 +138,11 @@ class CategoryListView(generics.ListAPIView):
     search_fields = ['name', 'slug', 'description']
     ordering_fields = ['name', 'created_at', 'updated_at']
     ordering = ['name']
+    cache_anonymous_only = False  # Category payloads are the same for every user
+    tag_page_snippets = False
+
+    def get_cache_tags(self):
+        return [CATEGORY_LIST_TAG]
 
 class CategoryCreateView(generics.CreateAPIView):
     """
@@ -148,18 +158,23 @@ class CategoryCreateView(generics.CreateAPIView):
         slug = generate_category_slug(name)
         serializer.save(slug=slug)
 
-class CategoryDetailView(generics.RetrieveAPIView):
+class CategoryDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     GET: Retrieve category by slug with enhanced statistics
+    Supports conditional GET (ETag / Last-Modified, see ConditionalGetMixin).
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_conditional_tags(self):
+        # Bumped by edits to the category and to any snippet in it
+        return [category_tag(self.kwargs['slug'])]
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        data = get_category_with_stats(instance)
+        data = get_category_with_stats(instance, context=self.get_serializer_context())
         return Response(data)
 
 class CategoryUpdateView(generics.UpdateAPIView):
@@ -177,7 +192,7 @@ class CategoryUpdateView(generics.UpdateAPIView):
         
         if name and name != instance.name:
             validate_category_name(name, instance=instance)
-            serializer.save(slug=generate_category_slug(name))
+            serializer.save(slug=generate_category_slug(name, existing_id=instance.pk))
         else:
             serializer.save()
 
@@ -190,18 +205,25 @@ class CategoryDeleteView(generics.DestroyAPIView):
     lookup_field = 'slug'
     permission_classes = [IsAdminOrSuperUser]
 
-class CategorySnippetsView(generics.ListAPIView):
+class CategorySnippetsView(CachedListMixin, generics.ListAPIView):
     """
     GET: List snippets in category with full filtering capabilities
+    Anonymous responses are cached per query string (see CachedListMixin).
     """
     serializer_class = CodeSnippetListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SnippetSearchFilter, SnippetOrderingFilter]
     filterset_class = CodeSnippetFilter  # Your existing snippet filter
     ordering_fields = ['-created_at', 'title', 'difficulty']
     ordering = ['-created_at']
 
+    def get_cache_tags(self):
+        return [category_tag(self.kwargs['slug'])]
+
     def get_queryset(self):
         category_slug = self.kwargs['slug']
         category = get_object_or_404(Category, slug=category_slug)
-        return category.snippets.all()
\ No newline at end of file
+        return get_snippet_list_queryset(
+            user=self.request.user,
+            queryset=category.snippets.all()
+        )
\ No newline at end of file
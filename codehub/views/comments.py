@@ -3,11 +3,20 @@
 
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.db.models import Q # For filtering top-level comments if needed
 
 from ..models import CodeSnippet, Comment
 from ..serializers import CommentSerializer # <--- Import your CommentSerializer
+from ..pagination import SelectablePaginationMixin
+from ..services.cache_services import comments_tag, get_cached_lookup, set_cached_lookup
+from .mixins import ConditionalGetMixin
+from ..services.comment_services import (
+    load_comment_tree,
+    DEFAULT_COMMENT_DEPTH,
+    MAX_COMMENT_DEPTH
+)
 
 # Custom permission to allow owners to edit/delete, others to only read
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -25,14 +34,70 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
     
     
 
-class SnippetCommentsView(generics.ListCreateAPIView):
+class SnippetCommentsView(SelectablePaginationMixin, ConditionalGetMixin, generics.ListCreateAPIView):
+    """
+    GET: List top-level comments (with nested replies) for a snippet.
+         The whole page, replies included, is loaded with a fixed number of queries.
+         `?depth=N` renders N reply levels (default 1, max 10).
+         `?replies_limit=N` caps the replies rendered per comment (see `reply_count`).
+         `?parent=<id>` lists the replies of one comment instead, for paging through a level.
+         `?paginator=cursor` switches to keyset pagination on (-created_at, -id).
+         Supports conditional GET (ETag / Last-Modified, see ConditionalGetMixin).
+    POST: Create a comment or reply (authenticated users).
+    """
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    def _get_int_param(self, name, default, minimum, maximum=None):
+        try:
+            value = int(self.request.query_params.get(name, default))
+        except (TypeError, ValueError):
+            raise ValidationError({name: "Must be an integer."})
+        if value < minimum or (maximum is not None and value > maximum):
+            raise ValidationError({name: f"Must be between {minimum} and {maximum}." if maximum else f"Must be at least {minimum}."})
+        return value
+
+    def get_snippet(self):
+        if not hasattr(self, '_snippet'):
+            self._snippet = get_object_or_404(CodeSnippet.objects.only('id', 'slug'), slug=self.kwargs['slug'])
+            set_cached_lookup('snippet-slug', self._snippet.slug, self._snippet.pk)
+        return self._snippet
+
+    def get_conditional_tags(self):
+        snippet_id = get_cached_lookup('snippet-slug', self.kwargs['slug'])
+        return [comments_tag(snippet_id)] if snippet_id is not None else None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'GET':
+            context['comment_depth'] = self._get_int_param('depth', DEFAULT_COMMENT_DEPTH, 1, MAX_COMMENT_DEPTH)
+            if 'replies_limit' in self.request.query_params:
+                context['replies_limit'] = self._get_int_param('replies_limit', None, 1)
+        return context
+
     def get_queryset(self):
-        snippet_slug = self.kwargs['slug']
-        get_object_or_404(CodeSnippet, slug=snippet_slug) 
-        return Comment.objects.filter(snippet__slug=snippet_slug, parent__isnull=True).order_by('-created_at')
+        snippet = self.get_snippet()
+        queryset = Comment.objects.filter(snippet=snippet).select_related('user')
+        parent_id = self.request.query_params.get('parent')
+        if parent_id:
+            if not parent_id.isdigit():
+                raise ValidationError({'parent': "Must be a comment id."})
+            return queryset.filter(parent_id=parent_id).order_by('-created_at')
+        return queryset.filter(parent__isnull=True).order_by('-created_at')
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        comments = load_comment_tree(
+            page if page is not None else queryset,
+            snippet_id=self.get_snippet().pk,
+            depth=context['comment_depth']
+        )
+        serializer = self.get_serializer_class()(comments, many=True, context=context)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
 
     def perform_create(self, serializer):
         """
@@ -56,9 +121,9 @@ class SnippetCommentsView(generics.ListCreateAPIView):
             
             
 
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
-    GET: Retrieve a specific comment.
+    GET: Retrieve a specific comment (supports conditional GET, see ConditionalGetMixin).
     PUT/PATCH: Update a specific comment.
     DELETE: Delete a specific comment.
     """
@@ -67,6 +132,15 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     lookup_field = 'pk' # Use primary key for lookup (e.g., /comments/1/)
 
+    def get_conditional_tags(self):
+        snippet_id = get_cached_lookup('comment-snippet', self.kwargs['pk'])
+        return [comments_tag(snippet_id)] if snippet_id is not None else None
+
+    def get_object(self):
+        comment = super().get_object()
+        set_cached_lookup('comment-snippet', comment.pk, comment.snippet_id)
+        return comment
+
     # Optional: If you want to ensure the comment belongs to the snippet in the URL
     # def get_queryset(self):
     #     queryset = super().get_queryset()
@@ -0,0 +1,41 @@
+# codehub/views/events.py
+
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+
+from ..serializers import EngagementEventSerializer
+from ..services.event_services import MAX_EVENTS_PER_BATCH, ingest_events
+
+
+class EngagementEventBatchView(generics.GenericAPIView):
+    """
+    POST: Log a batch of engagement events in one request.
+          Body: {"events": [{"type": "run"|"share"|"view", "snippet": "<slug>", ...}, ...]}
+          (a bare list is accepted too). Run events take was_modified/execution_time,
+          share events share_method/shared_to; view events require authentication.
+          Valid events are stored even if others fail; the response lists a result per event.
+    """
+    serializer_class = EngagementEventSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        data = request.data
+        if isinstance(data, list):
+            events = data
+        else:
+            # A scalar or string JSON body has no 'events' to look up
+            events = data.get('events') if isinstance(data, dict) else None
+        if not isinstance(events, list) or not events:
+            return Response({"detail": "Expected a non-empty list of events."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > MAX_EVENTS_PER_BATCH:
+            return Response(
+                {"detail": f"A batch may contain at most {MAX_EVENTS_PER_BATCH} events."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = ingest_events(events, self.get_serializer_context())
+        created = sum(1 for result in results if result['status'] == 'created')
+        return Response(
+            {"created": created, "failed": len(results) - created, "results": results},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
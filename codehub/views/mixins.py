@@ -0,0 +1,131 @@
+# codehub/views/mixins.py
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from src.utils import is_shared_cache
+from ..services.cache_services import (
+    build_response_cache_key,
+    get_cached_response,
+    get_cached_response_tags,
+    get_conditional_validators,
+    set_cached_response,
+    snippet_tag,
+    start_response_build,
+)
+
+
+class ConditionalGetMixin:
+    """
+    Adds a weak ETag and Last-Modified to GET responses, and answers If-None-Match /
+    If-Modified-Since with 304 Not Modified.
+
+    Both validators are derived from the cached versions of the tags the response depends
+    on, so the 304 decision runs no query and no serializer. `get_conditional_tags()`
+    returns those tags, or None to skip conditional handling for the request.
+
+    The validators are read before the payload is built, so an invalidation committed
+    meanwhile changes the next ETag instead of pinning a stale body under a fresh one. A
+    response whose tags were unknown beforehand (e.g. the first request for an object)
+    gets no validators. Tag versions only reach every worker through a shared cache, so
+    with a per-process backend no validators are sent at all.
+
+    Views whose payload depends on the requesting user set `payload_varies_on_user`: their
+    validators include the user's id, and their compressed bodies are never shared through
+    the cache (see src.middleware.CompressionMiddleware).
+    """
+    payload_varies_on_user = False
+
+    def get_conditional_tags(self):
+        return None
+
+    def get_conditional_validators(self, tags):
+        if not tags:
+            return None
+        view_kwargs = dict(self.kwargs)
+        if self.payload_varies_on_user:
+            view_kwargs['user'] = str(self.request.user.pk)
+        cache_key = build_response_cache_key(self.request, self.__class__.__name__, view_kwargs)
+        return get_conditional_validators(cache_key, tags)
+
+    def get(self, request, *args, **kwargs):
+        tags = self.get_conditional_tags() if is_shared_cache() else None
+        validators = self.get_conditional_validators(tags)
+        response = None
+        if validators:
+            etag, last_modified = validators
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            # The payload may depend on other tags than the validators were read for
+            # (e.g. a slug now pointing at another snippet); then it gets none
+            if validators and set(self.get_conditional_tags() or ()) != set(tags):
+                validators = None
+
+        if validators:
+            etag, last_modified = validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            # The ETag pins the payload version, so src.middleware.CompressionMiddleware
+            # may cache the compressed body under it, unless the body is per-user
+            response.cache_compressed = not self.payload_varies_on_user
+        return response
+
+
+class CachedListMixin(ConditionalGetMixin):
+    """
+    Caches the serialized output of a ListAPIView in the default cache.
+
+    Entries are tagged with `get_cache_tags()` plus one tag per snippet on the page,
+    and are invalidated by the signal receivers in codehub.models. The tag versions are
+    read before the page is built (see start_response_build).
+    Views whose payload depends on the requesting user only cache anonymous requests.
+    Cacheable responses also carry conditional-GET validators built from the same tags.
+    Only a shared cache backend is used: invalidations would not reach other workers'
+    per-process caches.
+    """
+    cache_anonymous_only = True
+    tag_page_snippets = True
+
+    def get_cache_tags(self):
+        return []
+
+    def is_response_cacheable(self, request):
+        if request.method != 'GET' or not is_shared_cache():
+            return False
+        if self.cache_anonymous_only and request.user.is_authenticated:
+            return False
+        return True
+
+    def get_conditional_tags(self):
+        if not self.is_response_cacheable(self.request):
+            return None
+        return get_cached_response_tags(
+            build_response_cache_key(self.request, self.__class__.__name__, self.kwargs)
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self._cache_page_objects = page
+        return page
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_response_cacheable(request):
+            return super().list(request, *args, **kwargs)
+
+        cache_key = build_response_cache_key(request, self.__class__.__name__, self.kwargs)
+        data = get_cached_response(cache_key)
+        if data is not None:
+            return Response(data)
+
+        snapshot = start_response_build(self.get_cache_tags())
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            page_tags = []
+            if self.tag_page_snippets:
+                page_tags = [snippet_tag(obj.pk) for obj in getattr(self, '_cache_page_objects', None) or []]
+            set_cached_response(cache_key, response.data, snapshot, page_tags)
+        return response
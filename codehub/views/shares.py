@@ -5,17 +5,20 @@ from django.shortcuts import get_object_or_404
 
 from ..models import ShareActivity, CodeSnippet # Import CodeSnippet
 from ..serializers import ShareActivitySerializer
+from ..pagination import SelectablePaginationMixin
 
-class SnippetShareActivityView(generics.ListCreateAPIView):
+class SnippetShareActivityView(SelectablePaginationMixin, generics.ListCreateAPIView):
     """
     GET: List share activities for a specific code snippet.
          (Optional: you might only need POST for simple share logging)
+         `?paginator=cursor` switches to keyset pagination on (-shared_at, -id).
     POST: Create a new share activity for a code snippet.
     """
     serializer_class = ShareActivitySerializer
     # Allow shares from unauthenticated users if you want to track all shares.
     # If shares should only be logged for authenticated users, change to [IsAuthenticated].
     permission_classes = [AllowAny] 
+    cursor_ordering = ('-shared_at', '-id')
 
     def get_queryset(self):
         """
@@ -16,24 +16,37 @@ from ..serializers import (
     CodeRunSerializer
 )
 from user_account.permissions import IsAdminOrSuperUser # Ensure this is correctly imported
-from ..filters import CodeSnippetFilter
+from ..filters import CodeSnippetFilter, SnippetSearchFilter, SnippetOrderingFilter
 from ..services.snippet_services import (
     process_code_content,
     get_snippet_with_engagement
 )
+from ..services.queryset_services import get_snippet_list_queryset
+from ..services.render_services import get_rendered_fields
+from ..services.cache_services import (
+    CATEGORY_LIST_TAG,
+    SNIPPET_LIST_TAG,
+    get_cached_lookup,
+    set_cached_lookup,
+    snippet_tag,
+)
+from .mixins import CachedListMixin, ConditionalGetMixin
+from ..pagination import SelectablePaginationMixin
 
 
-class SnippetListView(generics.ListAPIView):
+class SnippetListView(SelectablePaginationMixin, CachedListMixin, generics.ListAPIView):
     """
     GET: List all code snippets (Public)
     Includes filtering, searching, and ordering capabilities.
+    Anonymous responses are cached per query string (see CachedListMixin).
+    `?paginator=cursor` switches to keyset pagination on (-created_at, -id).
     """
     queryset = CodeSnippet.objects.all()
     serializer_class = CodeSnippetListSerializer
     permission_classes = [permissions.AllowAny] # As requested, public access
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SnippetSearchFilter, SnippetOrderingFilter]
     filterset_class = CodeSnippetFilter # Use the existing CodeSnippetFilter
-    search_fields = ['title', 'description', 'code_content', 'tags'] # Fields to search across
+    # ?search= / ?q= match title, tags, description and code via the full-text index (see search_utils)
     ordering_fields = [ # Fields allowed for ordering
         '-created_at', 'created_at',
         '-updated_at', 'updated_at',
@@ -42,6 +55,13 @@ class SnippetListView(generics.ListAPIView):
         'language', '-language',
     ]
     ordering = ['-created_at'] # Default ordering
+
+    def get_cache_tags(self):
+        return [SNIPPET_LIST_TAG]
+
+    def get_queryset(self):
+        # Counts come from counter columns and per-user data is prefetched, so a page costs a fixed number of queries
+        return get_snippet_list_queryset(user=self.request.user)
     
     
 
@@ -74,18 +94,32 @@ class SnippetCreateView(generics.CreateAPIView):
             )
 
 
-class SnippetDetailView(generics.RetrieveAPIView):
+class SnippetDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
     GET: Retrieve snippet details (Authenticated)
+    `?rendered=1` adds `rendered`: highlighted HTML per code field and sanitized description HTML.
+    Supports conditional GET (ETag / Last-Modified, see ConditionalGetMixin).
     """
     queryset = CodeSnippet.objects.all()
     serializer_class = CodeSnippetSerializer
     lookup_field = 'slug'
     permission_classes = [permissions.IsAuthenticated]
+    # The payload carries the requesting user's reaction and history
+    payload_varies_on_user = True
+
+    def get_conditional_tags(self):
+        snippet_id = get_cached_lookup('snippet-slug', self.kwargs['slug'])
+        if snippet_id is None:
+            return None
+        # The payload embeds the category name, so category edits count as changes too
+        return [snippet_tag(snippet_id), CATEGORY_LIST_TAG]
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        data = get_snippet_with_engagement(instance)
+        set_cached_lookup('snippet-slug', instance.slug, instance.pk)
+        data = get_snippet_with_engagement(instance, context=self.get_serializer_context())
+        if request.query_params.get('rendered', '').lower() in ('1', 'true'):
+            data['rendered'] = get_rendered_fields(instance)
         return Response(data)
 
 class SnippetUpdateView(generics.UpdateAPIView):
@@ -0,0 +1,29 @@
+# codehub/views/tags.py
+
+from rest_framework import generics, permissions
+
+from ..models import Tag
+from ..serializers import TagSerializer
+from ..services.cache_services import TAG_LIST_TAG
+from .mixins import CachedListMixin
+
+
+class TagListView(CachedListMixin, generics.ListAPIView):
+    """
+    GET: List tags in use with their precomputed usage counts (public access)
+    Optional `?q=` narrows the list by tag name prefix.
+    """
+    serializer_class = TagSerializer
+    permission_classes = [permissions.AllowAny]
+    cache_anonymous_only = False  # Tag payloads are the same for every user
+    tag_page_snippets = False
+
+    def get_cache_tags(self):
+        return [TAG_LIST_TAG]
+
+    def get_queryset(self):
+        queryset = Tag.objects.filter(usage_count__gt=0).order_by('-usage_count', 'name')
+        prefix = self.request.query_params.get('q', '').strip().lower()
+        if prefix:
+            queryset = queryset.filter(name__startswith=prefix)
+        return queryset
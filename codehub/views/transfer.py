@@ -0,0 +1,60 @@
+# codehub/views/transfer.py
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.response import Response
+
+from user_account.permissions import IsAdminOrSuperUser
+from ..models import CodeSnippet
+from ..services.transfer_services import import_snippets, iter_snippet_export
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+
+class SnippetExportView(generics.GenericAPIView):
+    """
+    GET: Download the snippet catalog as NDJSON, one snippet per line (Admin Only).
+         Optional filters: ?category=<slug>, ?language=<language>.
+         The file is streamed while it is read from the database, so it can be of any size.
+    """
+    permission_classes = [IsAdminOrSuperUser]
+
+    def get(self, request, *args, **kwargs):
+        queryset = CodeSnippet.objects.all()
+        if request.query_params.get('category'):
+            queryset = queryset.filter(category__slug=request.query_params['category'])
+        if request.query_params.get('language'):
+            queryset = queryset.filter(language=request.query_params['language'])
+
+        response = StreamingHttpResponse(iter_snippet_export(queryset), content_type=NDJSON_CONTENT_TYPE)
+        filename = f"snippets-{timezone.now():%Y%m%d-%H%M%S}.ndjson"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class SnippetImportView(generics.GenericAPIView):
+    """
+    POST: Import snippets from an NDJSON body (Content-Type: application/x-ndjson), one
+          snippet per line as produced by the export (Admin Only). Categories are referenced
+          by slug; taken slugs get a numeric suffix, or `?skip_existing=1` skips those lines.
+          Valid lines are stored even if others fail; the response counts created, skipped
+          and failed lines and lists the errors by line number.
+    """
+    permission_classes = [IsAdminOrSuperUser]
+
+    def post(self, request, *args, **kwargs):
+        # Read line by line from the request stream rather than parsing the whole body
+        stream = request.stream
+        if stream is None:
+            return Response({"detail": "Expected an NDJSON body."}, status=status.HTTP_400_BAD_REQUEST)
+
+        skip_existing = request.query_params.get('skip_existing', '').lower() in ('1', 'true')
+        summary = import_snippets(stream, uploaded_by=request.user, skip_existing=skip_existing)
+        if summary['failed'] and not (summary['created'] or summary['skipped']):
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif summary['created']:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(summary, status=response_status)
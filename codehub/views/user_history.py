@@ -8,17 +8,20 @@ from django.db.models import F # Import F expression
 from ..models import UserHistory, CodeSnippet, CustomUser # Ensure CustomUser is imported
 from ..serializers import UserHistorySerializer
 from ..permissions import IsOwnerOfUserHistory # Import your custom permission
+from ..pagination import SelectablePaginationMixin
 
-class UserHistoryListCreateView(generics.ListCreateAPIView):
+class UserHistoryListCreateView(SelectablePaginationMixin, generics.ListCreateAPIView):
     """
     GET: List all user history entries for the authenticated user (their viewing/saving history).
     POST: Create a new user history entry or update an existing one (for logging a view).
           If a history entry for the user and snippet already exists, its view_count will be incremented
           and last_viewed updated.
           This is typically hit when a user *views* a snippet.
+    `?paginator=cursor` switches the listing to keyset pagination on (-last_viewed, -id).
     """
     serializer_class = UserHistorySerializer
     permission_classes = [permissions.IsAuthenticated] # Only authenticated users have a history
+    cursor_ordering = ('-last_viewed', '-id')
 
     def get_queryset(self):
         """
@@ -154,7 +154,8 @@
 # contact/admin.py
 
 from django.contrib import admin, messages
-from .models import Contact, NewsletterSubscriber, DeletedSubscriber
+from .models import Contact, NewsletterSubscriber, DeletedSubscriber, EmailJob
+from .outbox import EmailOutboxService
 from .services import NewsletterService
 
 @admin.register(Contact)
@@ -246,4 +247,29 @@ class DeletedSubscriberAdmin(admin.ModelAdmin):
                 level=messages.WARNING
             )
 
-    reactivate_selected_subscribers.short_description = "Reactivate selected deleted subscribers"
\ No newline at end of file
+    reactivate_selected_subscribers.short_description = "Reactivate selected deleted subscribers"
+
+
+@admin.register(EmailJob)
+class EmailJobAdmin(admin.ModelAdmin):
+    list_display = ('to_email', 'subject', 'transport', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'transport', 'created_at')
+    search_fields = ('to_email', 'subject', 'last_error')
+    readonly_fields = ('attempts', 'locked_at', 'last_error', 'created_at', 'updated_at', 'sent_at')
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
+    actions = ['requeue_selected_jobs']
+
+    fieldsets = (
+        (None, {'fields': ('to_email', 'to_name', 'from_email', 'from_name', 'subject', 'transport')}),
+        ('Content', {'fields': ('html_content', 'text_content', 'template_name', 'context'), 'classes': ('collapse',)}),
+        ('Delivery', {'fields': ('status', 'attempts', 'max_attempts', 'next_attempt_at', 'locked_at', 'last_error')}),
+        ('Timestamps', {'fields': ('created_at', 'updated_at', 'sent_at'), 'classes': ('collapse',)}),
+    )
+
+    def requeue_selected_jobs(self, request, queryset):
+        """Reset attempts on unsent jobs (typically dead-lettered ones) so the worker picks them up again."""
+        requeued = EmailOutboxService.requeue_jobs(queryset)
+        self.message_user(request, f"Requeued {requeued} email job(s).", level=messages.SUCCESS)
+
+    requeue_selected_jobs.short_description = "Requeue selected email jobs"
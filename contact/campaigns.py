@@ -0,0 +1,396 @@
+# contact/campaigns.py
+
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import quote
+
+import requests
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape, strip_tags
+
+from .models import NewsletterCampaign, NewsletterSubscriber
+from .outbox import BREVO_SEND_URL, render_inlined_html
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_TEMPLATE = 'newsletter/campaign_email.html'
+
+# Stand-ins for per-recipient values, so the campaign is rendered and CSS-inlined only once
+RECIPIENT_EMAIL = '__RECIPIENT_EMAIL__'
+RECIPIENT_EMAIL_URL = '__RECIPIENT_EMAIL_URL__'
+
+# Brevo accepts up to 1000 message versions per API call
+BREVO_MAX_VERSIONS = 1000
+
+
+class CampaignEmail:
+    """
+    A campaign rendered once with placeholders; `personalize()` fills in one recipient.
+    """
+    def __init__(self, campaign):
+        from .services import NewsletterService  # Imported locally to break circular dependency
+
+        website_url = getattr(settings, 'FRONTEND_URL', None) or 'https://www.alexandercyril.xyz'
+        context = {
+            'title': campaign.title,
+            'subject': campaign.subject,
+            'content': campaign.content,
+            'subscriber_email': RECIPIENT_EMAIL,
+            'unsubscribe_url': NewsletterService.get_unsubscribe_url(RECIPIENT_EMAIL_URL),
+            'preferences_url': f"{website_url}/preferences",
+            'website_url': website_url,
+            'current_year': timezone.now().year,
+            'current_month_year': timezone.now().strftime("%B %Y"),
+        }
+        self.subject = campaign.subject
+        self.html_content = render_inlined_html(render_to_string(CAMPAIGN_TEMPLATE, context))
+        self.text_content = strip_tags(self.html_content)
+
+    @staticmethod
+    def _fill(content, email_url, email):
+        # The URL placeholder goes first: it is the longer of the two
+        return content.replace(RECIPIENT_EMAIL_URL, email_url).replace(RECIPIENT_EMAIL, email)
+
+    def personalize(self, email):
+        """Returns: (html_content, text_content) for one recipient."""
+        return (
+            self._fill(self.html_content, quote(email), escape(email)),
+            self._fill(self.text_content, quote(email), email),
+        )
+
+
+# DELIVERY BACKENDS ----------------------------------------------------------------------------
+class SMTPCampaignBackend:
+    """
+    One pooled SMTP connection per sender thread, reused across every batch of the campaign.
+    """
+    backend = None  # None -> settings.EMAIL_BACKEND
+    batch_size = 50  # Recipients per send() call, i.e. per checkpoint
+    max_retries = 3
+
+    def __init__(self, campaign_email):
+        self.campaign_email = campaign_email
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = get_connection(self.backend, fail_silently=False)
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _build_message(self, email, connection):
+        html_content, text_content = self.campaign_email.personalize(email)
+        message = EmailMultiAlternatives(
+            subject=self.campaign_email.subject,
+            body=text_content,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+            connection=connection,
+        )
+        message.attach_alternative(html_content, "text/html")
+        return message
+
+    @staticmethod
+    def _is_transient(error):
+        """4xx replies (mailbox busy, greylisting, rate limits) may succeed on a later attempt."""
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            codes = [code for code, _ in error.recipients.values()]
+        else:
+            codes = [error.smtp_code]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+
+    def send(self, emails):
+        """
+        Deliver to `emails`. Returns: (sent, failed).
+        Permanently refused recipients are counted as failed; transient (4xx) refusals and
+        connection errors are retried, the latter on a fresh connection.
+        """
+        sent = failed = 0
+        for email in emails:
+            for attempt in range(1, self.max_retries + 1):
+                connection = self._get_connection()
+                try:
+                    sent += connection.send_messages([self._build_message(email, connection)])
+                    break
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                    if not self._is_transient(e) or attempt == self.max_retries:
+                        logger.error(f"Campaign email to {email} was rejected: {str(e)}")
+                        failed += 1
+                        break
+                    if getattr(e, 'smtp_code', None) == 421:  # The server is closing the connection
+                        self._drop_connection(connection)
+                    logger.warning(f"Campaign email to {email} was deferred, retrying: {str(e)}")
+                    time.sleep(2 ** attempt)
+                except OSError as e:
+                    # Server dropped us; the next attempt opens a fresh connection
+                    self._drop_connection(connection)
+                    if attempt == self.max_retries:
+                        raise
+                    logger.warning(f"SMTP connection error sending campaign, retrying: {str(e)}")
+                    time.sleep(2 ** attempt)
+        return sent, failed
+
+    def _drop_connection(self, connection):
+        self._local.connection = None
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        for connection in self._connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+class LocmemCampaignBackend(SMTPCampaignBackend):
+    backend = "django.core.mail.backends.locmem.EmailBackend"
+
+
+class BrevoCampaignBackend:
+    """
+    Sends one Brevo API call per batch, with one message version per recipient.
+    The per-recipient values are substituted by Brevo from each version's params.
+    """
+    batch_size = BREVO_MAX_VERSIONS
+    timeout = 30
+    max_retries = 3
+
+    def __init__(self, campaign_email):
+        def to_brevo(content):
+            return CampaignEmail._fill(content, '{{ params.email_url }}', '{{ params.email }}')
+
+        self.campaign_email = campaign_email
+        self.html_content = to_brevo(campaign_email.html_content)
+        self.text_content = to_brevo(campaign_email.text_content)
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _get_session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "accept": "application/json",
+                "api-key": settings.BREVO_API_KEY,
+                "content-type": "application/json",
+            })
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def send(self, emails):
+        sent = 0
+        for start in range(0, len(emails), BREVO_MAX_VERSIONS):
+            batch = emails[start:start + BREVO_MAX_VERSIONS]
+            email_data = {
+                "sender": {
+                    "name": settings.EMAIL_SENDER_NAME,
+                    "email": settings.EMAIL_SENDER_EMAIL,
+                },
+                "subject": self.campaign_email.subject,
+                "htmlContent": self.html_content,
+                "textContent": self.text_content,
+                "messageVersions": [
+                    {"to": [{"email": email}], "params": {"email": email, "email_url": quote(email)}}
+                    for email in batch
+                ],
+            }
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    response = self._get_session().post(BREVO_SEND_URL, json=email_data, timeout=self.timeout)
+                except requests.RequestException as e:
+                    error = f"Brevo request failed: {e}"
+                else:
+                    if response.status_code in (200, 201, 202):
+                        sent += len(batch)
+                        break
+                    error = f"Brevo returned {response.status_code}: {response.text}"
+                if attempt == self.max_retries:
+                    raise RuntimeError(error)
+                logger.warning(f"Campaign batch failed, retrying: {error}")
+                time.sleep(2 ** attempt)
+        return sent, 0
+
+    def close(self):
+        for session in self._sessions:
+            session.close()
+
+
+CAMPAIGN_BACKENDS = {
+    'smtp': SMTPCampaignBackend,
+    'locmem': LocmemCampaignBackend,
+    'brevo': BrevoCampaignBackend,
+}
+
+
+def get_campaign_backend_class():
+    """EMAIL_OUTBOX_TRANSPORT (e.g. "locmem" in tests) takes precedence, as for the outbox."""
+    name = (getattr(settings, 'EMAIL_OUTBOX_TRANSPORT', None)
+            or getattr(settings, 'NEWSLETTER_CAMPAIGN_TRANSPORT', 'smtp'))
+    return CAMPAIGN_BACKENDS[name]
+
+
+# CAMPAIGN SENDER ------------------------------------------------------------------------------
+class NewsletterCampaignService:
+    @staticmethod
+    def get_stale_after():
+        return timedelta(seconds=getattr(settings, 'NEWSLETTER_CAMPAIGN_LEASE_SECONDS', 600))
+
+    @staticmethod
+    def get_due_campaign_ids():
+        """Scheduled campaigns whose time has come, plus interrupted sends to resume."""
+        now = timezone.now()
+        return list(
+            NewsletterCampaign.objects.filter(
+                Q(status='scheduled', scheduled_for__lte=now) |
+                Q(status='sending', updated_at__lt=now - NewsletterCampaignService.get_stale_after())
+            ).order_by('scheduled_for', 'pk').values_list('pk', flat=True)
+        )
+
+    @staticmethod
+    def claim_campaign(campaign_id):
+        """
+        Mark a campaign as sending. Returns None if another sender holds it
+        (status "sending" with a checkpoint newer than the lease) or it is already finished.
+        """
+        stale = timezone.now() - NewsletterCampaignService.get_stale_after()
+        with transaction.atomic():
+            campaign = (
+                NewsletterCampaign.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(pk=campaign_id),
+                    Q(status__in=['draft', 'scheduled']) | Q(status='sending', updated_at__lt=stale)
+                )
+                .first()
+            )
+            if campaign is None:
+                return None
+            campaign.status = 'sending'
+            campaign.save(update_fields=['status', 'updated_at'])
+        return campaign
+
+    @staticmethod
+    def send_campaign(campaign_id, chunk_size=500, concurrency=4, batch_size=None, progress=None):
+        """
+        Deliver a campaign to all active subscribers.
+
+        Subscribers are streamed in primary-key order, `chunk_size` at a time. Each chunk is
+        cut into sender batches of `batch_size` recipients (default: the backend's, i.e. one
+        SMTP thread slice or one Brevo call) which run on `concurrency` threads. Batches are
+        checkpointed (last_recipient_id) in order as soon as each one is delivered, so an
+        interrupted send resumes after the last delivered batch: only the batches that were
+        in flight, at most one per sender thread, can be sent twice. A campaign cancelled
+        meanwhile stops before its next chunk.
+        Args:
+            progress (callable): Called after every batch with the running stats dict.
+        Returns:
+            dict: sent, failed, cancelled, elapsed seconds and rate (emails/second), or None
+            if the campaign could not be claimed.
+        """
+        campaign = NewsletterCampaignService.claim_campaign(campaign_id)
+        if campaign is None:
+            return None
+
+        subscribers = NewsletterSubscriber.objects.filter(
+            is_active=True, pk__gt=campaign.last_recipient_id
+        ).order_by('pk')
+        stats = {
+            'campaign': campaign.pk,
+            'total': subscribers.count(),
+            'sent': 0,
+            'failed': 0,
+            'cancelled': False,
+            'elapsed': 0.0,
+            'rate': 0.0,
+        }
+
+        backend_class = get_campaign_backend_class()
+        batch_size = batch_size or backend_class.batch_size
+        backend = backend_class(CampaignEmail(campaign))
+        started = time.monotonic()
+
+        def checkpoint(batch, sent, failed):
+            NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+                last_recipient_id=batch[-1][0],
+                recipient_count=F('recipient_count') + sent,
+                failed_count=F('failed_count') + failed,
+                updated_at=timezone.now(),
+            )
+            stats['sent'] += sent
+            stats['failed'] += failed
+            stats['elapsed'] = time.monotonic() - started
+            stats['rate'] = stats['sent'] / stats['elapsed'] if stats['elapsed'] else 0.0
+            if progress:
+                progress(stats)
+
+        def deliver(chunk):
+            """Returns False, without sending, once the campaign has been cancelled."""
+            status = NewsletterCampaign.objects.filter(pk=campaign.pk).values_list('status', flat=True).first()
+            if status == 'cancelled':
+                stats['cancelled'] = True
+                return False
+
+            # At most `concurrency` batches in flight, checkpointed in submission order: a batch is
+            # only recorded once every earlier one is, and nothing new starts after a failure
+            in_flight = deque()
+            for start in range(0, len(chunk), batch_size):
+                batch = chunk[start:start + batch_size]
+                in_flight.append((batch, executor.submit(backend.send, [email for _, email in batch])))
+                if len(in_flight) >= concurrency:
+                    batch, future = in_flight.popleft()
+                    checkpoint(batch, *future.result())
+            while in_flight:
+                batch, future = in_flight.popleft()
+                checkpoint(batch, *future.result())
+            return True
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                chunk = []
+                for row in subscribers.values_list('pk', 'email').iterator(chunk_size=chunk_size):
+                    chunk.append(row)
+                    if len(chunk) >= chunk_size:
+                        if not deliver(chunk):
+                            break
+                        chunk = []
+                else:
+                    if chunk:
+                        deliver(chunk)
+        except Exception as e:
+            # Leave the campaign in "sending"; it is resumed from the checkpoint once the lease expires
+            logger.error(f"Campaign {campaign.pk} interrupted after {stats['sent']} emails: {str(e)}", exc_info=True)
+            raise
+        finally:
+            backend.close()
+
+        if stats['cancelled']:
+            logger.info(f"Campaign {campaign.pk} cancelled after {stats['sent']} emails")
+            return stats
+
+        NewsletterCampaign.objects.filter(pk=campaign.pk, status='sending').update(
+            status='sent', sent_at=timezone.now(), updated_at=timezone.now()
+        )
+        logger.info(f"Campaign {campaign.pk} sent to {stats['sent']} subscribers "
+                    f"({stats['failed']} failed) at {stats['rate']:.1f} emails/s")
+        return stats
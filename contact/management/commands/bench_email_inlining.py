@@ -0,0 +1,77 @@
+import logging
+import time
+
+import premailer
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from contact.outbox import render_email_template
+from contact.services import ContactService
+
+NEWSLETTER_TEMPLATES = [
+    "newsletter/welcome_newsletter_email.html",
+    "newsletter/unsubscribe_confirmation_email.html",
+]
+
+
+def email_context(email):
+    return {
+        "subscriber_email": email,
+        "current_year": 2026,
+        "current_month_year": "January 2026",
+        "website_url": "https://www.alexandercyril.xyz",
+        "unsubscribe_url": f"https://www.alexandercyril.xyz/unsubscribe/?email={email}",
+        "feedback_url": "https://www.alexandercyril.xyz/feedback/unsubscribe/",
+        "preferences_url": "https://www.alexandercyril.xyz/preferences",
+        "view_in_browser_url": f"{ContactService.get_base_url()}/newsletter/view-in-browser/",
+        "linkedin_url": "https://www.linkedin.com/in/yourlinkedinprofile",
+        "github_url": "https://github.com/yourgithubprofile",
+        "twitter_url": "https://twitter.com/yourtwitterprofile",
+    }
+
+
+def render_with_premailer(template_name, context):
+    """The previous per-email path: render, then inline the CSS of the rendered page."""
+    inliner = premailer.Premailer(render_to_string(template_name, context),
+                                  base_url=ContactService.get_base_url(),
+                                  cssutils_logging_level=logging.WARNING)
+    return inliner.transform()
+
+
+class Command(BaseCommand):
+    help = ("Times per-email rendering of the newsletter templates: premailer on every email "
+            "vs. the template precompiled with its CSS inlined")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--emails",
+            type=int,
+            default=20,
+            help="Number of emails rendered per template and path (default: 20)",
+        )
+
+    def handle(self, *args, **options):
+        emails = max(options["emails"], 1)
+        # cssutils reports every CSS3 property it does not know as an error
+        logging.disable(logging.ERROR)
+        try:
+            for template_name in NEWSLETTER_TEMPLATES:
+                # Compiles and caches the inlined template, so only renders are timed below
+                render_email_template(template_name, email_context("warmup@example.com"))
+
+                started = time.perf_counter()
+                for i in range(emails):
+                    render_with_premailer(template_name, email_context(f"reader{i}@example.com"))
+                before = (time.perf_counter() - started) / emails
+
+                started = time.perf_counter()
+                for i in range(emails):
+                    render_email_template(template_name, email_context(f"reader{i}@example.com"))
+                after = (time.perf_counter() - started) / emails
+
+                self.stdout.write(
+                    f"{template_name}: {before * 1000:.2f} ms -> {after * 1000:.3f} ms per email "
+                    f"({before / after:.0f}x)"
+                )
+        finally:
+            logging.disable(logging.NOTSET)
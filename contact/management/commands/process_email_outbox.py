@@ -0,0 +1,80 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from contact.models import EmailJob
+from contact.outbox import EmailOutboxService
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Delivers queued emails from the EmailJob outbox, retrying failures with exponential backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Number of jobs claimed per batch (default: 50)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when no jobs are due (default: 5)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the jobs that are currently due, then exit (for cron)",
+        )
+        parser.add_argument(
+            "--requeue-dead",
+            action="store_true",
+            help="Move dead-lettered jobs back to pending before processing",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_dead"]:
+            requeued = EmailOutboxService.requeue_jobs(
+                EmailJob.objects.filter(status=EmailJob.STATUS_DEAD)
+            )
+            self.stdout.write(f"Requeued {requeued} dead-lettered job(s).")
+
+        totals = {"sent": 0, "retried": 0, "dead": 0}
+        try:
+            while True:
+                # The worker outlives its database connections (Neon drops idle ones): recycle
+                # them between batches, and ride out a lost connection instead of exiting
+                close_old_connections()
+                try:
+                    stats = EmailOutboxService.process_batch(options["batch_size"])
+                except DatabaseError as e:
+                    logger.error(f"Email outbox database error, retrying: {str(e)}")
+                    close_old_connections()
+                    if options["once"]:
+                        raise
+                    time.sleep(options["interval"])
+                    continue
+                for key, value in stats.items():
+                    totals[key] += value
+                if any(stats.values()):
+                    self.stdout.write(
+                        f"Batch: {stats['sent']} sent, {stats['retried']} retried, {stats['dead']} dead-lettered"
+                    )
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Interrupted, stopping worker.")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Email outbox: {totals['sent']} sent, {totals['retried']} retried, "
+                f"{totals['dead']} dead-lettered."
+            )
+        )
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from contact.campaigns import NewsletterCampaignService
+
+
+class Command(BaseCommand):
+    help = "Sends due (or the given) newsletter campaigns to all active subscribers, resuming interrupted sends"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--campaign",
+            type=int,
+            action="append",
+            dest="campaign_ids",
+            help="Send this campaign (draft or scheduled) now; may be repeated",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Subscribers fetched per chunk (default: 500)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Recipients per sender batch, checkpointed as each is delivered "
+                 "(default: 50 for SMTP, 1000 for Brevo)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Number of parallel SMTP connections / Brevo requests (default: 4)",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--chunk-size and --concurrency must be positive")
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        campaign_ids = options["campaign_ids"] or NewsletterCampaignService.get_due_campaign_ids()
+        if not campaign_ids:
+            self.stdout.write("No campaigns are due.")
+            return
+
+        def report(stats):
+            self.stdout.write(
+                f"Campaign {stats['campaign']}: {stats['sent'] + stats['failed']}/{stats['total']} processed, "
+                f"{stats['failed']} failed, {stats['rate']:.1f} emails/s"
+            )
+
+        for campaign_id in campaign_ids:
+            stats = NewsletterCampaignService.send_campaign(
+                campaign_id,
+                chunk_size=options["chunk_size"],
+                concurrency=options["concurrency"],
+                batch_size=options["batch_size"],
+                progress=report,
+            )
+            if stats is None:
+                self.stdout.write(
+                    self.style.WARNING(f"Campaign {campaign_id} is already sent or being sent; skipped.")
+                )
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Campaign {campaign_id} sent: {stats['sent']} delivered, {stats['failed']} failed "
+                    f"in {stats['elapsed']:.1f}s ({stats['rate']:.1f} emails/s)."
+                )
+            )
@@ -61,6 +61,7 @@ class NewsletterCampaign(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('scheduled', 'Scheduled'),
+        ('sending', 'Sending'),
         ('sent', 'Sent'),
         ('cancelled', 'Cancelled'),
     ]
@@ -83,6 +84,10 @@ class NewsletterCampaign(models.Model):
     recipient_count = models.IntegerField(default=0)
     opened_count = models.IntegerField(default=0)
     clicked_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    # Delivery checkpoint: subscribers are sent in primary-key order, so a resumed send
+    # continues after the last fully delivered chunk
+    last_recipient_id = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['-created_at']
@@ -91,3 +96,64 @@ class NewsletterCampaign(models.Model):
 
     def __str__(self):
         return f"{self.title} - {self.status}"
+
+
+# EMAIL OUTBOX ---------------------------------------------------------------------------------
+class EmailJob(models.Model):
+    """
+    A queued outgoing email. Rows are written in the request and delivered by the
+    `process_email_outbox` management command, so no request waits on Brevo or SMTP
+    (unless EMAIL_OUTBOX_WORKER is off, in which case the request sends its own job).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead'),
+    ]
+
+    TRANSPORT_BREVO = 'brevo'
+    TRANSPORT_SMTP = 'smtp'
+    TRANSPORT_LOCMEM = 'locmem'
+    TRANSPORT_CHOICES = [
+        (TRANSPORT_BREVO, 'Brevo API'),
+        (TRANSPORT_SMTP, 'SMTP'),
+        (TRANSPORT_LOCMEM, 'In-memory (tests)'),
+    ]
+
+    transport = models.CharField(max_length=20, choices=TRANSPORT_CHOICES, default=TRANSPORT_BREVO)
+    to_email = models.EmailField()
+    to_name = models.CharField(max_length=150, blank=True)
+    from_email = models.EmailField(blank=True)
+    from_name = models.CharField(max_length=150, blank=True)
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField(blank=True)
+    text_content = models.TextField(blank=True)
+    # When set, the body is rendered (and CSS-inlined) by the worker instead of the request
+    template_name = models.CharField(max_length=255, blank=True)
+    context = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Email Job'
+        verbose_name_plural = 'Email Jobs'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
@@ -0,0 +1,383 @@
+# contact/outbox.py
+
+import hashlib
+import logging
+import random
+import re
+import smtplib
+from datetime import timedelta
+
+import premailer
+import requests
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.template import engines
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+
+from .models import EmailJob
+
+logger = logging.getLogger(__name__)
+
+BREVO_SEND_URL = "https://api.brevo.com/v3/smtp/email"
+
+
+class EmailTransportError(Exception):
+    """
+    Raised by a transport when delivery fails.
+    Permanent failures (e.g. a rejected payload) are dead-lettered without further retries.
+    """
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+# TRANSPORTS -----------------------------------------------------------------------------------
+class BaseEmailTransport:
+    """
+    A transport is opened once per worker batch, sends any number of jobs, then is closed.
+    """
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, job, html_content, text_content):
+        raise NotImplementedError
+
+
+class BrevoTransport(BaseEmailTransport):
+    """Transactional email through the Brevo HTTP API."""
+    timeout = 10
+
+    def open(self):
+        self.session = requests.Session()
+        self.session.headers.update({
+            "accept": "application/json",
+            "api-key": settings.BREVO_API_KEY,
+            "content-type": "application/json",
+        })
+
+    def close(self):
+        self.session.close()
+
+    def send(self, job, html_content, text_content):
+        recipient = {"email": job.to_email}
+        if job.to_name:
+            recipient["name"] = job.to_name
+
+        email_data = {
+            "sender": {
+                "name": job.from_name or settings.EMAIL_SENDER_NAME,
+                "email": job.from_email or settings.EMAIL_SENDER_EMAIL,
+            },
+            "to": [recipient],
+            "subject": job.subject,
+            "htmlContent": html_content,
+        }
+        if text_content:
+            email_data["textContent"] = text_content
+
+        try:
+            response = self.session.post(BREVO_SEND_URL, json=email_data, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise EmailTransportError(f"Brevo request failed: {e}")
+
+        if response.status_code != 201:
+            # Bad requests will fail the same way every time; auth, rate-limit and
+            # server errors are worth retrying
+            permanent = response.status_code in (400, 422)
+            raise EmailTransportError(
+                f"Brevo returned {response.status_code}: {response.text}", permanent=permanent
+            )
+
+
+class SMTPTransport(BaseEmailTransport):
+    """Sends through Django's mail backend, reusing one connection for the whole batch."""
+    backend = None  # None -> settings.EMAIL_BACKEND
+
+    def open(self):
+        self.connection = get_connection(self.backend, fail_silently=False)
+        self.connection.open()
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+    def send(self, job, html_content, text_content):
+        message = EmailMultiAlternatives(
+            subject=job.subject,
+            body=text_content or strip_tags(html_content),
+            from_email=job.from_email or settings.DEFAULT_FROM_EMAIL,
+            to=[job.to_email],
+            connection=self.connection,
+        )
+        if html_content:
+            message.attach_alternative(html_content, "text/html")
+
+        try:
+            message.send(fail_silently=False)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise EmailTransportError(f"Recipient refused: {e}", permanent=True)
+        except (smtplib.SMTPException, OSError) as e:
+            raise EmailTransportError(f"SMTP delivery failed: {e}")
+
+
+class LocmemTransport(SMTPTransport):
+    """Stores messages in django.core.mail.outbox; for tests and local development."""
+    backend = "django.core.mail.backends.locmem.EmailBackend"
+
+
+EMAIL_TRANSPORTS = {
+    EmailJob.TRANSPORT_BREVO: BrevoTransport,
+    EmailJob.TRANSPORT_SMTP: SMTPTransport,
+    EmailJob.TRANSPORT_LOCMEM: LocmemTransport,
+}
+
+
+def get_transport_class(name):
+    """
+    Resolve a job's transport. settings.EMAIL_OUTBOX_TRANSPORT, when set, overrides every
+    job's transport (e.g. "locmem" in tests); it may also be a dotted path to a custom class.
+    """
+    name = getattr(settings, "EMAIL_OUTBOX_TRANSPORT", None) or name
+    if name in EMAIL_TRANSPORTS:
+        return EMAIL_TRANSPORTS[name]
+    return import_string(name)
+
+
+# RENDERING ------------------------------------------------------------------------------------
+def render_inlined_html(html_content_raw):
+    """Inline the CSS of rendered HTML with premailer."""
+    from .services import ContactService  # Imported locally to break circular dependency
+
+    inliner = premailer.Premailer(html_content_raw,
+                                  base_url=ContactService.get_base_url(),
+                                  cssutils_logging_level=logging.WARNING)
+    return inliner.transform()
+
+
+# Django template tags are swapped for opaque tokens while premailer runs, so the CSS can be
+# inlined into the template source itself. Tokens look like a URL scheme, which keeps
+# premailer's base_url link rewriting away from {{ ... }} hrefs.
+TEMPLATE_TAG_RE = re.compile(r'{{.*?}}|{%.*?%}|{#.*?#}', re.S)
+TEMPLATE_TOKEN_RE = re.compile(r'djtpl-(\d+)-:')
+
+# template_name -> (source digest, base_url, compiled template with CSS inlined)
+_inlined_templates = {}
+
+
+def get_inlined_template(template_name):
+    """
+    Returns `template_name` compiled with its CSS already inlined.
+    Premailer runs once per template version (keyed by a hash of the source); every
+    later render only substitutes the context. Templates must be self-contained
+    (no {% extends %} / {% include %}), as only this template's own source is inlined.
+    """
+    from .services import ContactService  # Imported locally to break circular dependency
+
+    source = get_template(template_name).template.source
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    base_url = ContactService.get_base_url()
+
+    cached = _inlined_templates.get(template_name)
+    if cached and cached[0] == digest and cached[1] == base_url:
+        return cached[2]
+
+    tags = []
+
+    def mask(match):
+        tags.append(match.group(0))
+        return f"djtpl-{len(tags) - 1}-:"
+
+    inlined = render_inlined_html(TEMPLATE_TAG_RE.sub(mask, source))
+    inlined = TEMPLATE_TOKEN_RE.sub(lambda match: tags[int(match.group(1))], inlined)
+    template = engines["django"].from_string(inlined)
+    _inlined_templates[template_name] = (digest, base_url, template)
+    return template
+
+
+def render_email_template(template_name, context):
+    """
+    Render an email template with its CSS inlined.
+    Returns: (html_content, text_content)
+    """
+    html_content = get_inlined_template(template_name).render(context)
+    return html_content, strip_tags(html_content)
+
+
+# OUTBOX ---------------------------------------------------------------------------------------
+def get_retry_delay(attempts):
+    """Exponential backoff in seconds for the given attempt number, capped and jittered."""
+    base = getattr(settings, "EMAIL_OUTBOX_BACKOFF_BASE", 30)
+    cap = getattr(settings, "EMAIL_OUTBOX_BACKOFF_MAX", 3600)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay + random.uniform(0, delay * 0.1)
+
+
+class EmailOutboxService:
+    @staticmethod
+    def enqueue(to_email, subject, html_content="", text_content="", to_name="",
+                transport=EmailJob.TRANSPORT_BREVO, template_name="", context=None,
+                from_email="", from_name=""):
+        """
+        Queue an email for the outbox worker and return the EmailJob.
+        Either pass the body directly, or a `template_name` + JSON-serializable `context`
+        to have the worker render it. Without a worker (EMAIL_OUTBOX_WORKER off) the job is
+        delivered in this process as soon as the surrounding transaction commits.
+        """
+        job = EmailJob.objects.create(
+            transport=transport,
+            to_email=to_email,
+            to_name=to_name,
+            from_email=from_email,
+            from_name=from_name,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            template_name=template_name,
+            context=context or {},
+            max_attempts=getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 5),
+        )
+        if not getattr(settings, "EMAIL_OUTBOX_WORKER", False):
+            transaction.on_commit(lambda: EmailOutboxService.send_now(job.pk))
+        return job
+
+    @staticmethod
+    def send_now(job_id):
+        """
+        Deliver one queued job in this process, unless it is no longer due or another
+        process holds it. Failures are recorded for a later worker run, never raised.
+        """
+        try:
+            return EmailOutboxService.deliver_jobs(EmailOutboxService.claim_jobs(1, job_ids=[job_id]))
+        except Exception as e:
+            logger.error(f"Could not send email job {job_id} inline: {str(e)}", exc_info=True)
+            return None
+
+    @staticmethod
+    def claim_jobs(batch_size, job_ids=None):
+        """
+        Lock up to `batch_size` due jobs (optionally only among `job_ids`) and mark them as sending.
+        Jobs left in "sending" by a crashed worker are reclaimed after EMAIL_OUTBOX_LOCK_TIMEOUT.
+        SKIP LOCKED lets several workers run side by side.
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=getattr(settings, "EMAIL_OUTBOX_LOCK_TIMEOUT", 300))
+
+        with transaction.atomic():
+            queryset = EmailJob.objects.select_for_update(skip_locked=True).filter(
+                Q(status=EmailJob.STATUS_PENDING, next_attempt_at__lte=now) |
+                Q(status=EmailJob.STATUS_SENDING, locked_at__lt=stale)
+            )
+            if job_ids is not None:
+                queryset = queryset.filter(pk__in=job_ids)
+            jobs = list(queryset.order_by("next_attempt_at", "id")[:batch_size])
+            if jobs:
+                EmailJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                    status=EmailJob.STATUS_SENDING,
+                    locked_at=now,
+                    attempts=F("attempts") + 1,
+                )
+        for job in jobs:
+            job.status = EmailJob.STATUS_SENDING
+            job.locked_at = now
+            job.attempts += 1
+        return jobs
+
+    @staticmethod
+    def _mark_sent(job):
+        EmailJob.objects.filter(pk=job.pk).update(
+            status=EmailJob.STATUS_SENT,
+            sent_at=timezone.now(),
+            locked_at=None,
+            last_error="",
+            updated_at=timezone.now(),
+        )
+
+    @staticmethod
+    def _mark_failed(job, error, permanent=False):
+        if permanent or job.attempts >= job.max_attempts:
+            logger.error(f"Email job {job.pk} to {job.to_email} dead-lettered after "
+                         f"{job.attempts} attempt(s): {error}")
+            changes = {"status": EmailJob.STATUS_DEAD}
+        else:
+            delay = get_retry_delay(job.attempts)
+            logger.warning(f"Email job {job.pk} to {job.to_email} failed (attempt {job.attempts}), "
+                           f"retrying in {int(delay)}s: {error}")
+            changes = {
+                "status": EmailJob.STATUS_PENDING,
+                "next_attempt_at": timezone.now() + timedelta(seconds=delay),
+            }
+        EmailJob.objects.filter(pk=job.pk).update(
+            locked_at=None, last_error=error, updated_at=timezone.now(), **changes
+        )
+        return changes["status"]
+
+    @staticmethod
+    def process_batch(batch_size=50):
+        """
+        Claim and deliver one batch of due jobs.
+        Returns: dict with the number of jobs sent, retried and dead-lettered.
+        """
+        return EmailOutboxService.deliver_jobs(EmailOutboxService.claim_jobs(batch_size))
+
+    @staticmethod
+    def deliver_jobs(jobs):
+        """
+        Deliver claimed jobs, retrying or dead-lettering the failures.
+        Returns: dict with the number of jobs sent, retried and dead-lettered.
+        """
+        stats = {"sent": 0, "retried": 0, "dead": 0}
+        if not jobs:
+            return stats
+
+        transports = {}
+        try:
+            for job in jobs:
+                try:
+                    transport_class = get_transport_class(job.transport)
+                    if transport_class not in transports:
+                        transport = transport_class()
+                        transport.open()
+                        transports[transport_class] = transport
+                    transport = transports[transport_class]
+
+                    html_content, text_content = job.html_content, job.text_content
+                    if job.template_name:
+                        html_content, text_content = render_email_template(job.template_name, job.context)
+
+                    transport.send(job, html_content, text_content)
+                except EmailTransportError as e:
+                    status = EmailOutboxService._mark_failed(job, str(e), permanent=e.permanent)
+                except Exception as e:
+                    logger.error(f"Unexpected error delivering email job {job.pk}: {str(e)}", exc_info=True)
+                    status = EmailOutboxService._mark_failed(job, str(e))
+                else:
+                    EmailOutboxService._mark_sent(job)
+                    stats["sent"] += 1
+                    continue
+                stats["dead" if status == EmailJob.STATUS_DEAD else "retried"] += 1
+        finally:
+            for transport in transports.values():
+                transport.close()
+
+        return stats
+
+    @staticmethod
+    def requeue_jobs(queryset):
+        """Give dead (or any) jobs a fresh set of attempts, due immediately."""
+        return queryset.exclude(status=EmailJob.STATUS_SENT).update(
+            status=EmailJob.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            locked_at=None,
+            updated_at=timezone.now(),
+        )
@@ -854,12 +854,9 @@ from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
-import premailer
-from django.core.mail import EmailMultiAlternatives, send_mail
 
-from .models import Contact, NewsletterSubscriber, DeletedSubscriber
+from .models import Contact, NewsletterSubscriber, DeletedSubscriber, EmailJob
+from .outbox import EmailOutboxService
 from .serializers import ContactSerializer, NewsletterSubscriberSerializer, DeletedSubscriberSerializer
 
 logger = logging.getLogger(__name__)
@@ -996,23 +993,16 @@ class NewsletterService:
                         'twitter_url': 'https://twitter.com/yourtwitterprofile', 
                     }
                     
-                    html_content_raw = render_to_string('newsletter/unsubscribe_confirmation_email.html', context)
-                    inliner = premailer.Premailer(html_content_raw,
-                                                 base_url=ContactService.get_base_url(),
-                                                 cssutils_logging_level=logging.WARNING) 
-                    html_message = inliner.transform()
-                    plain_message = strip_tags(html_message)
-
-                    msg = EmailMultiAlternatives(
+                    # Rendering, CSS inlining and SMTP delivery happen in the outbox worker
+                    EmailOutboxService.enqueue(
+                        to_email=email,
                         subject="You've been unsubscribed from Alexander S. Cyril's Newsletter",
-                        body=plain_message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        to=[email],
+                        template_name='newsletter/unsubscribe_confirmation_email.html',
+                        context=context,
+                        transport=EmailJob.TRANSPORT_SMTP,
                     )
-                    msg.attach_alternative(html_message, "text/html")
-                    msg.send(fail_silently=False)
                 except Exception as e:
-                    logger.error(f"Failed to send unsubscribe email trace to {email}: {str(e)}")
+                    logger.error(f"Failed to queue unsubscribe email trace to {email}: {str(e)}")
 
             return True, "Successfully unsubscribed"
 
@@ -1,3 +1,249 @@
-from django.test import TestCase
+import logging
+import smtplib
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .campaigns import LocmemCampaignBackend, NewsletterCampaignService, SMTPCampaignBackend
+from .management.commands.bench_email_inlining import NEWSLETTER_TEMPLATES, email_context, render_with_premailer
+from .models import EmailJob, NewsletterCampaign, NewsletterSubscriber
+from .outbox import EmailOutboxService, EmailTransportError, LocmemTransport, render_email_template
+
+
+
+class InlinedEmailTemplateTests(SimpleTestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_precompiled_output_matches_per_email_premailer(self):
+        for template_name in NEWSLETTER_TEMPLATES:
+            context = email_context('reader+news@example.com')
+            html_content, _ = render_email_template(template_name, context)
+            self.assertEqual(html_content, render_with_premailer(template_name, context))
+
+
+class SMTPCampaignRetryTests(SimpleTestCase):
+    """Transient (4xx) SMTP replies are retried; permanent (5xx) ones count as failed."""
+
+    def _send(self, *outcomes):
+        connection = mock.Mock()
+        connection.send_messages.side_effect = list(outcomes)
+        backend = SMTPCampaignBackend(mock.Mock(subject="Hi", personalize=lambda email: ("<p>Hi</p>", "Hi")))
+        with mock.patch.object(backend, '_get_connection', return_value=connection), \
+                mock.patch('contact.campaigns.time.sleep'), mock.patch('contact.campaigns.logger'):
+            return backend.send(['reader@example.com']), connection.send_messages.call_count
+
+    def test_transient_reply_is_retried(self):
+        result, calls = self._send(smtplib.SMTPResponseException(451, b"Try again later"), 1)
+        self.assertEqual(result, (1, 0))
+        self.assertEqual(calls, 2)
+
+    def test_permanent_reply_fails_without_retry(self):
+        result, calls = self._send(smtplib.SMTPResponseException(550, b"No such user"))
+        self.assertEqual(result, (0, 1))
+        self.assertEqual(calls, 1)
+
+
+@override_settings(EMAIL_OUTBOX_TRANSPORT='locmem')
+class CampaignCancellationTests(TestCase):
+    def test_cancelled_campaign_stops_between_chunks(self):
+        campaign = NewsletterCampaign.objects.create(title="News", subject="News", content="<p>News</p>")
+        NewsletterSubscriber.objects.bulk_create(
+            [NewsletterSubscriber(email=f"reader{i}@example.com") for i in range(3)]
+        )
+
+        def cancel(stats):
+            NewsletterCampaign.objects.filter(pk=campaign.pk).update(status='cancelled')
+
+        stats = NewsletterCampaignService.send_campaign(campaign.pk, chunk_size=1, concurrency=1, progress=cancel)
+
+        self.assertEqual(stats['sent'], 1)
+        self.assertTrue(stats['cancelled'])
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'cancelled')
+        self.assertEqual(campaign.recipient_count, 1)
+
+
+@override_settings(EMAIL_OUTBOX_TRANSPORT='locmem')
+class CampaignResumeTests(TestCase):
+    def test_resumed_send_delivers_each_recipient_once(self):
+        campaign = NewsletterCampaign.objects.create(title="News", subject="News", content="<p>News</p>")
+        NewsletterSubscriber.objects.bulk_create(
+            [NewsletterSubscriber(email=f"reader{i}@example.com") for i in range(10)]
+        )
+        send = LocmemCampaignBackend.send
+        calls = []
+
+        def interrupted_send(backend, emails):
+            calls.append(emails)
+            if len(calls) == 3:
+                raise OSError("Connection lost")
+            return send(backend, emails)
+
+        with mock.patch.object(LocmemCampaignBackend, 'send', interrupted_send), \
+                mock.patch('contact.campaigns.logger'), self.assertRaises(OSError):
+            NewsletterCampaignService.send_campaign(campaign.pk, chunk_size=10, concurrency=1, batch_size=3)
+
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, 'sending')
+        self.assertEqual(campaign.recipient_count, 6)
+
+        # Once the lease has expired the campaign is picked up again from its checkpoint
+        NewsletterCampaign.objects.filter(pk=campaign.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        stats = NewsletterCampaignService.send_campaign(campaign.pk, chunk_size=10, concurrency=1, batch_size=3)
+
+        self.assertEqual(stats['sent'], 4)
+        recipients = Counter(address for message in mail.outbox for address in message.to)
+        self.assertEqual(len(recipients), 10)
+        self.assertEqual(set(recipients.values()), {1})
+        campaign.refresh_from_db()
+        self.assertEqual((campaign.status, campaign.recipient_count), ('sent', 10))
+
+
+@override_settings(EMAIL_OUTBOX_TRANSPORT='locmem', EMAIL_OUTBOX_WORKER=True,
+                   EMAIL_OUTBOX_BACKOFF_BASE=30, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('contact.outbox.logger')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _enqueue(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return EmailOutboxService.enqueue(
+                to_email="reader@example.com", subject="Hello", html_content="<p>Hello</p>", **kwargs
+            )
+
+    def _fail_with(self, *errors):
+        return mock.patch.object(LocmemTransport, 'send', side_effect=list(errors))
+
+    def _make_due(self, job):
+        EmailJob.objects.filter(pk=job.pk).update(next_attempt_at=timezone.now())
+
+    def test_enqueued_job_waits_for_the_worker(self):
+        job = self._enqueue()
+
+        self.assertEqual(mail.outbox, [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.max_attempts), (EmailJob.STATUS_PENDING, 0, 3))
+
+    def test_worker_delivers_through_locmem(self):
+        job = self._enqueue()
+
+        self.assertEqual(EmailOutboxService.process_batch(), {"sent": 1, "retried": 0, "dead": 0})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["reader@example.com"])
+        self.assertEqual(mail.outbox[0].subject, "Hello")
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>Hello</p>")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (EmailJob.STATUS_SENT, 1))
+        self.assertIsNotNone(job.sent_at)
+
+    def test_claim_skips_jobs_not_due_and_reclaims_stale_ones(self):
+        now = timezone.now()
+        later = self._enqueue()
+        EmailJob.objects.filter(pk=later.pk).update(next_attempt_at=now + timedelta(minutes=5))
+        stale = self._enqueue()
+        EmailJob.objects.filter(pk=stale.pk).update(
+            status=EmailJob.STATUS_SENDING, attempts=1, locked_at=now - timedelta(hours=1)
+        )
+        locked = self._enqueue()
+        EmailJob.objects.filter(pk=locked.pk).update(status=EmailJob.STATUS_SENDING, attempts=1, locked_at=now)
+
+        jobs = EmailOutboxService.claim_jobs(10)
+
+        self.assertEqual([job.pk for job in jobs], [stale.pk])
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (EmailJob.STATUS_SENDING, 2))
+
+    def test_failed_job_is_retried_with_exponential_backoff(self):
+        job = self._enqueue()
+        delays = []
+        with self._fail_with(EmailTransportError("down"), EmailTransportError("down"), None), \
+                mock.patch('contact.outbox.random.uniform', return_value=0):
+            for _ in range(2):
+                before = timezone.now()
+                self.assertEqual(EmailOutboxService.process_batch()["retried"], 1)
+                job.refresh_from_db()
+                self.assertEqual(job.status, EmailJob.STATUS_PENDING)
+                self.assertEqual(job.last_error, "down")
+                delays.append(round((job.next_attempt_at - before).total_seconds()))
+                # Not due yet, so the worker leaves it alone
+                self.assertEqual(EmailOutboxService.claim_jobs(10), [])
+                self._make_due(job)
+
+            self.assertEqual(EmailOutboxService.process_batch()["sent"], 1)
+
+        self.assertEqual(delays, [30, 60])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (EmailJob.STATUS_SENT, 3, ""))
+
+    def test_job_is_dead_lettered_after_max_attempts(self):
+        job = self._enqueue()
+        with self._fail_with(*[EmailTransportError("down")] * 3):
+            for _ in range(3):
+                stats = EmailOutboxService.process_batch()
+                self._make_due(job)
+
+        self.assertEqual(stats, {"sent": 0, "retried": 0, "dead": 1})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (EmailJob.STATUS_DEAD, 3))
+        self.assertEqual(EmailOutboxService.claim_jobs(10), [])
+
+        self.assertEqual(EmailOutboxService.requeue_jobs(EmailJob.objects.all()), 1)
+        self.assertEqual(EmailOutboxService.process_batch()["sent"], 1)
+
+    def test_permanent_failure_is_dead_lettered_at_once(self):
+        job = self._enqueue()
+        with self._fail_with(EmailTransportError("rejected", permanent=True)):
+            self.assertEqual(EmailOutboxService.process_batch()["dead"], 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (EmailJob.STATUS_DEAD, 1))
+
+    @override_settings(EMAIL_OUTBOX_WORKER=False)
+    def test_job_is_sent_inline_without_a_worker(self):
+        job = self._enqueue()
+
+        self.assertEqual(len(mail.outbox), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailJob.STATUS_SENT)
+
+    @override_settings(EMAIL_OUTBOX_WORKER=False)
+    def test_inline_failure_is_left_for_a_worker_run(self):
+        with self._fail_with(EmailTransportError("down")):
+            job = self._enqueue()
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (EmailJob.STATUS_PENDING, 1))
+        self._make_due(job)
+        self.assertEqual(EmailOutboxService.process_batch()["sent"], 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_worker_survives_a_lost_database_connection(self):
+        batches = [
+            OperationalError("server closed the connection unexpectedly"),
+            {"sent": 1, "retried": 0, "dead": 0},
+            {"sent": 0, "retried": 0, "dead": 0},
+            KeyboardInterrupt(),
+        ]
+        command = 'contact.management.commands.process_email_outbox'
+        out = StringIO()
+        with mock.patch.object(EmailOutboxService, 'process_batch', side_effect=batches), \
+                mock.patch(f'{command}.close_old_connections') as close_old_connections, \
+                mock.patch(f'{command}.time.sleep'), mock.patch(f'{command}.logger'):
+            call_command('process_email_outbox', stdout=out)
+
+        self.assertIn("1 sent", out.getvalue())
+        # Once before every batch, and again after the error
+        self.assertEqual(close_old_connections.call_count, 5)
@@ -0,0 +1,135 @@
+# src/middleware.py
+
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+from codehub.services.cache_services import CACHE_PREFIX, get_response_cache_timeout
+
+try:
+    import brotli
+except ImportError:  # Optional; responses fall back to gzip without it
+    brotli = None
+
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/xml",
+    "text/css",
+    "text/csv",
+    "text/javascript",
+    "text/plain",
+    "text/xml",
+)
+
+
+def get_compression_min_size():
+    return getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+
+
+def _accepted_encodings(header):
+    """Parse Accept-Encoding into {coding: q}."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """Returns "br", "gzip" or None for an Accept-Encoding header."""
+    accepted = _accepted_encodings(header or "")
+    wildcard = accepted.get("*", 0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=CompressionMiddleware.brotli_quality)
+    return gzip.compress(content, compresslevel=CompressionMiddleware.gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip compression for API responses of at least COMPRESSION_MIN_SIZE bytes.
+
+    Only text-like payloads (JSON, JS, CSS, plain text...) are compressed; HTML pages are left
+    alone so CSRF tokens are never exposed to compression side channels (BREACH).
+    Responses marked with `cache_compressed = True` (see codehub.views.mixins) carry an ETag
+    derived from cached version stamps and a body that is the same for every user; their
+    compressed bytes are cached under that ETag, so a hot response is compressed once per
+    version rather than once per request. Per-user views leave the flag off.
+    """
+    gzip_level = 6
+    brotli_quality = 5  # Good ratio at a cost suited to dynamic responses
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self._is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding != "gzip":
+                return response
+            response.streaming_content = compress_sequence(response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            if len(response.content) < get_compression_min_size():
+                return response
+            compressed = self._compress_content(response, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The representation changed; a strong ETag must not match the uncompressed one
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def _is_compressible(self, response):
+        if response.status_code != 200 or response.has_header("Content-Encoding"):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_CONTENT_TYPES or content_type.endswith("+json")
+
+    def _compress_content(self, response, encoding):
+        etag = response.get("ETag")
+        if not (etag and getattr(response, "cache_compressed", False)):
+            return compress(response.content, encoding)
+
+        raw = f"{etag}|{response.get('Content-Type')}|{encoding}"
+        cache_key = f"{CACHE_PREFIX}:compressed:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+        compressed = cache.get(cache_key)
+        if compressed is None:
+            compressed = compress(response.content, encoding)
+            cache.set(cache_key, compressed, timeout=get_response_cache_timeout())
+        return compressed
@@ -0,0 +1,28 @@
+# src/parsers.py
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stock parser is used without it
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """
+    Drop-in replacement for DRF's JSONParser backed by orjson.
+    Like the stock parser in strict mode, NaN and Infinity are rejected.
+    Falls back to the stock parser when orjson isn't installed or the body isn't UTF-8.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,36 @@
+# src/renderers.py
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stock renderer is used without it
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson.
+
+    UUIDs, datetimes/dates and dataclasses are encoded natively by orjson (datetimes keep
+    their microseconds; UTC is written as "Z" like DRF does). Anything else orjson doesn't
+    know (Decimal, lazy translation strings, querysets...) goes through DRF's JSONEncoder.
+    Falls back to the stock renderer when orjson isn't installed, and for pretty-printed
+    or ASCII-only output, which are not on the hot path.
+    """
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+
+        # Same as the stock renderer: escape U+2028/U+2029 so the output is a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -34,12 +34,14 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
     "drf_yasg",
     "drf_spectacular",
     
     # Third-party apps
     "corsheaders",
     "rest_framework_simplejwt",
+    "rest_framework_simplejwt.token_blacklist",
     "rest_framework",
     "rest_framework.authtoken",
     "allauth",
@@ -58,6 +60,8 @@ MIDDLEWARE = [
     # Place CorsMiddleware as high as possible, preferably before any middleware
     # that can generate responses, such as CommonMiddleware or any authentication middleware.
     "corsheaders.middleware.CorsMiddleware",
+    # Compresses the final response body, so it must run after every middleware that writes it
+    "src.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -398,7 +402,7 @@ CSRF_FAILURE_VIEW = "user_account.views.csrf_failure"
 # ======================== REST Framework Settings ========================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user_account.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
@@ -406,13 +410,13 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "src.renderers.ORJSONRenderer",
     ],
     "DEFAULT_SCHEMA_CLASS": [
         "drf_spectacular.openapi.AutoSchema",
     ],
     "DEFAULT_PARSER_CLASSES": [
-        "rest_framework.parsers.JSONParser",
+        "src.parsers.ORJSONParser",
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
     ],
@@ -484,8 +488,15 @@ SIMPLE_JWT = {
     "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
     "JTI_CLAIM": "jti",
     "SLIDING_TOKEN_REFRESH_EXP_CLAIM": "refresh_exp",
+    "TOKEN_REFRESH_SERIALIZER": "user_account.serializers.BlacklistFilteredTokenRefreshSerializer",
 }
 
+# Bloom-filter pre-check in front of the refresh token blacklist ("off" or "redis", which needs
+# the django-redis cache backend). Rebuilt by `manage.py prune_jwt_tokens`
+JWT_BLACKLIST_FILTER = os.getenv("JWT_BLACKLIST_FILTER", "off")
+JWT_BLACKLIST_FILTER_BITS = int(os.getenv("JWT_BLACKLIST_FILTER_BITS", str(2 ** 23)))  # 1 MiB
+JWT_BLACKLIST_FILTER_HASHES = int(os.getenv("JWT_BLACKLIST_FILTER_HASHES", "7"))
+
 
 REST_AUTH = {
     "USE_JWT": True,  # Enable JWT for dj-rest-auth
@@ -646,6 +657,56 @@ if not DEBUG and os.getenv("REDIS_URL"):
         },
     }
 
+# Users resolved by user_account.authentication.CachedJWTAuthentication: shared-cache
+# lifetime, and lifetime/size of the per-process LRU in front of it (seconds, entries).
+# Only used with a shared cache backend (Redis above): with the per-process default, a role
+# change or deactivation would not reach the other workers until their entries expired.
+USER_CACHE_ENABLED = os.getenv(
+    "USER_CACHE_ENABLED", str(CACHES["default"]["BACKEND"] == "django_redis.cache.RedisCache")
+).lower() in ("true", "1", "t")
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", "300"))
+USER_CACHE_LOCAL_TIMEOUT = int(os.getenv("USER_CACHE_LOCAL_TIMEOUT", "10"))
+USER_CACHE_LOCAL_MAX_SIZE = int(os.getenv("USER_CACHE_LOCAL_MAX_SIZE", "1024"))
+
+# Lifetime of cached public CodeHub list responses (seconds). Entries are also
+# invalidated by tag whenever the underlying snippets/categories change.
+CODEHUB_RESPONSE_CACHE_TIMEOUT = int(os.getenv("CODEHUB_RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Smallest response body (bytes) that src.middleware.CompressionMiddleware compresses;
+# below this the gzip/brotli framing costs more than it saves.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Fuzzy title matching for snippet search. Requires the pg_trgm extension
+# (CREATE EXTENSION IF NOT EXISTS pg_trgm;) on the database.
+CODEHUB_SEARCH_TRIGRAM_ENABLED = os.getenv(
+    "CODEHUB_SEARCH_TRIGRAM_ENABLED", "False"
+).lower() in ("true", "1", "t")
+CODEHUB_SEARCH_TRIGRAM_THRESHOLD = float(os.getenv("CODEHUB_SEARCH_TRIGRAM_THRESHOLD", "0.3"))
+
+# Write-behind buffer for snippet views (UserHistory.view_count/last_viewed and
+# CodeSnippet.last_accessed): "memory" (per process), "redis" (shared; needs the Redis
+# cache above) or "off" (default) to write every view synchronously. Buffered views are
+# flushed every FLUSH_INTERVAL seconds (a timer thread with the memory buffer) or once
+# MAX_PENDING entries are waiting, which bounds what a crash of a process can lose.
+CODEHUB_VIEW_BUFFER = os.getenv("CODEHUB_VIEW_BUFFER", "off")
+CODEHUB_VIEW_BUFFER_FLUSH_INTERVAL = int(os.getenv("CODEHUB_VIEW_BUFFER_FLUSH_INTERVAL", "10"))
+CODEHUB_VIEW_BUFFER_MAX_PENDING = int(os.getenv("CODEHUB_VIEW_BUFFER_MAX_PENDING", "1000"))
+
+# `manage.py rollup_engagement` leaves runs/shares younger than this to a later run, so rows
+# from transactions that commit late are not skipped by the id watermark.
+CODEHUB_ROLLUP_SETTLE_SECONDS = int(os.getenv("CODEHUB_ROLLUP_SETTLE_SECONDS", "60"))
+
+# Pre-render highlighted code and description HTML after each snippet save; when off,
+# renders are produced on the first `?rendered=1` read instead.
+CODEHUB_RENDER_ON_SAVE = os.getenv("CODEHUB_RENDER_ON_SAVE", "True").lower() in ("true", "1", "t")
+
+# Store snippet bodies (code, web code, additional files) of at least BLOB_MIN_SIZE bytes
+# compressed and deduplicated in SnippetBlob instead of inline. Externalized bodies stay
+# readable when this is turned off; `manage.py externalize_snippet_bodies [--inline]`
+# moves existing rows either way.
+CODEHUB_BLOB_STORE = os.getenv("CODEHUB_BLOB_STORE", "False").lower() in ("true", "1", "t")
+CODEHUB_BLOB_MIN_SIZE = int(os.getenv("CODEHUB_BLOB_MIN_SIZE", "16384"))
+
 
 # ======================== Sentry Configuration ========================
 if not DEBUG and os.getenv("SENTRY_DSN"):
@@ -669,6 +730,37 @@ EMAIL_SENDER_EMAIL = os.getenv("EMAIL_SENDER_EMAIL")
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 
 
+# ======================== Email Outbox ========================
+# Emails are queued in contact.EmailJob and delivered by `manage.py process_email_outbox`.
+# Without that worker running (EMAIL_OUTBOX_WORKER=False), each job is sent by the request
+# that queued it once its transaction commits; failed attempts then wait for a worker run
+# (e.g. `process_email_outbox --once` from cron).
+EMAIL_OUTBOX_WORKER = os.getenv("EMAIL_OUTBOX_WORKER", "False").lower() in ("true", "1", "t")
+# Set EMAIL_OUTBOX_TRANSPORT=locmem to keep mail in memory (tests/local); empty = per-job transport
+EMAIL_OUTBOX_TRANSPORT = os.getenv("EMAIL_OUTBOX_TRANSPORT", "")
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_BACKOFF_BASE = int(os.getenv("EMAIL_OUTBOX_BACKOFF_BASE", "30"))  # seconds
+EMAIL_OUTBOX_BACKOFF_MAX = int(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX", "3600"))  # seconds
+EMAIL_OUTBOX_LOCK_TIMEOUT = int(os.getenv("EMAIL_OUTBOX_LOCK_TIMEOUT", "300"))  # seconds
+
+# Newsletter campaigns are sent by `manage.py send_newsletter_campaigns` ("smtp" or "brevo")
+NEWSLETTER_CAMPAIGN_TRANSPORT = os.getenv("NEWSLETTER_CAMPAIGN_TRANSPORT", "smtp")
+# A "sending" campaign with no checkpoint for this long is treated as crashed and resumed
+NEWSLETTER_CAMPAIGN_LEASE_SECONDS = int(os.getenv("NEWSLETTER_CAMPAIGN_LEASE_SECONDS", "600"))
+
+
+# ======================== Account Tokens ========================
+# Verification and reset links carry HMAC-signed, timestamped tokens (user_account.services.token_service)
+EMAIL_VERIFICATION_TOKEN_MAX_AGE = int(os.getenv("EMAIL_VERIFICATION_TOKEN_MAX_AGE", str(60 * 60 * 24)))  # seconds
+PASSWORD_RESET_TOKEN_MAX_AGE = int(os.getenv("PASSWORD_RESET_TOKEN_MAX_AGE", "3600"))  # seconds
+PASSWORD_RESET_TIMEOUT = PASSWORD_RESET_TOKEN_MAX_AGE  # Read by django.contrib.auth's PasswordResetTokenGenerator
+# `manage.py sweep_expired_accounts` deletes unverified accounts this long after their verification deadline
+UNVERIFIED_ACCOUNT_GRACE_HOURS = int(os.getenv("UNVERIFIED_ACCOUNT_GRACE_HOURS", "0"))
+# Background bulk deletions (?background=true) are run by `manage.py purge_users --run-jobs`;
+# a running job whose worker stopped reporting for this long is picked up again (seconds)
+USER_PURGE_JOB_LEASE_SECONDS = int(os.getenv("USER_PURGE_JOB_LEASE_SECONDS", "600"))
+
+
 # ======================== Render Ping ========================
 RENDER_HEALTHCHECK_URL = "https://alexandercyril.onrender.com/api/user/health/"
 RENDER_KEEPALIVE_ENABLED = True  # Optional disable flag
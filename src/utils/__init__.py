@@ -1,10 +1,26 @@
 
-# src/utils.py
+# src/utils/__init__.py
 
+from django.conf import settings
 from rest_framework.response import Response
 from rest_framework import status
 from axes.helpers import get_lockout_message
 
+# Cache backends that keep their entries inside one process
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def is_shared_cache(alias="default"):
+    """
+    True if the `alias` cache is shared by every worker process (e.g. Redis), so a value
+    written or deleted by one worker is seen by the others.
+    """
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
 def custom_lockout(request, credentials, *args, **kwargs):
     """
     Custom JSON response for locked accounts
@@ -0,0 +1,109 @@
+# src/utils/unique.py
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+
+def pick_free_value(base, taken, separator='-', case_insensitive=False, max_length=None):
+    """
+    Return `base` if it is not in `taken`, otherwise `base{separator}N` with the
+    smallest N >= 1 that is free. With `max_length`, `base` is only shortened when a
+    suffix is actually appended (see _suffix_base).
+    """
+    full = base[:max_length] if max_length else base
+    if case_insensitive:
+        taken = {value.lower() for value in taken}
+    if (full.lower() if case_insensitive else full) not in taken:
+        return full
+
+    base = _suffix_base(base, separator, max_length)
+    base_key = base.lower() if case_insensitive else base
+    pattern = re.compile(rf'^{re.escape(base_key)}{re.escape(separator)}(\d+)$')
+    used = {int(match.group(1)) for match in map(pattern.match, taken) if match}
+    num = 1
+    while num in used:
+        num += 1
+    return f"{base}{separator}{num}"
+
+
+def _suffix_base(base, separator, max_length):
+    """Trim `base` so the value plus a `-N` suffix fits a column of `max_length`."""
+    if max_length:
+        return base[:max_length - len(separator) - 6].rstrip(separator) or base[:max_length]
+    return base
+
+
+def allocate_unique_value(queryset, field, base, separator='-', exclude_pk=None,
+                          case_insensitive=False, max_length=None, fallback='item'):
+    """
+    Allocate a unique value for `field` derived from `base` (e.g. a slug) with one query.
+    Every existing value starting with `base` is fetched at once and the next free
+    `base-N` suffix is picked in memory, instead of probing candidates one by one.
+    Args:
+        queryset: Rows the value must be unique among.
+        exclude_pk: The row being updated, which may keep its own value.
+        case_insensitive (bool): Compare values case-insensitively (e.g. usernames).
+        max_length (int, optional): Column length; `base` is only shortened to fit a suffix.
+        fallback (str): Base used when `base` is empty (e.g. a title with no ASCII letters).
+    Returns:
+        str: A value not currently used by any other row.
+    """
+    base = base or fallback
+    lookup = f"{field}__istartswith" if case_insensitive else f"{field}__startswith"
+    # Both the full base and its suffixed (possibly shortened) form start with this prefix
+    candidates = queryset.filter(**{lookup: _suffix_base(base, separator, max_length)})
+    if exclude_pk is not None:
+        candidates = candidates.exclude(pk=exclude_pk)
+    taken = set(candidates.values_list(field, flat=True))
+    return pick_free_value(
+        base, taken, separator=separator, case_insensitive=case_insensitive, max_length=max_length
+    )
+
+
+def allocate_unique_values(queryset, field, bases, separator='-', max_length=None, fallback='item'):
+    """
+    Bulk form of allocate_unique_value: one value per entry of `bases`, in order, with a
+    single query for all of them. Values handed out earlier in the call count as taken, so
+    duplicate bases within the batch get distinct suffixes.
+    Returns:
+        list[str]
+    """
+    bases = [base or fallback for base in bases]
+    if not bases:
+        return []
+
+    prefixes = Q()
+    for base in set(bases):
+        prefixes |= Q(**{f"{field}__startswith": _suffix_base(base, separator, max_length)})
+    taken = set(queryset.filter(prefixes).values_list(field, flat=True))
+
+    values = []
+    for base in bases:
+        value = pick_free_value(base, taken, separator=separator, max_length=max_length)
+        taken.add(value)
+        values.append(value)
+    return values
+
+
+def save_with_unique_retry(instance, field, save, reallocate, attempts=3):
+    """
+    Run `save()` in a savepoint. If it loses a race for the unique `field` (another
+    row took the same value between allocation and insert), call `reallocate()` and
+    try again. Integrity errors caused by anything else are re-raised immediately.
+    """
+    model = type(instance)
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            value = getattr(instance, field)
+            collided = (
+                value
+                and model._default_manager.filter(**{field: value}).exclude(pk=instance.pk).exists()
+            )
+            if not collided or attempt == attempts:
+                raise
+            reallocate()
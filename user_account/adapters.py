@@ -170,6 +170,7 @@ import uuid
 from allauth.core.exceptions import ImmediateHttpResponse
 from django.http import JsonResponse
 from django.core.exceptions import ValidationError
+from src.utils.unique import allocate_unique_value, save_with_unique_retry
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -313,12 +314,16 @@ class CustomAccountAdapter(DefaultAccountAdapter):
             else:
                 raise ValidationError("Password is required for non-OAuth users")
 
-        # Generate verification token
-        user.verification_token = uuid.uuid4().hex
+        # Verification deadline; the emailed token is signed, not stored
         user.verification_token_expires = timezone.now() + timedelta(hours=24)
 
         if commit:
-            user.save()
+            # Another signup may claim the same username first; pick the next free one
+            save_with_unique_retry(
+                user, "username",
+                save=user.save,
+                reallocate=lambda: setattr(user, "username", self.generate_unique_username(user)),
+            )
             # Auto-create profile for regular users too
             Profile.objects.get_or_create(
                 user=user,
@@ -344,11 +349,12 @@ class CustomAccountAdapter(DefaultAccountAdapter):
     def generate_unique_username_from_email(self, email):
         """Generate unique username from email address."""
         base_username = email.split("@")[0] if email else "user"
-        username = base_username
-        suffix = 1
-
-        while User.objects.filter(username__iexact=username).exists():
-            username = f"{base_username}_{suffix}"
-            suffix += 1
-
-        return username
+        return allocate_unique_value(
+            User.objects.all(),
+            "username",
+            base_username,
+            separator="_",
+            case_insensitive=True,
+            max_length=User._meta.get_field("username").max_length,
+            fallback="user",
+        )
@@ -0,0 +1,43 @@
+# user_account/authentication.py
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .services.user_cache_service import UserCacheService
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through UserCacheService, so an
+    authenticated request (and the role/is_staff/is_superuser permission checks after it)
+    does not query CustomUser. Misses fall back to the regular lookup and fill the cache;
+    the active and password-change checks run on cached users too.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = UserCacheService.get_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            UserCacheService.set_user(user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # The cache keeps only this hash, not the password; without it the password is loaded
+            revoke_hash = UserCacheService.revoke_hash(user) or get_md5_hash_password(user.password)
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != revoke_hash:
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from user_account.services.token_blacklist_service import TokenBlacklistService
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding/blacklisted JWT refresh tokens in chunks and rebuilds the "
+        "blacklist filter (e.g. daily from cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TokenBlacklistService.DEFAULT_BATCH_SIZE,
+            help=f"Number of tokens deleted per transaction (default: {TokenBlacklistService.DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--skip-filter",
+            action="store_true",
+            help="Do not rebuild the blacklist filter (JWT_BLACKLIST_FILTER)",
+        )
+
+    def handle(self, *args, **options):
+        def progress(report):
+            self.stdout.write(f"Deleted {report['outstanding']} expired token(s)...")
+
+        report = TokenBlacklistService.prune_expired_tokens(
+            batch_size=options["batch_size"], progress=progress
+        )
+        self.stdout.write(
+            f"Deleted {report['outstanding']} outstanding and {report['blacklisted']} blacklisted expired token(s)."
+        )
+        if not options["skip_filter"] and TokenBlacklistService.rebuild_filter():
+            self.stdout.write("Rebuilt the blacklist filter.")
+        self.stdout.write(self.style.SUCCESS("Done."))
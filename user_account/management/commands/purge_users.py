@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from user_account.services.bulk_user_deletion_service import BulkUserDeletionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes unverified users, or all users except admins, in chunks with their related data "
+        "(e.g. to purge spam registrations from cron). With --run-jobs, runs the purges queued "
+        "by the admin endpoints' ?background=true instead"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scope",
+            nargs="?",
+            choices=BulkUserDeletionService.SCOPES,
+            help="Which users to delete",
+        )
+        parser.add_argument(
+            "--run-jobs",
+            action="store_true",
+            help="Run queued background purge jobs (e.g. every few minutes from cron), then exit",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BulkUserDeletionService.DEFAULT_BATCH_SIZE,
+            help=f"Number of users deleted per transaction (default: {BulkUserDeletionService.DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many users would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        if options["run_jobs"]:
+            for job in BulkUserDeletionService.run_pending_jobs():
+                report = job.report or {}
+                self.stdout.write(
+                    f"Job {job.pk.hex} ({job.scope}) {job.state}: "
+                    f"{report.get('deleted', 0)} deleted, {report.get('failed', 0)} failed."
+                )
+            return
+        if not options["scope"]:
+            raise CommandError("A scope is required unless --run-jobs is given.")
+
+        queryset = BulkUserDeletionService.get_scope_queryset(options["scope"])
+        if options["dry_run"]:
+            self.stdout.write(f"{queryset.count()} user(s) would be deleted.")
+            return
+
+        def progress(report):
+            self.stdout.write(
+                f"Deleted {report['deleted']}/{report['total']} users ({report['failed']} failed)..."
+            )
+
+        report = BulkUserDeletionService.delete_users(
+            queryset, batch_size=options["batch_size"], progress=progress
+        )
+        for model, count in sorted(report["deleted_objects"].items()):
+            self.stdout.write(f"  {model}: {count}")
+        style = self.style.SUCCESS if not report["failed"] else self.style.WARNING
+        self.stdout.write(style(
+            f"Deleted {report['deleted']} user(s); {report['failed']} could not be deleted (see the log)."
+        ))
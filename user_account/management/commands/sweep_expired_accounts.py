@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from user_account.services.bulk_user_deletion_service import BulkUserDeletionService
+from user_account.services.token_service import UserTokenService
+
+
+class Command(BaseCommand):
+    help = (
+        "Clears expired verification/reset tokens and deletes accounts left unverified past "
+        "their verification deadline, in batches (e.g. hourly from cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BulkUserDeletionService.DEFAULT_BATCH_SIZE,
+            help=f"Number of users updated or deleted per statement/transaction (default: {BulkUserDeletionService.DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=None,
+            help="Hours after the verification deadline before an account is deleted (default: UNVERIFIED_ACCOUNT_GRACE_HOURS)",
+        )
+        parser.add_argument(
+            "--keep-accounts",
+            action="store_true",
+            help="Only clear expired tokens; do not delete unverified accounts",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many unverified accounts would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        expired_users = UserTokenService.get_expired_unverified_users(options["grace_hours"])
+        if options["dry_run"]:
+            self.stdout.write(f"{expired_users.count()} unverified account(s) would be deleted.")
+            return
+
+        cleared = UserTokenService.clear_expired_tokens(batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Cleared {cleared['verification']} verification and {cleared['reset']} reset token(s)."
+        )
+        if options["keep_accounts"]:
+            self.stdout.write(self.style.SUCCESS("Done; unverified accounts were kept."))
+            return
+
+        report = BulkUserDeletionService.delete_users(expired_users, batch_size=options["batch_size"])
+        style = self.style.SUCCESS if not report["failed"] else self.style.WARNING
+        self.stdout.write(style(
+            f"Deleted {report['deleted']} expired unverified account(s); "
+            f"{report['failed']} could not be deleted (see the log)."
+        ))
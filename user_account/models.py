@@ -2,6 +2,8 @@
 
 import uuid
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
@@ -85,7 +87,8 @@ class CustomUser(AbstractUser):
     )
 
     verification_token = models.CharField(max_length=100, blank=True, null=True)
-    verification_token_expires = models.DateTimeField(blank=True, null=True)
+    # Verification deadline; indexed for the sweep_expired_accounts range scan
+    verification_token_expires = models.DateTimeField(blank=True, null=True, db_index=True)
     reset_password_token = models.CharField(max_length=100, blank=True, null=True)
     reset_password_expires = models.DateTimeField(blank=True, null=True)
     password = models.CharField(_("password"), max_length=128)
@@ -196,3 +199,52 @@ class Profile(models.Model):
             self.profile_image.delete(save=False)
             self.profile_image = None
         super().save(*args, **kwargs)
+
+
+# Bulk deletion jobs ---------------------------------------------------------------------------------------
+class UserPurgeJob(models.Model):
+    """
+    A bulk user deletion queued by `?background=true` on the admin deletion endpoints and
+    run by `manage.py purge_users --run-jobs` (see BulkUserDeletionService). State and the
+    running report live in this row, so every worker process can report on the job.
+    """
+    STATE_PENDING = "pending"
+    STATE_RUNNING = "running"
+    STATE_FINISHED = "finished"
+    STATE_FAILED = "failed"
+    STATE_CHOICES = [
+        (STATE_PENDING, "Pending"),
+        (STATE_RUNNING, "Running"),
+        (STATE_FINISHED, "Finished"),
+        (STATE_FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    scope = models.CharField(max_length=32)
+    batch_size = models.PositiveIntegerField()
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default=STATE_PENDING)
+    report = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed after every chunk; a running job whose heartbeat is older than the lease
+    # was interrupted and is picked up again
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["state", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} purge ({self.state})"
+
+
+# Cached auth users (user_account.authentication.CachedJWTAuthentication) go stale on any change
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    from .services.user_cache_service import UserCacheService  # Imported locally to break circular dependency
+
+    UserCacheService.invalidate(instance.pk)
@@ -10,6 +10,8 @@ from rest_framework.exceptions import ValidationError
 from .validators.password_reset_validators import PasswordResetValidator
 from .validators.change_password_validators import ChangePasswordValidator
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .tokens import RefreshToken
 
 
 # REGISTER USER -------------------------------------------------------------------------------
@@ -520,3 +522,9 @@ class UserMinimalSerializer(serializers.ModelSerializer):
         first = obj.first_name[0].upper() if obj.first_name else ""
         last = obj.last_name[0].upper() if obj.last_name else ""
         return f"{first}{last}"
+
+
+# Token Refresh -------------------------------------------------------------------------------
+class BlacklistFilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    """TokenRefreshSerializer using the Bloom-filtered blacklist check (SIMPLE_JWT TOKEN_REFRESH_SERIALIZER)."""
+    token_class = RefreshToken
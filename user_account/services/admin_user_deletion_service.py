@@ -96,6 +96,7 @@ from allauth.socialaccount.models import SocialAccount
 from ..models import Profile
 from ..exceptions.custom_exceptions import DeleteOperationError, UserNotFoundError
 from ..adapters import CustomSocialAccountAdapter  # Import your custom adapter
+from .bulk_user_deletion_service import BulkUserDeletionService
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -212,50 +213,32 @@ class AdminUserDeletionService:
             raise DeleteOperationError(f"Failed to delete user with ID {user_id}.")
 
     @staticmethod
-    def delete_all_users_except_admin():
+    def delete_all_users_except_admin(batch_size=BulkUserDeletionService.DEFAULT_BATCH_SIZE):
         """
-        Delete all users except admin/superusers
+        Delete all users except admin/superusers, in chunks (see BulkUserDeletionService)
         """
         try:
-            with transaction.atomic():
-                users_to_delete = User.objects.exclude(is_staff=True, is_superuser=True)
-                deleted_count = 0
-
-                for user in users_to_delete:
-                    try:
-                        AdminUserDeletionService.delete_user_and_related_data(user)
-                        deleted_count += 1
-                    except Exception as e:
-                        logger.error(f"Error deleting user {user.id}: {str(e)}")
-                        continue
-
-                return deleted_count
+            report = BulkUserDeletionService.delete_users(
+                BulkUserDeletionService.get_scope_queryset(BulkUserDeletionService.SCOPE_ALL_EXCEPT_ADMIN),
+                batch_size=batch_size,
+            )
+            return report["deleted"]
 
         except Exception as e:
             logger.error(f"Error deleting all users except admin: {str(e)}")
             raise DeleteOperationError("Failed to delete all users except admin.")
 
     @staticmethod
-    def delete_unverified_users():
+    def delete_unverified_users(batch_size=BulkUserDeletionService.DEFAULT_BATCH_SIZE):
         """
-        Delete all unverified users
+        Delete all unverified users, in chunks (see BulkUserDeletionService)
         """
         try:
-            with transaction.atomic():
-                unverified_users = User.objects.filter(is_verified=False)
-                deleted_count = 0
-
-                for user in unverified_users:
-                    try:
-                        AdminUserDeletionService.delete_user_and_related_data(user)
-                        deleted_count += 1
-                    except Exception as e:
-                        logger.error(
-                            f"Error deleting unverified user {user.id}: {str(e)}"
-                        )
-                        continue
-
-                return deleted_count
+            report = BulkUserDeletionService.delete_users(
+                BulkUserDeletionService.get_scope_queryset(BulkUserDeletionService.SCOPE_UNVERIFIED),
+                batch_size=batch_size,
+            )
+            return report["deleted"]
 
         except Exception as e:
             logger.error(f"Error deleting unverified users: {str(e)}")
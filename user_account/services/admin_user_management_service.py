@@ -62,6 +62,7 @@ from django.db import IntegrityError
 from ..exceptions.custom_exceptions import UserNotFoundError, UpdateOperationError
 from ..models import UserRole  # Assuming UserRole is defined in your models
 from django.core.exceptions import ValidationError
+from .user_cache_service import UserCacheService
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -113,6 +114,8 @@ class AdminUserManagementService:
 
             # Save changes
             user.save(update_fields=["role", "is_staff", "is_superuser"])
+            # Permission checks read these from the cached auth user; drop it explicitly
+            UserCacheService.invalidate(user.pk)
             logger.info(f"Updated role/permissions for user {user_id}: {role_data}")
 
             return user
@@ -0,0 +1,188 @@
+# user_account/services/bulk_user_deletion_service.py
+
+import logging
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class BulkUserDeletionService:
+    """
+    Chunked, set-based deletion of many users (e.g. a spam purge).
+
+    User ids are collected `batch_size` at a time and each chunk is deleted in its own short
+    transaction: engagement rows are removed with one DELETE per table (see
+    codehub.services.user_data_services) and the users, profiles, social accounts, email
+    addresses etc. with Django's batched cascade. Locks are held for one chunk only, and a
+    failed chunk is logged and skipped instead of rolling back the whole purge.
+    """
+    SCOPE_ALL_EXCEPT_ADMIN = "all_except_admin"
+    SCOPE_UNVERIFIED = "unverified"
+    SCOPES = (SCOPE_ALL_EXCEPT_ADMIN, SCOPE_UNVERIFIED)
+
+    DEFAULT_BATCH_SIZE = 500
+
+    @staticmethod
+    def get_scope_queryset(scope):
+        if scope == BulkUserDeletionService.SCOPE_ALL_EXCEPT_ADMIN:
+            return User.objects.exclude(is_staff=True, is_superuser=True)
+        if scope == BulkUserDeletionService.SCOPE_UNVERIFIED:
+            return User.objects.filter(is_verified=False)
+        raise ValueError(f"Unknown deletion scope: {scope}")
+
+    @staticmethod
+    def delete_users(queryset, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+        """
+        Delete every user matched by `queryset`, `batch_size` users per transaction.
+        Args:
+            progress (callable, optional): Called with the running report after each chunk.
+        Returns:
+            dict: {"total", "deleted", "failed", "deleted_objects": {model: count}}
+        """
+        from codehub.services.user_data_services import delete_user_engagement  # Imported locally to break circular dependency
+
+        report = {
+            "total": queryset.count(),
+            "deleted": 0,
+            "failed": 0,
+            "deleted_objects": Counter(),
+        }
+        last_pk = None
+        while True:
+            # Keyset pagination, so ids of a failed chunk are not picked up again
+            page = queryset.order_by("pk")
+            if last_pk is not None:
+                page = page.filter(pk__gt=last_pk)
+            user_ids = list(page.values_list("pk", flat=True)[:batch_size])
+            if not user_ids:
+                break
+            last_pk = user_ids[-1]
+
+            try:
+                with transaction.atomic():
+                    deleted_objects = Counter(delete_user_engagement(user_ids))
+                    _, per_model = User.objects.filter(pk__in=user_ids).delete()
+                    deleted_objects.update(per_model)
+            except Exception as e:
+                logger.error(f"Error deleting a chunk of {len(user_ids)} users after {last_pk}: {str(e)}")
+                report["failed"] += len(user_ids)
+            else:
+                report["deleted"] += deleted_objects.get(User._meta.label, 0)
+                report["deleted_objects"].update(
+                    {model: count for model, count in deleted_objects.items() if count}
+                )
+
+            if progress:
+                progress(report)
+
+        report["deleted_objects"] = dict(report["deleted_objects"])
+        return report
+
+    # BACKGROUND JOBS -------------------------------------------------------------------------
+    @staticmethod
+    def get_job_lease():
+        return timedelta(seconds=getattr(settings, "USER_PURGE_JOB_LEASE_SECONDS", 600))
+
+    @staticmethod
+    def _job_payload(job):
+        return {
+            "id": job.pk.hex,
+            "scope": job.scope,
+            "state": job.state,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "report": job.report,
+        }
+
+    @staticmethod
+    def get_job(job_id):
+        """Returns the job's state and progress report, or None if it is unknown."""
+        from ..models import UserPurgeJob  # Imported locally to break circular dependency
+
+        try:
+            job = UserPurgeJob.objects.filter(pk=uuid.UUID(hex=str(job_id))).first()
+        except ValueError:
+            return None
+        return job and BulkUserDeletionService._job_payload(job)
+
+    @staticmethod
+    def start_job(scope, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Queue a purge for `manage.py purge_users --run-jobs` and return its job id right away.
+        Progress is stored on the job row after every chunk (see get_job).
+        """
+        from ..models import UserPurgeJob  # Imported locally to break circular dependency
+
+        BulkUserDeletionService.get_scope_queryset(scope)  # Reject unknown scopes before queueing
+        return UserPurgeJob.objects.create(scope=scope, batch_size=batch_size).pk.hex
+
+    @staticmethod
+    def claim_job():
+        """
+        Mark the oldest queued job as running and return it, or None if there is none.
+        A running job whose heartbeat is older than the lease (its worker died) is claimed
+        again; deleting by scope is idempotent, so it simply continues with the users left.
+        """
+        from ..models import UserPurgeJob  # Imported locally to break circular dependency
+
+        now = timezone.now()
+        stale = now - BulkUserDeletionService.get_job_lease()
+        with transaction.atomic():
+            job = (
+                UserPurgeJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(state=UserPurgeJob.STATE_PENDING) |
+                    Q(state=UserPurgeJob.STATE_RUNNING, heartbeat_at__lt=stale)
+                )
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+            job.state = UserPurgeJob.STATE_RUNNING
+            job.started_at = job.started_at or now
+            job.heartbeat_at = now
+            job.save(update_fields=["state", "started_at", "heartbeat_at"])
+        return job
+
+    @staticmethod
+    def run_job(job):
+        """Run a claimed job to completion, saving its report after every chunk."""
+        from ..models import UserPurgeJob  # Imported locally to break circular dependency
+
+        def progress(report):
+            UserPurgeJob.objects.filter(pk=job.pk).update(
+                report={**report, "deleted_objects": dict(report["deleted_objects"])},
+                heartbeat_at=timezone.now(),
+            )
+
+        try:
+            queryset = BulkUserDeletionService.get_scope_queryset(job.scope)
+            job.report = BulkUserDeletionService.delete_users(queryset, job.batch_size, progress=progress)
+            job.state = UserPurgeJob.STATE_FINISHED
+        except Exception as e:
+            logger.error(f"User purge job {job.pk.hex} failed: {str(e)}")
+            job.refresh_from_db(fields=["report"])
+            job.state = UserPurgeJob.STATE_FAILED
+        job.finished_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=["state", "report", "finished_at", "heartbeat_at"])
+        return job
+
+    @staticmethod
+    def run_pending_jobs():
+        """Run queued jobs one after another until none is left. Returns the jobs run."""
+        jobs = []
+        while True:
+            job = BulkUserDeletionService.claim_job()
+            if job is None:
+                return jobs
+            jobs.append(BulkUserDeletionService.run_job(job))
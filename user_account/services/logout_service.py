@@ -1,7 +1,7 @@
 # backend/apps/user_account/services/logout_service.py
 import logging
 from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
+from ..tokens import RefreshToken
 from rest_framework.response import Response
 from rest_framework import status
 
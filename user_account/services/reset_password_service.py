@@ -1,10 +1,9 @@
 # backend/apps/user_account/services/reset_password_service.py
 import logging
-import requests
-import uuid
 from django.conf import settings
-from django.utils import timezone
-from ..models import CustomUser
+from contact.models import EmailJob
+from contact.outbox import EmailOutboxService
+from .token_service import UserTokenService
 
 logger = logging.getLogger(__name__)
 
@@ -15,50 +14,32 @@ class ResetPasswordService:
         """
         Completely standalone password reset email service
         Doesn't depend on EmailService class
+        Only queues the email, so the request never waits on the mail provider
         """
         try:
-            # Generate reset token
-            user.reset_password_token = uuid.uuid4().hex
-            user.reset_password_expires = timezone.now() + timezone.timedelta(hours=1)
-            user.save()
+            # Generate a signed reset token; nothing is written to the user row
+            token = UserTokenService.make_reset_token(user)
 
             # Build reset URL
             # reset_url = f"{settings.FRONTEND_URL}/api/user/reset-password?token={user.reset_password_token}&userId={user.id}"
-            reset_url = f"{settings.FRONTEND_URL}/auth/reset-password?token={user.reset_password_token}&userId={user.id}"
+            reset_url = f"{settings.FRONTEND_URL}/auth/reset-password?token={token}&userId={user.id}"
 
-            # Prepare email content
-            email_data = {
-                "sender": {
-                    "name": settings.EMAIL_SENDER_NAME,
-                    "email": settings.EMAIL_SENDER_EMAIL,
-                },
-                "to": [{"email": user.email, "name": user.username}],
-                "subject": "Password Reset Request",
-                "htmlContent": f"""
+            # Queue the email; the process_email_outbox worker delivers it through Brevo
+            EmailOutboxService.enqueue(
+                to_email=user.email,
+                to_name=user.username,
+                subject="Password Reset Request",
+                html_content=f"""
                     <p>Hello {user.username},</p>
                     <p>We received a request to reset your password. Click the link below to proceed:</p>
                     <p><a href="{reset_url}">Reset Password</a></p>
                     <p>If you didn't request this, please ignore this email.</p>
                     <p>The link will expire in 1 hour.</p>
                 """,
-            }
-
-            # Send email directly using Brevo API
-            headers = {
-                "accept": "application/json",
-                "api-key": settings.BREVO_API_KEY,
-                "content-type": "application/json",
-            }
-
-            response = requests.post(
-                "https://api.brevo.com/v3/smtp/email", headers=headers, json=email_data
+                transport=EmailJob.TRANSPORT_BREVO,
             )
 
-            if response.status_code != 201:
-                logger.error(f"Password reset email failed to send: {response.text}")
-                return False
-
-            logger.info(f"Password reset email sent to {user.email}")
+            logger.info(f"Password reset email queued for {user.email}")
             return True
 
         except Exception as e:
@@ -68,15 +49,7 @@ class ResetPasswordService:
     @staticmethod
     def validate_reset_token(token, user_id):
         """Validate the reset token"""
-        try:
-            user = CustomUser.objects.get(
-                id=user_id,
-                reset_password_token=token,
-                reset_password_expires__gt=timezone.now(),
-            )
-            return user
-        except CustomUser.DoesNotExist:
-            return None
+        return UserTokenService.get_user_for_reset_token(token, user_id)
 
     @staticmethod
     def reset_user_password(user, new_password):
@@ -0,0 +1,195 @@
+# user_account/services/token_blacklist_service.py
+
+import hashlib
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def get_filter_bits():
+    return getattr(settings, "JWT_BLACKLIST_FILTER_BITS", 2 ** 23)
+
+
+def get_filter_hashes():
+    return getattr(settings, "JWT_BLACKLIST_FILTER_HASHES", 7)
+
+
+def filter_positions(jti):
+    """The filter's bit positions for `jti` (double hashing over one SHA-256 digest)."""
+    digest = hashlib.sha256(jti.encode("utf-8")).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:16], "big") | 1
+    bits = get_filter_bits()
+    return [(h1 + i * h2) % bits for i in range(get_filter_hashes())]
+
+
+# FILTERS ----------------------------------------------------------------------------------------
+class RedisBlacklistFilter:
+    """
+    Bloom filter shared by every process as one Redis bitmap (requires the django-redis
+    cache backend). The bit after the filter marks it as built: until `prune_jwt_tokens`
+    has built it, or if Redis evicted it, that bit reads 0 and checks go to the database.
+    """
+    BITS_KEY = "user_account:jwt_blacklist:filter"
+    BUILD_KEY = "user_account:jwt_blacklist:filter-build"
+    PIPELINE_SIZE = 10000
+
+    def __init__(self):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection("default")
+
+    def might_contain(self, jti):
+        """False if `jti` is certainly not blacklisted, True if it may be, None if unknown."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.getbit(self.BITS_KEY, get_filter_bits())
+        for pos in filter_positions(jti):
+            pipe.getbit(self.BITS_KEY, pos)
+        ready, *bits = pipe.execute()
+        if not ready:
+            return None
+        return all(bits)
+
+    def _set_bits(self, key, jtis):
+        pipe = self.redis.pipeline(transaction=False)
+        queued = 0
+        for jti in jtis:
+            for pos in filter_positions(jti):
+                pipe.setbit(key, pos, 1)
+                queued += 1
+            if queued >= self.PIPELINE_SIZE:
+                pipe.execute()
+                queued = 0
+        pipe.execute()
+
+    def add(self, jtis):
+        self._set_bits(self.BITS_KEY, jtis)
+
+    def discard(self):
+        """Mark the filter as not built, so checks go to the database until the next rebuild."""
+        self.redis.delete(self.BITS_KEY)
+
+    def rebuild(self, jtis):
+        # Built aside and swapped in with RENAME, so readers never see a partial filter
+        self.redis.delete(self.BUILD_KEY)
+        self._set_bits(self.BUILD_KEY, jtis)
+        self.redis.setbit(self.BUILD_KEY, get_filter_bits(), 1)
+        self.redis.rename(self.BUILD_KEY, self.BITS_KEY)
+
+
+# Only filters shared by every process: a per-process filter would miss tokens blacklisted
+# by another worker and accept them without a database check
+BLACKLIST_FILTERS = {
+    "redis": RedisBlacklistFilter,
+}
+
+
+# SERVICE ----------------------------------------------------------------------------------------
+class TokenBlacklistService:
+    """
+    Blacklist checks with a Bloom-filter pre-check, and chunked pruning of expired
+    OutstandingToken/BlacklistedToken rows (rest_framework_simplejwt.token_blacklist).
+
+    The filter never gives a false "not blacklisted": a token is only accepted without a
+    database lookup when one of its bits is unset. Pruned tokens keep their bits until the
+    next rebuild, which only costs extra lookups.
+    """
+    DEFAULT_BATCH_SIZE = 1000
+
+    _filter = None
+    _filter_lock = threading.Lock()
+
+    @staticmethod
+    def get_filter():
+        """The configured filter (JWT_BLACKLIST_FILTER), or None if it is off."""
+        name = getattr(settings, "JWT_BLACKLIST_FILTER", "off")
+        if name not in BLACKLIST_FILTERS:
+            return None
+        if TokenBlacklistService._filter is None:
+            with TokenBlacklistService._filter_lock:
+                if TokenBlacklistService._filter is None:
+                    TokenBlacklistService._filter = BLACKLIST_FILTERS[name]()
+        return TokenBlacklistService._filter
+
+    @staticmethod
+    def iter_blacklisted_jtis():
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        return BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list(
+            "token__jti", flat=True
+        ).iterator(chunk_size=TokenBlacklistService.DEFAULT_BATCH_SIZE)
+
+    @staticmethod
+    def is_blacklisted(jti):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        try:
+            blacklist_filter = TokenBlacklistService.get_filter()
+            if blacklist_filter is not None and blacklist_filter.might_contain(jti) is False:
+                return False
+        except Exception as e:
+            logger.error(f"Error checking the JWT blacklist filter: {str(e)}")
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    @staticmethod
+    def record_blacklisted(jti):
+        """Add a newly blacklisted token to the filter (after its BlacklistedToken row exists)."""
+        try:
+            blacklist_filter = TokenBlacklistService.get_filter()
+            if blacklist_filter is not None:
+                blacklist_filter.add([jti])
+        except Exception as e:
+            # A filter without the token would accept it, so stop trusting the filter until the
+            # next rebuild (which adds it); the token is blacklisted in the database either way
+            logger.error(f"Error adding token {jti} to the JWT blacklist filter: {str(e)}")
+            try:
+                blacklist_filter.discard()
+            except Exception as e:
+                logger.error(f"Error discarding the JWT blacklist filter: {str(e)}")
+
+    @staticmethod
+    def rebuild_filter():
+        """
+        Rebuild the filter from the unexpired blacklisted tokens, dropping bits of pruned ones.
+        Returns False if no filter is configured.
+        """
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        blacklist_filter = TokenBlacklistService.get_filter()
+        if blacklist_filter is None:
+            return False
+        started_at = timezone.now()
+        blacklist_filter.rebuild(TokenBlacklistService.iter_blacklisted_jtis())
+        # Tokens blacklisted while the rebuild read the table may be missing from it
+        blacklist_filter.add(
+            BlacklistedToken.objects.filter(blacklisted_at__gte=started_at - timedelta(minutes=1))
+            .values_list("token__jti", flat=True)
+        )
+        return True
+
+    @staticmethod
+    def prune_expired_tokens(batch_size=DEFAULT_BATCH_SIZE, progress=None):
+        """
+        Delete expired outstanding tokens and their blacklist entries, `batch_size` per
+        transaction. Tokens are visited in pk order, which follows expiry closely (they all
+        live REFRESH_TOKEN_LIFETIME), so each batch reads only the oldest rows.
+        Returns: {"outstanding": rows, "blacklisted": rows}
+        """
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+        report = {"outstanding": 0, "blacklisted": 0}
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now()).order_by("pk")
+        while True:
+            ids = list(expired.values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                return report
+            _, per_model = OutstandingToken.objects.filter(pk__in=ids).delete()
+            report["outstanding"] += per_model.get(OutstandingToken._meta.label, 0)
+            report["blacklisted"] += per_model.get(BlacklistedToken._meta.label, 0)
+            if progress:
+                progress(report)
@@ -0,0 +1,181 @@
+# user_account/services/token_service.py
+
+import re
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+# uuid4().hex tokens stored on the user row by earlier releases; still accepted until they expire
+LEGACY_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ResetTokenGenerator(PasswordResetTokenGenerator):
+    """Django's reset tokens (bound to the password, last_login and email), under their own salt."""
+    key_salt = "user_account.password-reset"
+
+
+reset_token_generator = ResetTokenGenerator()
+
+
+class UserTokenService:
+    """
+    HMAC-signed, timestamped email verification and password reset tokens.
+
+    A verification token carries the user id and a fingerprint of the email, signed with
+    SECRET_KEY (django.core.signing); reset tokens come from Django's PasswordResetTokenGenerator.
+    Issuing one writes nothing, and checking one needs no token lookup: the signature and age
+    are verified in memory and the user is fetched by primary key. A verification token stops
+    working when the email changes, and a reset token as soon as the password changes or the
+    user logs in, so neither can be replayed once used.
+    """
+    VERIFICATION_SALT = "user_account.email-verification"
+
+    @staticmethod
+    def get_verification_max_age():
+        return getattr(settings, "EMAIL_VERIFICATION_TOKEN_MAX_AGE", 60 * 60 * 24)
+
+    @staticmethod
+    def _fingerprint(salt, value):
+        return salted_hmac(salt, value, algorithm="sha256").hexdigest()[:16]
+
+    # ISSUE ---------------------------------------------------------------------------------------
+    @staticmethod
+    def make_verification_token(user):
+        return signing.dumps(
+            {
+                "u": user.pk.hex,
+                "e": UserTokenService._fingerprint(UserTokenService.VERIFICATION_SALT, user.email.lower()),
+            },
+            salt=UserTokenService.VERIFICATION_SALT,
+        )
+
+    @staticmethod
+    def make_reset_token(user):
+        # Expires after PASSWORD_RESET_TIMEOUT seconds
+        return reset_token_generator.make_token(user)
+
+    # CHECK ---------------------------------------------------------------------------------------
+    @staticmethod
+    def _load(token, salt, max_age):
+        """Returns the payload of a valid, unexpired token, or None."""
+        try:
+            payload = signing.loads(token, salt=salt, max_age=max_age)
+        except signing.BadSignature:  # Also raised for an expired timestamp (SignatureExpired)
+            return None
+        if not isinstance(payload, dict) or not isinstance(payload.get("u"), str):
+            return None
+        try:
+            payload["u"] = uuid.UUID(hex=payload["u"])
+        except ValueError:
+            return None
+        return payload
+
+    @staticmethod
+    def get_user_for_verification_token(token):
+        """Returns the user a valid verification token was issued to, or None."""
+        from ..models import CustomUser  # Imported locally to break circular dependency
+
+        token = (token or "").strip()
+        payload = UserTokenService._load(
+            token, UserTokenService.VERIFICATION_SALT, UserTokenService.get_verification_max_age()
+        )
+        if payload is None:
+            return UserTokenService._get_user_for_legacy_token(
+                token, verification_token=token, verification_token_expires__gt=timezone.now()
+            )
+
+        user = CustomUser.objects.filter(pk=payload["u"]).first()
+        expected = user and UserTokenService._fingerprint(UserTokenService.VERIFICATION_SALT, user.email.lower())
+        if not user or not constant_time_compare(expected, payload.get("e", "")):
+            return None
+        return user
+
+    @staticmethod
+    def get_user_for_reset_token(token, user_id):
+        """Returns the user if `token` is a valid, unused reset token issued to `user_id`, or None."""
+        from ..models import CustomUser  # Imported locally to break circular dependency
+
+        token = (token or "").strip()
+        try:
+            user = CustomUser.objects.filter(pk=user_id).first()
+        except (ValueError, ValidationError):  # Malformed user id
+            return None
+        if user and reset_token_generator.check_token(user, token):
+            return user
+        return UserTokenService._get_user_for_legacy_token(
+            token, id=user_id, reset_password_token=token, reset_password_expires__gt=timezone.now()
+        )
+
+    @staticmethod
+    def _get_user_for_legacy_token(token, **lookup):
+        """
+        Tokens issued before signed tokens were stored on the user row. Only strings shaped
+        like one are looked up, so arbitrary input never reaches the unindexed columns.
+        """
+        from ..models import CustomUser  # Imported locally to break circular dependency
+
+        if not LEGACY_TOKEN_RE.match(token):
+            return None
+        try:
+            return CustomUser.objects.filter(**lookup).first()
+        except (ValueError, ValidationError):  # Malformed user id
+            return None
+
+    # SWEEP ---------------------------------------------------------------------------------------
+    @staticmethod
+    def _clear_in_batches(queryset, batch_size, **values):
+        """UPDATE the rows of `queryset` to `values`, `batch_size` rows per statement."""
+        from ..models import CustomUser  # Imported locally to break circular dependency
+
+        cleared = 0
+        while True:
+            # Updated rows drop out of `queryset`, so every pass takes the next batch
+            ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                return cleared
+            cleared += CustomUser.objects.filter(pk__in=ids).update(**values)
+
+    @staticmethod
+    def clear_expired_tokens(batch_size=500):
+        """
+        Null out stored tokens that can no longer be used: expired legacy reset and verification
+        tokens, and leftovers on verified accounts. The verification deadline of unverified
+        accounts is kept, because get_expired_unverified_users selects on it.
+        Returns: {"reset": rows, "verification": rows}
+        """
+        from ..models import CustomUser  # Imported locally to break circular dependency
+
+        now = timezone.now()
+        reset = UserTokenService._clear_in_batches(
+            CustomUser.objects.filter(reset_password_expires__lt=now),
+            batch_size, reset_password_token=None, reset_password_expires=None,
+        )
+        verification = UserTokenService._clear_in_batches(
+            CustomUser.objects.filter(is_verified=False, verification_token__isnull=False, verification_token_expires__lt=now),
+            batch_size, verification_token=None,
+        )
+        verification += UserTokenService._clear_in_batches(
+            CustomUser.objects.filter(is_verified=True, verification_token_expires__isnull=False),
+            batch_size, verification_token=None, verification_token_expires=None,
+        )
+        return {"reset": reset, "verification": verification}
+
+    @staticmethod
+    def get_expired_unverified_users(grace_hours=None):
+        """Non-staff accounts still unverified `grace_hours` after their verification deadline."""
+        from ..models import CustomUser  # Imported locally to break circular dependency
+
+        if grace_hours is None:
+            grace_hours = getattr(settings, "UNVERIFIED_ACCOUNT_GRACE_HOURS", 0)
+        return CustomUser.objects.filter(
+            is_verified=False,
+            is_staff=False,
+            is_superuser=False,
+            verification_token_expires__lt=timezone.now() - timedelta(hours=grace_hours),
+        )
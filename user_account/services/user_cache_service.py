@@ -0,0 +1,166 @@
+# user_account/services/user_cache_service.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DEFERRED
+
+from src.utils import is_shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+class UserCacheService:
+    """
+    Two-tier cache of authenticated users: a small in-process LRU in front of the shared
+    cache (Redis in production), so authenticated requests can skip the user query.
+
+    Entries hold the user's column values (not a pickled instance) and every hit returns a
+    fresh CustomUser, so one request never sees another's changes to request.user. Saving or
+    deleting a user drops its entries here and in the shared cache (see the receivers in
+    user_account.models). Other processes only drop their in-process entry when its short
+    TTL runs out, which bounds how long a role change can take to reach them.
+
+    The password hash and legacy account tokens are never cached: a restored user loads them
+    from the database if they are accessed. With CHECK_REVOKE_TOKEN on, the entry holds the
+    token revoke-claim hash of the password instead (see revoke_hash).
+    """
+    CACHE_PREFIX = "user_account:auth_user:v2"
+    EXCLUDED_FIELDS = {"password", "reset_password_token", "verification_token"}
+    REVOKE_HASH_KEY = "_revoke_hash"
+
+    _local = OrderedDict()  # {user_id: (expires_at, values)}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def is_enabled():
+        # invalidate() must reach every worker, which a per-process cache backend cannot do
+        return getattr(settings, "USER_CACHE_ENABLED", False) and is_shared_cache()
+
+    @staticmethod
+    def get_timeout():
+        return getattr(settings, "USER_CACHE_TIMEOUT", 300)
+
+    @staticmethod
+    def get_local_timeout():
+        return getattr(settings, "USER_CACHE_LOCAL_TIMEOUT", 10)
+
+    @staticmethod
+    def get_local_max_size():
+        return getattr(settings, "USER_CACHE_LOCAL_MAX_SIZE", 1024)
+
+    @staticmethod
+    def _key(user_id):
+        return f"{UserCacheService.CACHE_PREFIX}:{user_id}"
+
+    @staticmethod
+    def _user_model():
+        from ..models import CustomUser  # Imported locally to break circular dependency
+
+        return CustomUser
+
+    @staticmethod
+    def _to_values(user):
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.utils import get_md5_hash_password
+
+        values = {
+            field.attname: getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+            if field.attname not in UserCacheService.EXCLUDED_FIELDS
+        }
+        if api_settings.CHECK_REVOKE_TOKEN:
+            values[UserCacheService.REVOKE_HASH_KEY] = get_md5_hash_password(user.password)
+        return values
+
+    @staticmethod
+    def _from_values(values):
+        User = UserCacheService._user_model()
+        # In model field order; an excluded column, or one missing from an older entry, is loaded on access
+        attnames = [field.attname for field in User._meta.concrete_fields]
+        user = User.from_db("default", attnames, [values.get(name, DEFERRED) for name in attnames])
+        user._cached_revoke_hash = values.get(UserCacheService.REVOKE_HASH_KEY)
+        return user
+
+    @staticmethod
+    def revoke_hash(user):
+        """The revoke-claim hash of a cached user's password, or None if it was not cached."""
+        return getattr(user, "_cached_revoke_hash", None)
+
+    # LOCAL TIER ----------------------------------------------------------------------------------
+    @staticmethod
+    def _local_get(user_id):
+        with UserCacheService._lock:
+            entry = UserCacheService._local.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del UserCacheService._local[user_id]
+                return None
+            UserCacheService._local.move_to_end(user_id)
+            return entry[1]
+
+    @staticmethod
+    def _local_set(user_id, values):
+        expires_at = time.monotonic() + UserCacheService.get_local_timeout()
+        with UserCacheService._lock:
+            UserCacheService._local[user_id] = (expires_at, values)
+            UserCacheService._local.move_to_end(user_id)
+            while len(UserCacheService._local) > UserCacheService.get_local_max_size():
+                UserCacheService._local.popitem(last=False)
+
+    @staticmethod
+    def clear_local():
+        with UserCacheService._lock:
+            UserCacheService._local.clear()
+
+    # PUBLIC API ----------------------------------------------------------------------------------
+    @staticmethod
+    def get_user(user_id):
+        """Returns a fresh CustomUser for `user_id` from either tier, or None on a miss."""
+        if not UserCacheService.is_enabled():
+            return None
+        user_id = str(user_id)
+        values = UserCacheService._local_get(user_id)
+        if values is None:
+            values = cache.get(UserCacheService._key(user_id))
+            if values is None:
+                return None
+            UserCacheService._local_set(user_id, values)
+        try:
+            return UserCacheService._from_values(values)
+        except Exception as e:
+            # E.g. an entry written before a schema change; fall back to the database
+            logger.error(f"Error restoring cached user {user_id}: {str(e)}")
+            UserCacheService.invalidate(user_id)
+            return None
+
+    @staticmethod
+    def set_user(user):
+        if not UserCacheService.is_enabled():
+            return
+        user_id = str(user.pk)
+        values = UserCacheService._to_values(user)
+        cache.set(UserCacheService._key(user_id), values, UserCacheService.get_timeout())
+        UserCacheService._local_set(user_id, values)
+
+    @staticmethod
+    def invalidate(user_id):
+        """
+        Drop the user's entries now and again once the surrounding transaction commits,
+        so a request that reads the old row before the commit cannot re-cache it.
+        """
+        user_id = str(user_id)
+
+        def drop():
+            with UserCacheService._lock:
+                UserCacheService._local.pop(user_id, None)
+            cache.delete(UserCacheService._key(user_id))
+
+        drop()
+        transaction.on_commit(drop)
@@ -9,6 +9,7 @@ from django.utils import timezone
 from ..models import CustomUser, UserRole
 import uuid
 from .reset_password_service import ResetPasswordService
+from .token_service import UserTokenService
 from ..validators.password_reset_validators import PasswordResetValidator
 from ..exceptions.custom_exceptions import RegistrationError
 from django.db import IntegrityError
@@ -51,7 +52,7 @@ class UserService:
                 is_staff=is_staff,
                 is_superuser=is_superuser,
                 is_verified=False,
-                verification_token=uuid.uuid4().hex,
+                # Verification deadline; the emailed token itself is signed, not stored
                 verification_token_expires=timezone.now() + timedelta(hours=24),
             )
 
@@ -104,18 +105,19 @@ class UserService:
     @staticmethod
     def verify_email(token):
         try:
-            user = User.objects.get(
-                verification_token=token, verification_token_expires__gt=timezone.now()
-            )
+            # Signature and age are checked in memory; the user is then read by primary key
+            user = UserTokenService.get_user_for_verification_token(token)
+            if user is None:
+                raise User.DoesNotExist
 
             # Check if already verified to prevent multiple verifications
             if user.is_verified:
                 return user
 
             user.is_verified = True
-            user.verification_token = None  # Clear the token
+            user.verification_token = None  # Clear any legacy stored token
             user.verification_token_expires = None
-            user.save()
+            user.save(update_fields=["is_verified", "verification_token", "verification_token_expires"])
 
             return user
 
@@ -153,12 +155,7 @@ class UserService:
         try:
             user = CustomUser.objects.get(email=email)
 
-            # Generate reset token and set expiry (1 hour from now)
-            user.reset_password_token = uuid.uuid4().hex
-            user.reset_password_expires = timezone.now() + timedelta(hours=1)
-            user.save()
-
-            # Send email
+            # Send email; the signed reset token in the link is not stored on the user
             if not ResetPasswordService.send_password_reset_email(user):
                 logger.error("Failed to send password reset email")
                 return False
@@ -174,17 +171,7 @@ class UserService:
 
     @staticmethod
     def validate_reset_token(token, user_id):
-        try:
-            from ..models import CustomUser
-
-            user = CustomUser.objects.get(
-                id=user_id,
-                reset_password_token=token,
-                reset_password_expires__gt=timezone.now(),
-            )
-            return user
-        except CustomUser.DoesNotExist:
-            return None
+        return UserTokenService.get_user_for_reset_token(token, user_id)
 
     @staticmethod
     def reset_password(user, new_password):
@@ -216,10 +203,9 @@ class UserService:
     def resend_verification_email(email):
         try:
             user = User.objects.get(email=email, is_verified=False)
-            # Optionally regenerate the verification token and expiry
-            user.verification_token = uuid.uuid4().hex
+            # Extend the verification deadline; the new link carries a freshly signed token
             user.verification_token_expires = timezone.now() + timedelta(hours=24)
-            user.save()
+            user.save(update_fields=["verification_token_expires"])
 
             if EmailService.send_verification_email(user):
                 return user
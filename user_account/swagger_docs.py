@@ -492,12 +492,96 @@ def delete_account_docs():
     )
 
 
+# BULK DELETION BACKGROUND JOBS ---------------------------------------------------------------------------
+BACKGROUND_PURGE_PARAMETER = openapi.Parameter(
+    name="background",
+    in_=openapi.IN_QUERY,
+    type=openapi.TYPE_BOOLEAN,
+    description="Queue the deletion as a background job (run by `manage.py purge_users --run-jobs`) and return 202 with its id right away",
+    required=False,
+)
+
+BACKGROUND_PURGE_ACCEPTED_RESPONSE = openapi.Response(
+    description="Deletion queued as a background job (?background=true)",
+    schema=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "status": openapi.Schema(type=openapi.TYPE_STRING, example="accepted"),
+            "job_id": openapi.Schema(
+                type=openapi.TYPE_STRING, example="9f0c3a8e5b7d4c1e8a2f6b3d7e9c1a5f"
+            ),
+            "status_url": openapi.Schema(
+                type=openapi.TYPE_STRING,
+                example="/api/users/purge-jobs/9f0c3a8e5b7d4c1e8a2f6b3d7e9c1a5f/",
+            ),
+        },
+    ),
+)
+
+
+def user_purge_job_status_docs():
+    """Swagger documentation for UserPurgeJobStatusView (Admin Only)"""
+    return swagger_auto_schema(
+        operation_description="[ADMIN ONLY] Progress of a background bulk user deletion",
+        responses={
+            status.HTTP_200_OK: openapi.Response(
+                description="Job state and progress report",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "id": openapi.Schema(type=openapi.TYPE_STRING),
+                        "scope": openapi.Schema(
+                            type=openapi.TYPE_STRING, example="unverified"
+                        ),
+                        "state": openapi.Schema(
+                            type=openapi.TYPE_STRING,
+                            enum=["pending", "running", "finished", "failed"],
+                            example="running",
+                        ),
+                        "started_at": openapi.Schema(
+                            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+                        ),
+                        "finished_at": openapi.Schema(
+                            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+                        ),
+                        "report": openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "total": openapi.Schema(type=openapi.TYPE_INTEGER, example=100000),
+                                "deleted": openapi.Schema(type=openapi.TYPE_INTEGER, example=42500),
+                                "failed": openapi.Schema(type=openapi.TYPE_INTEGER, example=0),
+                                "deleted_objects": openapi.Schema(type=openapi.TYPE_OBJECT),
+                            },
+                        ),
+                    },
+                ),
+            ),
+            status.HTTP_404_NOT_FOUND: openapi.Response(
+                description="Unknown job",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "error": openapi.Schema(
+                            type=openapi.TYPE_STRING, example="Purge job not found."
+                        ),
+                    },
+                ),
+            ),
+        },
+        tags=["Admin Operations"],
+        security=[{"Bearer": []}],
+        operation_summary="Background user deletion progress (Admin Only)",
+    )
+
+
 # DELETE USER ACCOUNT ---------------------------------------------------------------------------
 def delete_all_users_except_admin_docs():
     """Swagger documentation for DeleteAllUsersExceptAdminView (Admin Only)"""
     return swagger_auto_schema(
         operation_description="[ADMIN ONLY] Permanently delete all non-admin user accounts",
+        manual_parameters=[BACKGROUND_PURGE_PARAMETER],
         responses={
+            status.HTTP_202_ACCEPTED: BACKGROUND_PURGE_ACCEPTED_RESPONSE,
             status.HTTP_200_OK: openapi.Response(
                 description="Users deleted successfully",
                 schema=openapi.Schema(
@@ -563,6 +647,9 @@ This will permanently delete ALL non-admin user accounts and their associated da
 - May cause significant data loss
 - Should only be used during system maintenance
 
+Users are deleted in chunks; `?background=true` queues the purge as a job for
+`manage.py purge_users --run-jobs` (poll `purge-jobs/<job_id>/` for progress).
+
 Returns count of successfully deleted users.""",
     )
 
@@ -683,7 +770,9 @@ def delete_unverified_users_docs():
     """Swagger documentation for DeleteUnverifiedUsersView (Admin Only)"""
     return swagger_auto_schema(
         operation_description="[ADMIN ONLY] Permanently delete all unverified user accounts",
+        manual_parameters=[BACKGROUND_PURGE_PARAMETER],
         responses={
+            status.HTTP_202_ACCEPTED: BACKGROUND_PURGE_ACCEPTED_RESPONSE,
             status.HTTP_200_OK: openapi.Response(
                 description="Unverified users deleted successfully",
                 schema=openapi.Schema(
@@ -748,6 +837,8 @@ Permanently deletes ALL user accounts that haven't completed email verification.
 - Does not affect admin accounts
 - Returns count of deleted accounts
 - Automatic cleanup of related data
+- Users are deleted in chunks; `?background=true` queues the purge as a job for
+  `manage.py purge_users --run-jobs` (poll `purge-jobs/<job_id>/` for progress)
 
 ⏳ **Typical Use Cases:**
 - Regular system maintenance
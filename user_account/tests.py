@@ -1,3 +1,284 @@
-from django.test import TestCase
+import time
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CachedJWTAuthentication
+from .models import CustomUser, UserPurgeJob
+from .services.admin_user_management_service import AdminUserManagementService
+from .services.bulk_user_deletion_service import BulkUserDeletionService
+from .services.token_service import UserTokenService, reset_token_generator
+from .services.token_blacklist_service import RedisBlacklistFilter, TokenBlacklistService
+from .services.user_cache_service import UserCacheService
+from .tokens import RefreshToken
+
+
+class FakeRedisBitmaps:
+    """The bitmap subset of redis-py used by RedisBlacklistFilter, kept in memory."""
+
+    def __init__(self):
+        self.bitmaps = {}
+        self.fail_writes = False
+
+    def getbit(self, key, pos):
+        return int(pos in self.bitmaps.get(key, ()))
+
+    def setbit(self, key, pos, value):
+        if self.fail_writes:
+            raise ConnectionError("Redis is unavailable")
+        bits = self.bitmaps.setdefault(key, set())
+        (bits.add if value else bits.discard)(pos)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.bitmaps.pop(key, None)
+
+    def rename(self, src, dst):
+        self.bitmaps[dst] = self.bitmaps.pop(src)
+
+    def pipeline(self, transaction=True):
+        return FakeRedisBitmapPipeline(self)
+
+
+class FakeRedisBitmapPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def getbit(self, *args):
+        self.calls.append((self.redis.getbit, args))
+
+    def setbit(self, *args):
+        self.calls.append((self.redis.setbit, args))
+
+    def execute(self):
+        calls, self.calls = self.calls, []
+        return [method(*args) for method, args in calls]
+
+
+@override_settings(JWT_BLACKLIST_FILTER_BITS=4096, JWT_BLACKLIST_FILTER_HASHES=3)
+class TokenBlacklistFilterTests(TestCase):
+    """A blacklisted refresh token must be rejected whichever filter mode is configured."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="holder@example.com", password="pass12345")
+        self.redis = FakeRedisBitmaps()
+        TokenBlacklistService._filter = None
+        self.addCleanup(setattr, TokenBlacklistService, "_filter", None)
+
+    def _use_redis_filter(self):
+        patcher = mock.patch("django_redis.get_redis_connection", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return override_settings(JWT_BLACKLIST_FILTER="redis")
+
+    def _blacklisted_token(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        return str(token)
+
+    def assertRejected(self, token):
+        with self.assertRaises(TokenError):
+            RefreshToken(token)
+
+    def test_off_mode(self):
+        with override_settings(JWT_BLACKLIST_FILTER="off"):
+            self.assertIsNone(TokenBlacklistService.get_filter())
+            self.assertRejected(self._blacklisted_token())
+
+    def test_memory_mode_is_not_available(self):
+        with override_settings(JWT_BLACKLIST_FILTER="memory"):
+            self.assertIsNone(TokenBlacklistService.get_filter())
+            self.assertRejected(self._blacklisted_token())
+
+    def test_redis_mode_before_first_rebuild(self):
+        with self._use_redis_filter():
+            self.assertRejected(self._blacklisted_token())
+
+    def test_redis_mode_after_rebuild(self):
+        with self._use_redis_filter():
+            before = self._blacklisted_token()
+            self.assertTrue(TokenBlacklistService.rebuild_filter())
+            after = self._blacklisted_token()
+
+            self.assertRejected(before)
+            self.assertRejected(after)
+            # A token that is not blacklisted is still accepted
+            RefreshToken(str(RefreshToken.for_user(self.user)))
+
+    def test_redis_mode_when_adding_to_the_filter_fails(self):
+        with self._use_redis_filter():
+            TokenBlacklistService.rebuild_filter()
+            self.redis.fail_writes = True
+            with mock.patch("user_account.services.token_blacklist_service.logger"):
+                token = self._blacklisted_token()
+
+            self.assertNotIn(RedisBlacklistFilter.BITS_KEY, self.redis.bitmaps)
+            self.assertRejected(token)
+
+
+@override_settings(USER_CACHE_ENABLED=True)
+class UserCacheInvalidationTests(TestCase):
+    """A cached auth user must not outlive a change to the user row."""
+
+    def setUp(self):
+        patcher = mock.patch("user_account.services.user_cache_service.is_shared_cache", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        UserCacheService.clear_local()
+        self.addCleanup(UserCacheService.clear_local)
+        self.user = CustomUser.objects.create_user(email="member@example.com", password="pass12345")
+        self.token = AccessToken.for_user(self.user)
+
+    def _authenticate(self):
+        return CachedJWTAuthentication().get_user(self.token)
+
+    def test_disabled_with_a_per_process_cache(self):
+        with mock.patch("user_account.services.user_cache_service.is_shared_cache", return_value=False):
+            self.assertFalse(UserCacheService.is_enabled())
+
+    def test_cached_user_skips_the_query(self):
+        self._authenticate()
+        with self.assertNumQueries(0):
+            self.assertEqual(self._authenticate().pk, self.user.pk)
+
+    def test_save_invalidates_cached_user(self):
+        self._authenticate()
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(UserCacheService.get_user(self.user.pk))
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_update_user_role_invalidates_cached_user(self):
+        self._authenticate()
+        AdminUserManagementService.update_user_role(self.user.pk, {"role": "admin", "is_staff": True})
+
+        self.assertIsNone(UserCacheService.get_user(self.user.pk))
+        user = self._authenticate()
+        self.assertEqual(user.role, "admin")
+        self.assertTrue(user.is_staff)
+
+
+class UserPurgeJobTests(TestCase):
+    """Background purges are queued in the database and run by `purge_users --run-jobs`."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            email="admin@example.com", password="pass12345", is_verified=True
+        )
+        for i in range(3):
+            CustomUser.objects.create_user(email=f"spam{i}@example.com", password="pass12345")
+
+    def test_queued_job_is_run_by_the_command(self):
+        job_id = BulkUserDeletionService.start_job(BulkUserDeletionService.SCOPE_UNVERIFIED, batch_size=2)
+        self.assertEqual(BulkUserDeletionService.get_job(job_id)["state"], UserPurgeJob.STATE_PENDING)
+
+        call_command("purge_users", "--run-jobs", stdout=StringIO())
+
+        job = BulkUserDeletionService.get_job(job_id)
+        self.assertEqual(job["state"], UserPurgeJob.STATE_FINISHED)
+        self.assertEqual(job["report"]["deleted"], 3)
+        self.assertEqual(list(CustomUser.objects.values_list("email", flat=True)), ["admin@example.com"])
+
+    def test_interrupted_job_is_claimed_again(self):
+        stale = timezone.now() - BulkUserDeletionService.get_job_lease() - timedelta(seconds=1)
+        job = UserPurgeJob.objects.create(
+            scope=BulkUserDeletionService.SCOPE_UNVERIFIED, batch_size=10,
+            state=UserPurgeJob.STATE_RUNNING, heartbeat_at=stale,
+        )
+        fresh = UserPurgeJob.objects.create(
+            scope=BulkUserDeletionService.SCOPE_UNVERIFIED, batch_size=10,
+            state=UserPurgeJob.STATE_RUNNING, heartbeat_at=timezone.now(),
+        )
+
+        self.assertEqual(BulkUserDeletionService.claim_job(), job)
+        self.assertIsNone(BulkUserDeletionService.claim_job())
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.state, UserPurgeJob.STATE_RUNNING)
+
+    def test_unknown_job(self):
+        self.assertIsNone(BulkUserDeletionService.get_job("not-a-job"))
+        self.assertIsNone(BulkUserDeletionService.get_job("0" * 32))
+
+
+class UserTokenServiceTests(TestCase):
+    """Signed verification and reset tokens expire, are bound to the account state, and legacy tokens still work."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="reader@example.com", password="pass12345")
+
+    def test_verification_token(self):
+        token = UserTokenService.make_verification_token(self.user)
+        self.assertEqual(UserTokenService.get_user_for_verification_token(token), self.user)
+        self.assertIsNone(UserTokenService.get_user_for_verification_token(token[:-1]))
+        self.assertIsNone(UserTokenService.get_user_for_verification_token(""))
+
+    def test_verification_token_expires(self):
+        token = UserTokenService.make_verification_token(self.user)
+        later = time.time() + UserTokenService.get_verification_max_age() + 1
+        with mock.patch("django.core.signing.time.time", return_value=later):
+            self.assertIsNone(UserTokenService.get_user_for_verification_token(token))
+
+    def test_verification_token_is_invalidated_by_an_email_change(self):
+        token = UserTokenService.make_verification_token(self.user)
+        self.user.email = "renamed@example.com"
+        self.user.save()
+
+        self.assertIsNone(UserTokenService.get_user_for_verification_token(token))
+
+    def test_reset_token(self):
+        token = UserTokenService.make_reset_token(self.user)
+        self.assertEqual(UserTokenService.get_user_for_reset_token(token, self.user.pk), self.user)
+        other = CustomUser.objects.create_user(email="other@example.com", password="pass12345")
+        self.assertIsNone(UserTokenService.get_user_for_reset_token(token, other.pk))
+        self.assertIsNone(UserTokenService.get_user_for_reset_token(token, "not-a-user-id"))
+
+    @override_settings(PASSWORD_RESET_TIMEOUT=3600)
+    def test_reset_token_expires(self):
+        token = UserTokenService.make_reset_token(self.user)
+        later = reset_token_generator._now() + timedelta(seconds=3601)
+        with mock.patch.object(reset_token_generator, "_now", return_value=later):
+            self.assertIsNone(UserTokenService.get_user_for_reset_token(token, self.user.pk))
+
+    def test_reset_token_is_invalidated_by_a_password_change(self):
+        token = UserTokenService.make_reset_token(self.user)
+        self.user.set_password("changed12345")
+        self.user.save()
+
+        self.assertIsNone(UserTokenService.get_user_for_reset_token(token, self.user.pk))
+
+    def test_reset_token_is_invalidated_by_a_login(self):
+        token = UserTokenService.make_reset_token(self.user)
+        self.user.last_login = timezone.now()
+        self.user.save()
+
+        self.assertIsNone(UserTokenService.get_user_for_reset_token(token, self.user.pk))
+
+    def test_legacy_tokens(self):
+        verification, reset = uuid.uuid4().hex, uuid.uuid4().hex
+        self.user.verification_token = verification
+        self.user.verification_token_expires = timezone.now() + timedelta(hours=1)
+        self.user.reset_password_token = reset
+        self.user.reset_password_expires = timezone.now() + timedelta(hours=1)
+        self.user.save()
+
+        self.assertEqual(UserTokenService.get_user_for_verification_token(verification), self.user)
+        self.assertEqual(UserTokenService.get_user_for_reset_token(reset, self.user.pk), self.user)
+        self.assertIsNone(UserTokenService.get_user_for_reset_token(reset, uuid.uuid4()))
+
+        CustomUser.objects.filter(pk=self.user.pk).update(
+            verification_token_expires=timezone.now() - timedelta(seconds=1),
+            reset_password_expires=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertIsNone(UserTokenService.get_user_for_verification_token(verification))
+        self.assertIsNone(UserTokenService.get_user_for_reset_token(reset, self.user.pk))
@@ -0,0 +1,24 @@
+# user_account/tokens.py
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .services.token_blacklist_service import TokenBlacklistService
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token whose blacklist check goes through TokenBlacklistService, so tokens the
+    Bloom filter rules out skip the BlacklistedToken query.
+    """
+
+    def check_blacklist(self):
+        if TokenBlacklistService.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        TokenBlacklistService.record_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -21,6 +21,7 @@ from .views import (
     DeleteAllUsersExceptAdminView,
     DeleteSingleUserView,
     DeleteUnverifiedUsersView,
+    UserPurgeJobStatusView,
     UpdateUserRoleView,
     GetSingleUserView,
     GetAllUsersView,
@@ -75,6 +76,11 @@ urlpatterns = [
         DeleteUnverifiedUsersView.as_view(),
         name="delete-unverified",
     ),
+    path(
+        "purge-jobs/<str:job_id>/",
+        UserPurgeJobStatusView.as_view(),
+        name="user-purge-job",
+    ),
     path("delete-account/", DeleteAccountView.as_view(), name="delete-account"),
     path(
         "update-role/<uuid:user_id>/",
@@ -11,6 +11,7 @@ from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from dj_rest_auth.registration.views import SocialLoginView
 from django.conf import settings
 from django.shortcuts import redirect
+from django.urls import reverse
 from django.contrib.auth import logout
 from rest_framework.exceptions import APIException, PermissionDenied
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -79,6 +80,7 @@ from .services.logout_service import LogoutService, GoogleLogoutService
 from .exceptions.custom_exceptions import LogoutError
 from .services.change_password_service import ChangePasswordService
 from .services.admin_user_deletion_service import AdminUserDeletionService
+from .services.bulk_user_deletion_service import BulkUserDeletionService
 from .services.admin_user_management_service import AdminUserManagementService
 
 from drf_yasg.utils import swagger_auto_schema
@@ -94,6 +96,7 @@ from .swagger_docs import (
     delete_all_users_except_admin_docs,
     delete_single_user_docs,
     delete_unverified_users_docs,
+    user_purge_job_status_docs,
     update_user_role_docs,
     get_single_user_schema,
     get_all_users_schema,
@@ -1048,12 +1051,43 @@ class DeleteAccountView(APIView):
             )
 
 
+# BULK DELETION BACKGROUND JOBS (ADMIN-ONLY) ---------------------------------------------------------------------
+def start_purge_job_response(scope):
+    """202 response for `?background=true` on the bulk deletion endpoints."""
+    job_id = BulkUserDeletionService.start_job(scope)
+    return Response(
+        {
+            "status": "accepted",
+            "job_id": job_id,
+            "status_url": reverse("user-purge-job", kwargs={"job_id": job_id}),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+def wants_background(request):
+    return request.query_params.get("background", "").lower() in ("true", "1", "t")
+
+
+class UserPurgeJobStatusView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminOrSuperUser]
+
+    @user_purge_job_status_docs()
+    def get(self, request, job_id, *args, **kwargs):
+        job = BulkUserDeletionService.get_job(job_id)
+        if job is None:
+            return Response({"error": "Purge job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job, status=status.HTTP_200_OK)
+
+
 # DELETE ALL USERS EXCEPT ADMIN (ADMIN-ONLY) ---------------------------------------------------------------------
 class DeleteAllUsersExceptAdminView(APIView):
     permission_classes = [IsAuthenticated, IsAdminOrSuperUser]
 
     @delete_all_users_except_admin_docs()
     def delete(self, request, *args, **kwargs):
+        if wants_background(request):
+            return start_purge_job_response(BulkUserDeletionService.SCOPE_ALL_EXCEPT_ADMIN)
         try:
             deleted_count = AdminUserDeletionService.delete_all_users_except_admin()
             return Response(
@@ -1112,6 +1146,8 @@ class DeleteUnverifiedUsersView(APIView):
 
     @delete_unverified_users_docs()
     def delete(self, request, *args, **kwargs):
+        if wants_background(request):
+            return start_purge_job_response(BulkUserDeletionService.SCOPE_UNVERIFIED)
         try:
             deleted_count = AdminUserDeletionService.delete_unverified_users()
             return Response(